@@ -1,10 +1,15 @@
-import pandas as pd
 import random
-from typing import List, Dict, Any
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Mapping, NamedTuple, Tuple
+
+# 경기장 날씨 옵션
+WEATHER_OPTIONS = ["맑음", "흐림", "비옴", "눈옴"]
 
 # --- 데이터 로드 ---
 def load_pitcher_data(file_path: str) -> List[Dict[str, Any]]:
     """투수 데이터를 로드하여 리스트로 반환."""
+    import pandas as pd  # 캐시(roster_cache)로 로드할 때는 pandas 를 불러오지 않도록 함수 안에서 import
     pitcher_data = pd.read_excel(file_path)
     pitchers = []
     for _, row in pitcher_data.iterrows():
@@ -26,6 +31,7 @@ def load_pitcher_data(file_path: str) -> List[Dict[str, Any]]:
 
 def load_batter_data(file_path: str) -> List[Dict[str, Any]]:
     """타자 데이터를 로드하여 리스트로 반환."""
+    import pandas as pd  # 캐시(roster_cache)로 로드할 때는 pandas 를 불러오지 않도록 함수 안에서 import
     batter_data = pd.read_excel(file_path)
     batters = []
     for _, row in batter_data.iterrows():
@@ -176,14 +182,16 @@ def select_user_team(team_data: Dict[str, Any]) -> Dict[str, Any]:
 
     required_positions = {"포수": 1, "내야수": 4, "외야수": 3}
     selected_batters = []
+    selected_ids = set()  # 선택 여부는 dict 전체 비교 대신 객체 id 로 확인
 
     for position, count in required_positions.items():
         print(f"\n{position}에서 {count}명 선택하세요.")
         while len([b for b in selected_batters if b["position"] == position]) < count:
             choice = input(f"{position} 선수 이름: ")
             batter = next((b for b in user_team["batters"] if b["name"] == choice), None)
-            if batter and batter not in selected_batters and batter["position"] == position:
+            if batter and id(batter) not in selected_ids and batter["position"] == position:
                 selected_batters.append(batter)
+                selected_ids.add(id(batter))
             else:
                 print("올바른 선수 이름을 입력하세요.")
 
@@ -192,8 +200,9 @@ def select_user_team(team_data: Dict[str, Any]) -> Dict[str, Any]:
     while len(selected_batters) < 14:
         choice = input("후보 타자 이름: ")
         batter = next((b for b in user_team["batters"] if b["name"] == choice), None)
-        if batter and batter not in selected_batters:
+        if batter and id(batter) not in selected_ids:
             selected_batters.append(batter)
+            selected_ids.add(id(batter))
         else:
             print("올바른 선수 이름을 입력하세요.")
 
@@ -213,7 +222,7 @@ def select_user_team(team_data: Dict[str, Any]) -> Dict[str, Any]:
     while len(starters) < 5:
         choice = input("선발 투수 이름: ")
         pitcher = next((p for p in user_team["pitchers"]["starters"] if p["name"] == choice), None)
-        if pitcher and pitcher not in starters:
+        if pitcher and all(p is not pitcher for p in starters):
             starters.append(pitcher)
         else:
             print("올바른 투수 이름을 입력하세요.")
@@ -224,7 +233,7 @@ def select_user_team(team_data: Dict[str, Any]) -> Dict[str, Any]:
     while len(relievers) < 6:
         choice = input("불펜 투수 이름: ")
         pitcher = next((p for p in user_team["pitchers"]["relievers"] if p["name"] == choice), None)
-        if pitcher and pitcher not in relievers:
+        if pitcher and all(p is not pitcher for p in relievers):
             relievers.append(pitcher)
         else:
             print("올바른 투수 이름을 입력하세요.")
@@ -255,10 +264,9 @@ def auto_configure_teams(team_data: Dict[str, Any], user_team_name: str) -> Dict
         outfielders = [batter for batter in team["batters"] if batter["position"] == "외야수"]
         top_outfielders = sorted(outfielders, key=lambda x: x["stats"].get("wRC", 0), reverse=True)[:3]
 
-        remaining_batters = [
-            batter for batter in team["batters"]
-            if batter not in (top_catcher + top_infielders + top_outfielders)
-        ]
+        # 이미 뽑힌 선수는 dict 전체 비교 대신 객체 id 로 제외
+        chosen_ids = {id(batter) for batter in top_catcher + top_infielders + top_outfielders}
+        remaining_batters = [batter for batter in team["batters"] if id(batter) not in chosen_ids]
         top_remaining_batters = sorted(remaining_batters, key=lambda x: x["stats"].get("wRC", 0), reverse=True)[:6]
 
         batters = top_catcher + top_infielders + top_outfielders + top_remaining_batters
@@ -269,10 +277,11 @@ def auto_configure_teams(team_data: Dict[str, Any], user_team_name: str) -> Dict
             key=lambda x: x["stats"].get("ERA", float('inf'))
         )[:5]
 
+        starter_ids = {id(pitcher) for pitcher in starters}
         relievers = sorted(
             [
                 pitcher for pitcher in team["pitchers"]["relievers"]
-                if "불펜" in pitcher["position"] and pitcher not in starters
+                if "불펜" in pitcher["position"] and id(pitcher) not in starter_ids
             ],
             key=lambda x: x["stats"].get("ERA", float('inf'))
         )[:6]
@@ -293,31 +302,155 @@ def auto_configure_teams(team_data: Dict[str, Any], user_team_name: str) -> Dict
     return ai_teams
 
 
+# --- 경기 이벤트 출력 ---
+class EventSink:
+    """
+    경기 진행 이벤트를 받는 싱크의 기본 클래스.
+    모든 메서드가 아무 일도 하지 않으므로, 필요한 이벤트만 재정의해서 사용.
+    """
+
+    def game_start(self, team1: Dict[str, Any], team2: Dict[str, Any], weather: str):
+        pass
+
+    def inning_start(self, inning: int, half: str):
+        pass
+
+    def pitcher_change(self, pitcher: Dict[str, Any], weather: str):
+        pass
+
+    def plate_appearance(self, batter: Dict[str, Any], pitcher: Dict[str, Any]):
+        pass
+
+    def at_bat_result(self, batter_name: str, result: str, outs: int):
+        pass
+
+    def runner_event(self, kind: str, runner: Any):
+        pass
+
+    def bases_state(self, bases: List[Any]):
+        pass
+
+    def inning_end(self, score: int):
+        pass
+
+    def game_end(self, result: Dict[str, Any]):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullSink(EventSink):
+    """아무것도 출력하지 않는 싱크 (몬테카를로 대량 실행용)."""
+
+
+class ConsoleSink(EventSink):
+    """기존과 같은 한글 중계를 콘솔에 출력하는 싱크."""
+
+    # runner_event 종류별 출력 문구
+    RUNNER_MESSAGES = {
+        "홈인": "{} 홈 도착! 점수 추가!",
+        "태그업": "{} 3루 주자가 홈 도착! 점수 추가!",
+        "희생타": "{} 3루 주자가 득점! 희생타점 올렸습니다.",
+        "병살": "{} 1루 주자가 병살 처리로 아웃되었습니다.",
+        "3루 잔루": "{} 3루 주자가 홈으로 진루하지 못했습니다.",
+        "2루 잔루": "{} 2루 주자는 진루하지 못했습니다.",
+    }
+
+    def game_start(self, team1: Dict[str, Any], team2: Dict[str, Any], weather: str):
+        # 경기 시작: 선발 명단 출력
+        print("\n--- 경기 시작 ---")
+        print(f"팀1: {team1['team_name']}")
+        print_batter_list_by_position(team1["batters"])
+        print_selected_pitchers(team1["pitchers"]["starters"], team1["pitchers"]["relievers"])  # 팀1 투수 출력
+
+        print(f"\n팀2: {team2['team_name']}")
+        print_batter_list_by_position(team2["batters"])
+        print_selected_pitchers(team2["pitchers"]["starters"], team2["pitchers"]["relievers"])  # 팀2 투수 출력
+
+    def inning_start(self, inning: int, half: str):
+        print(f"\n--- {inning}회{half} ---")
+
+    def pitcher_change(self, pitcher: Dict[str, Any], weather: str):
+        print(f"\n투수: {pitcher['name']} | 경기 날씨: {weather} | 투수 선호 날씨: {pitcher['weather']}")
+
+    def plate_appearance(self, batter: Dict[str, Any], pitcher: Dict[str, Any]):
+        print(f"타석: 타자 {batter['name']} vs 투수 {pitcher['name']}")
+
+    def at_bat_result(self, batter_name: str, result: str, outs: int):
+        if result == "플라이 아웃":
+            print(f"결과: {batter_name} 플라이 아웃! 현재 아웃 카운트: {outs}")
+        elif result == "땅볼 아웃":
+            print(f"결과: {batter_name} 땅볼 아웃! 현재 아웃 카운트: {outs}")
+        elif result == "삼진":
+            print(f"결과: {batter_name} 헛스윙 삼진아웃! 현재 아웃 카운트: {outs}")
+        elif result == "몸에 맞는 공":
+            print(f"결과: {batter_name} 몸에 맞는 공! 타자 1루 진루.")
+        elif result == "볼넷":
+            print(f"결과: {batter_name} 볼넷! 주자 1루 진루.")
+        else:
+            print(f"결과: {batter_name} {result}!")
+
+    def runner_event(self, kind: str, runner: Any):
+        print(self.RUNNER_MESSAGES[kind].format(runner))
+
+    def bases_state(self, bases: List[Any]):
+        # 현재 베이스 상태 출력
+        base_state = [f"{base if base else '주자없음'}" for base in bases]
+        print(f"현재 베이스 상태: {base_state}")
+
+    def inning_end(self, score: int):
+        print(f"이닝 종료: 득점 {score}점")
+
+    def game_end(self, result: Dict[str, Any]):
+        # 최종 결과 출력
+        print("\n--- 경기 종료 ---")
+        print(f"{result['team1']} {result['score_team1']} : {result['score_team2']} {result['team2']}")
+        if result["winner"] is not None:
+            print(f"{result['winner']} 승리!")
+        else:
+            print("무승부!")
+
+
+NULL_SINK = NullSink()
+CONSOLE_SINK = ConsoleSink()
+
+
 # --- 9이닝 시뮬레이션 ---
-def calculate_probability(batter: Dict[str, Any], pitcher: Dict[str, Any], outcome_type: str, weather: str) -> float:
-    # 날씨 효과 적용
-    apply_weather_effects(batter, weather, is_batter=True)
-    apply_weather_effects(pitcher, weather, is_batter=False)
+def calculate_probability(batter: Dict[str, Any], pitcher: Dict[str, Any], outcome_type: str, weather: str,
+                          batter_stats: Optional[Mapping[str, Any]] = None,
+                          pitcher_stats: Optional[Mapping[str, Any]] = None) -> float:
+    """
+    타자와 투수의 대결 결과 확률 계산.
+    batter_stats / pitcher_stats 에 get_weather_stats 결과를 넘기면 다시 찾지 않는다 (한 타석에 여러 결과를 계산할 때).
+    """
+    # 날씨 효과가 반영된 읽기 전용 스탯 (원본은 수정하지 않음)
+    if batter_stats is None:
+        batter_stats = get_weather_stats(batter, weather, is_batter=True)
+    if pitcher_stats is None:
+        pitcher_stats = get_weather_stats(pitcher, weather, is_batter=False)
 
-    """타자와 투수의 대결 결과 확률 계산."""
     if outcome_type == "볼넷":
-        return max(0, batter["stats"]["볼넷%"] * 0.2 + (11 + 2.5 * (pitcher["stats"]["볼넷/9"] - 4.2)))
+        return max(0, batter_stats["볼넷%"] * 0.2 + (11 + 2.5 * (pitcher_stats["볼넷/9"] - 4.2)))
     elif outcome_type == "삼진":
-        return max(0, batter["stats"]["삼진%"] * 0.2 + (20 + 2.5 * (pitcher["stats"]["삼진/9"] - 7.2)))
+        return max(0, batter_stats["삼진%"] * 0.2 + (20 + 2.5 * (pitcher_stats["삼진/9"] - 7.2)))
     elif outcome_type == "안타":
-        return max(0, batter["stats"]["타율"] * 100 + ((pitcher["stats"]["ERA"] - 4.8) * 0.06))
+        return max(0, batter_stats["타율"] * 100 + ((pitcher_stats["ERA"] - 4.8) * 0.06))
     elif outcome_type == "몸에 맞는 공":
         return 3  # 고정값
     elif outcome_type == "플라이 아웃":
-        return max(0,0.5*(100 - ((batter["stats"]["타율"] * 100 + ((pitcher["stats"]["ERA"] - 4.8) * 0.06)) + (batter["stats"]["볼넷%"] * 0.2 + (11 + 2.5 * (pitcher["stats"]["볼넷/9"] - 4.2))) + (batter["stats"]["삼진%"] * 0.2 + (20 + 2.5 * (pitcher["stats"]["삼진/9"] - 7.2))))))
+        return max(0,0.5*(100 - ((batter_stats["타율"] * 100 + ((pitcher_stats["ERA"] - 4.8) * 0.06)) + (batter_stats["볼넷%"] * 0.2 + (11 + 2.5 * (pitcher_stats["볼넷/9"] - 4.2))) + (batter_stats["삼진%"] * 0.2 + (20 + 2.5 * (pitcher_stats["삼진/9"] - 7.2))))))
     elif outcome_type == "땅볼 아웃":
-        return max(0,0.5*(100 - ((batter["stats"]["타율"] * 100 + ((pitcher["stats"]["ERA"] - 4.8) * 0.06)) + (batter["stats"]["볼넷%"] * 0.2 + (11 + 2.5 * (pitcher["stats"]["볼넷/9"] - 4.2))) + (batter["stats"]["삼진%"] * 0.2 + (20 + 2.5 * (pitcher["stats"]["삼진/9"] - 7.2))))))
+        return max(0,0.5*(100 - ((batter_stats["타율"] * 100 + ((pitcher_stats["ERA"] - 4.8) * 0.06)) + (batter_stats["볼넷%"] * 0.2 + (11 + 2.5 * (pitcher_stats["볼넷/9"] - 4.2))) + (batter_stats["삼진%"] * 0.2 + (20 + 2.5 * (pitcher_stats["삼진/9"] - 7.2))))))
     else:
         raise ValueError("Unknown outcome type.")
-def determine_hit_type_direct(batter: Dict[str, Any]) -> str:
+def determine_hit_type_direct(batter: Dict[str, Any], rng: Optional[random.Random] = None) -> str:
     """
     타자의 안타 개수를 기반으로 단타, 2루타, 3루타, 홈런 중 하나를 결정.
+    :param rng: 난수기 (random.Random 호환, 기본: 전역 random 모듈)
     """
+    if rng is None:
+        rng = random
     # 타자의 전체 안타 수
     total_hits = batter["stats"].get("안타", 0)
 
@@ -342,7 +475,7 @@ def determine_hit_type_direct(batter: Dict[str, Any]) -> str:
     # 결과 결정
     hit_types = list(probabilities.keys())
     weights = list(probabilities.values())
-    hit_result = random.choices(hit_types, weights, k=1)[0]
+    hit_result = rng.choices(hit_types, weights, k=1)[0]
     return hit_result
 def calculate_out_probability(batter: Dict[str, Any], pitcher: Dict[str, Any]) -> Dict[str, float]:
     """
@@ -352,116 +485,171 @@ def calculate_out_probability(batter: Dict[str, Any], pitcher: Dict[str, Any]) -
     fly_out_prob = max(0, 50 - (pitcher["stats"]["ERA"] - 4.0) * 2 + batter["stats"]["타율"] * 50)
     return {"ground_out": ground_out_prob, "fly_out": fly_out_prob}
 
-def simulate_at_bat(batter: Dict[str, Any], pitcher: Dict[str, Any], weather: str) -> str:
+# 공통 난수 스트림에서 simulate_at_bat 결과를 뽑는 순서: 삼진, 땅볼 아웃, 플라이 아웃, 볼넷, 몸에 맞는 공, 안타
+ALIGNED_OUTCOME_ORDER = [1, 4, 5, 0, 3, 2]
+
+def simulate_at_bat(batter: Dict[str, Any], pitcher: Dict[str, Any], weather: str, table: Optional[Any] = None, rng: Optional[random.Random] = None) -> str:
     """
        타자와 투수의 대결에서 결과를 결정하며, 안타일 경우 단타/2루타/3루타/홈런을 추가로 결정.
+       table(MatchupTable)이 주어지면 미리 계산된 누적 확률표에서 바로 뽑는다.
+       rng 는 난수기 (random.Random 호환, 기본: 전역 random 모듈).
+       rng.aligned 가 참이면(공통 난수 스트림) 결과와 관계없이 타석마다 난수를 2개씩 쓰고,
+       나쁜 결과 -> 좋은 결과 순으로 추첨해 대칭 난수(1 - u)가 반대 결과가 되게 한다.
        """
+    if rng is None:
+        rng = random
+    if table is not None:
+        return table.sample(batter, pitcher, weather, rng)
+
     outcomes = ["볼넷", "삼진", "안타", "몸에 맞는 공", "땅볼 아웃", "플라이 아웃"]
+    # 날씨 반영 스탯은 타석마다 한 번만 찾는다
+    batter_stats = get_weather_stats(batter, weather, is_batter=True)
+    pitcher_stats = get_weather_stats(pitcher, weather, is_batter=False)
     probabilities = [
-        calculate_probability(batter, pitcher, "볼넷", weather),
-        calculate_probability(batter, pitcher, "삼진", weather),
-        calculate_probability(batter, pitcher, "안타", weather),
-        calculate_probability(batter, pitcher, "몸에 맞는 공", weather),
-        calculate_probability(batter, pitcher, "플라이 아웃", weather),
-        calculate_probability(batter, pitcher, "땅볼 아웃", weather),
-
+        calculate_probability(batter, pitcher, outcome, weather, batter_stats, pitcher_stats)
+        for outcome in ("볼넷", "삼진", "안타", "몸에 맞는 공", "플라이 아웃", "땅볼 아웃")
     ]
 
     # 확률 합 정규화
     total = sum(probabilities)
     normalized_probabilities = [p / total * 100 for p in probabilities]
-    result = random.choices(outcomes, normalized_probabilities, k=1)[0]
+    aligned = getattr(rng, "aligned", False)
+    if aligned:
+        order = ALIGNED_OUTCOME_ORDER
+        result = rng.choices([outcomes[i] for i in order], [normalized_probabilities[i] for i in order], k=1)[0]
+    else:
+        result = rng.choices(outcomes, normalized_probabilities, k=1)[0]
 
     # 안타일 경우, 추가로 단타/2루타/3루타/홈런 결정
     if result == "안타":
-        hit_type = determine_hit_type_direct(batter)
+        hit_type = determine_hit_type_direct(batter, rng)
         return hit_type
+    elif aligned:
+        rng.random()  # 안타 유형 추첨 몫을 버려 다음 타석의 난수 위치를 맞춘다
 
     return result
 
-def simulate_inning(batting_team: List[Dict[str, Any]], pitching_team: List[Dict[str, Any]], inning_number: int, weather: str) -> int:
-    """이닝 시뮬레이션."""
+def select_pitcher(pitching_team: Dict[str, Any], inning_number: int) -> Dict[str, Any]:
+    """이닝 번호에 맞는 투수를 선택 (1~5이닝 선발, 6이닝~ 불펜)."""
+    if inning_number <= 5:
+        # 선발 투수: 1~5 이닝
+        return pitching_team["starters"][(inning_number - 1) % len(pitching_team["starters"])]
+    #불펜 투수: 6이닝~
+    return pitching_team["relievers"][(inning_number - 1) % len(pitching_team["relievers"])]
+
+def simulate_inning(batting_team: List[Dict[str, Any]], pitching_team: List[Dict[str, Any]], inning_number: int, weather: str, table: Optional[Any] = None, sink: Optional[EventSink] = None, rng: Optional[random.Random] = None) -> int:
+    """
+    이닝 시뮬레이션. 진행 상황은 sink(기본: 콘솔 출력)로 보낸다. rng 는 simulate_at_bat 참고.
+    주자 이동은 apply_at_bat_result 대신 미리 만든 전이표(get_transition_table)를 한 번 찾아서 적용한다.
+    """
+    if sink is None:
+        sink = CONSOLE_SINK
+    transitions = get_transition_table()
+    emit = sink is not NULL_SINK  # 이벤트를 버리는 싱크면 주자 이벤트 호출도 생략
     outs = 0
     score = 0
+    mask = 0  # 베이스 비트마스크
     bases = [None, None, None]  # 1루, 2루, 3루 상태 저장
     # 투수 선택
-    if inning_number <= 5:
-        # 선발 투수: 1~5 이닝
-        pitcher = pitching_team["starters"][(inning_number - 1) % len(pitching_team["starters"])]
-    else:
-        #불펜 투수: 6이닝~
-        pitcher = pitching_team["relievers"][(inning_number - 1) % len(pitching_team["relievers"])]
+    pitcher = select_pitcher(pitching_team, inning_number)
 
-    print(f"\n투수: {pitcher['name']} | 경기 날씨: {weather} | 투수 선호 날씨: {pitcher['weather']}")
+    sink.pitcher_change(pitcher, weather)
 
     for batter in batting_team:
         if outs >= 3:
             break
 
-        # 날씨 효과 적용
-        apply_weather_effects(batter, weather, is_batter=True)  # 타자 스탯 조정
-        apply_weather_effects(pitcher, weather, is_batter=False)  # 투수 스탯 조정
-
+        sink.plate_appearance(batter, pitcher)
+        result = simulate_at_bat(batter, pitcher, weather, table, rng)
+
+        step = transitions[result][mask][outs]
+        runners = (bases[0], bases[1], bases[2], batter["name"], None)
+        if emit:
+            for kind, source in step.events:
+                if kind is None:
+                    sink.at_bat_result(runners[3], result, step.outs)
+                else:
+                    sink.runner_event(kind, runners[source])
+        first, second, third = step.sources
+        bases[0], bases[1], bases[2] = runners[first], runners[second], runners[third]
+        mask, outs = step.next_mask, step.outs
+        score += step.runs
+        sink.bases_state(bases)
+
+    sink.inning_end(score)
+    return score
 
-        print(f"타석: 타자 {batter['name']} vs 투수 {pitcher['name']}")
-        result = simulate_at_bat(batter, pitcher,weather)
 
-        if result == "플라이 아웃":
-            # 희생플라이 처리
-            score += handle_tag_up(bases, outs)
-            outs += 1
-            print(f"결과: {batter['name']} 플라이 아웃! 현재 아웃 카운트: {outs}")
-        if result == "땅볼 아웃":
-            # 희생타 처리
-            additional_score, outs = handle_ground_out(bases, outs)
-            score += additional_score
-            print(f"결과: {batter['name']} 땅볼 아웃! 현재 아웃 카운트: {outs}")
-        elif result == "삼진":
-            outs += 1
-            print(f"결과: {batter['name']} 헛스윙 삼진아웃! 현재 아웃 카운트: {outs}")
-        elif result == "몸에 맞는 공":
-            print(f"결과: {batter['name']} 몸에 맞는 공! 타자 1루 진루.")
-            score += handle_walk_or_hit_by_pitch(bases)
-        elif result == "볼넷":
-            print(f"결과: {batter['name']} 볼넷! 주자 1루 진루.")
-            score += handle_walk_or_hit_by_pitch(bases)
-            bases[0] = batter['name']  # 타자가 1루로 이동
-        elif result in ["단타", "2루타", "3루타", "홈런"]:
-            print(f"결과: {batter['name']} {result}!")
-            if result == "단타":
-                score += advance_runner(bases, 1)  # 모든 주자 1베이스 이동
-                bases[0] = batter["name"]  # 타자 1루로 이동
-            elif result == "2루타":
-                score += advance_runner(bases, 2)  # 모든 주자 2베이스 이동
-                bases[1] = batter["name"]  # 타자 2루로 이동
-            elif result == "3루타":
-                score += advance_runner(bases, 3)  # 모든 주자 3베이스 이동
-                bases[2] = batter["name"]  # 타자 3루로 이동
-            elif result == "홈런":
-                score += sum(1 for b in bases if b) + 1  # 모든 주자와 타자 득점
-                bases = [None, None, None]  # 베이스 초기화
-            #print(f"현재 베이스 상태: {bases}")
-        # 현재 베이스 상태 출력
-        base_state = [f"{base if base else '주자없음'}" for base in bases]
-        print(f"현재 베이스 상태: {base_state}")
+def apply_at_bat_result(bases: List[Any], outs: int, result: str, batter_name: str, sink: Optional[EventSink] = None) -> (int, int):
+    """
+    타석 결과에 따라 주자와 아웃 카운트를 갱신.
+    :param bases: 현재 베이스 상태 (1루, 2루, 3루). 직접 수정됨.
+    :param outs: 현재 아웃 수.
+    :param result: simulate_at_bat 결과.
+    :param batter_name: 타자 이름.
+    :param sink: 이벤트 싱크 (기본: 콘솔 출력).
+    :return: 득점한 점수와 업데이트된 아웃 수.
+    """
+    if sink is None:
+        sink = CONSOLE_SINK
+    score = 0
+    if result == "플라이 아웃":
+        # 희생플라이 처리
+        score += handle_tag_up(bases, outs, sink)
+        outs += 1
+        sink.at_bat_result(batter_name, result, outs)
+    if result == "땅볼 아웃":
+        # 희생타 처리
+        additional_score, outs = handle_ground_out(bases, outs, sink)
+        score += additional_score
+        sink.at_bat_result(batter_name, result, outs)
+    elif result == "삼진":
+        outs += 1
+        sink.at_bat_result(batter_name, result, outs)
+    elif result == "몸에 맞는 공":
+        sink.at_bat_result(batter_name, result, outs)
+        score += handle_walk_or_hit_by_pitch(bases, sink)
+        bases[0] = batter_name  # 타자가 1루로 이동 ("타자" 대신 이름으로 기록)
+    elif result == "볼넷":
+        sink.at_bat_result(batter_name, result, outs)
+        score += handle_walk_or_hit_by_pitch(bases, sink)
+        bases[0] = batter_name  # 타자가 1루로 이동
+    elif result in ["단타", "2루타", "3루타", "홈런"]:
+        sink.at_bat_result(batter_name, result, outs)
+        if result == "단타":
+            score += advance_runner(bases, 1, sink)  # 모든 주자 1베이스 이동
+            bases[0] = batter_name  # 타자 1루로 이동
+        elif result == "2루타":
+            score += advance_runner(bases, 2, sink)  # 모든 주자 2베이스 이동
+            bases[1] = batter_name  # 타자 2루로 이동
+        elif result == "3루타":
+            score += advance_runner(bases, 3, sink)  # 모든 주자 3베이스 이동
+            bases[2] = batter_name  # 타자 3루로 이동
+        elif result == "홈런":
+            score += sum(1 for b in bases if b) + 1  # 모든 주자와 타자 득점
+            bases[:] = [None, None, None]  # 베이스 초기화
+        #print(f"현재 베이스 상태: {bases}")
 
-    print(f"이닝 종료: 득점 {score}점")
-    return score
+    return score, outs
 
 
-def advance_runner(bases: List[bool], steps: int):
+def advance_runner(bases: List[bool], steps: int, sink: Optional[EventSink] = None):
 
     """
            주자를 이동시키고 점수를 계산합니다.
            :param bases: 현재 베이스 상태 (1루, 2루, 3루).
            :param hit: 타자의 안타 타입 (1: 단타, 2: 2루타, 3: 3루타, 4: 홈런).
+           :param sink: 이벤트 싱크 (기본: 콘솔 출력).
            :return: 득점한 점수.
            """
+    if sink is None:
+        sink = CONSOLE_SINK
     score = 0
     for i in range(2, -1, -1):  # 3루에서 1루 방향으로 이동
         if bases[i]:
             if i + steps >= 3:  # 홈 도달 시 주자를 홈으로
-                print(f"{bases[i]} 홈 도착! 점수 추가!")
+                sink.runner_event("홈인", bases[i])
+                score += 1
                 bases[i] = None
             else:
                 bases[i + steps] = bases[i]
@@ -469,12 +657,15 @@ def advance_runner(bases: List[bool], steps: int):
     if steps < 4:
         bases[steps - 1] = "타자"
     return score
-def handle_walk_or_hit_by_pitch(bases: List[Any]) -> int:
+def handle_walk_or_hit_by_pitch(bases: List[Any], sink: Optional[EventSink] = None) -> int:
     """
     볼넷 또는 몸에 맞는 공 발생 시 주자와 타자 이동을 처리하고 득점을 계산합니다.
     :param bases: 현재 베이스 상태 (1루, 2루, 3루).
+    :param sink: 이벤트 싱크 (기본: 콘솔 출력).
     :return: 득점한 점수.
     """
+    if sink is None:
+        sink = CONSOLE_SINK
     score = 0
 
     # 3루에서 1루 방향으로 이동
@@ -482,7 +673,7 @@ def handle_walk_or_hit_by_pitch(bases: List[Any]) -> int:
         if bases[i]:  # 해당 베이스에 주자가 있으면
             if i == 2:  # 3루 주자는 홈으로 들어감
                 score += 1
-                print(f"{bases[i]} 홈 도착! 점수 추가!")
+                sink.runner_event("홈인", bases[i])
                 bases[i] = None  # 3루 비우기
             else:
                 # 주자를 한 베이스 앞으로 이동
@@ -493,73 +684,79 @@ def handle_walk_or_hit_by_pitch(bases: List[Any]) -> int:
     bases[0] = "타자"
 
     return score
-def handle_tag_up(bases: List[Any], outs: int) -> int:
+def handle_tag_up(bases: List[Any], outs: int, sink: Optional[EventSink] = None) -> int:
     """
     태그업 상황에서 3루 주자가 득점하는 로직.
     :param bases: 현재 베이스 상태.
     :param outs: 현재 아웃 수.
+    :param sink: 이벤트 싱크 (기본: 콘솔 출력).
     :return: 득점한 점수 (0 또는 1).
     """
+    if sink is None:
+        sink = CONSOLE_SINK
     if outs < 2 and bases[2]:  # 태그업 조건: 3루 주자 있고, 0 또는 1아웃
-        print(f"{bases[2]} 3루 주자가 홈 도착! 점수 추가!")
+        sink.runner_event("태그업", bases[2])
         bases[2] = None  # 3루 비우기
         return 1  # 점수 1점 추가
     return 0
-def handle_ground_out(bases: List[Any], outs: int) -> (int, int):
+def handle_ground_out(bases: List[Any], outs: int, sink: Optional[EventSink] = None) -> (int, int):
     """
     땅볼 아웃 처리.
     :param bases: 현재 베이스 상태.
     :param outs: 현재 아웃 수.
+    :param sink: 이벤트 싱크 (기본: 콘솔 출력).
     :return: 득점한 점수 (0 또는 1)와 업데이트된 아웃 수.
     """
+    if sink is None:
+        sink = CONSOLE_SINK
     score = 0
 
     if outs < 2:  # 0아웃 또는 1아웃일 때
         if bases[2] and bases[0]:  # 3루 주자와 1루 주자가 동시에 있을 경우
             if outs == 0:  # 0아웃일 경우 득점 인정 1아웃일 경우 득점 인정 X
-                print(f"{bases[2]} 3루 주자가 득점! 희생타점 올렸습니다.")
+                sink.runner_event("희생타", bases[2])
                 score += 1
                 bases[2] = None
-                print(f"{bases[0]} 1루 주자가 병살 처리로 아웃되었습니다.")
+                sink.runner_event("병살", bases[0])
                 bases[0] = None
                 outs += 2
             else:  # 1아웃일 경우 득점 불인정
-                print(f"{bases[2]} 3루 주자가 홈으로 진루하지 못했습니다.")
-                print(f"{bases[0]} 1루 주자가 병살 처리로 아웃되었습니다.")
+                sink.runner_event("3루 잔루", bases[2])
+                sink.runner_event("병살", bases[0])
                 bases[0] = None
                 outs += 2
         elif bases[2] and bases[1] and bases[0]:  # 3루 주자, 2루 주자 ,1루 주자가 동시에 있을 경우
             if outs == 0:  # 0아웃일 경우 득점 인정 1아웃일 경우 득점 인정 X
-                print(f"{bases[2]} 3루 주자가 득점! 희생타점 올렸습니다.")
+                sink.runner_event("희생타", bases[2])
                 score += 1
                 bases[2] = None
-                print(f"{bases[0]} 1루 주자가 병살 처리로 아웃되었습니다.")
+                sink.runner_event("병살", bases[0])
                 bases[0] = None
                 outs += 2
             else:  # 1아웃일 경우 득점 불인정
-                print(f"{bases[2]} 3루 주자가 홈으로 진루하지 못했습니다.")
-                print(f"{bases[0]} 1루 주자가 병살 처리로 아웃되었습니다.")
+                sink.runner_event("3루 잔루", bases[2])
+                sink.runner_event("병살", bases[0])
                 bases[0] = None
                 outs += 2
         elif bases[2] and bases[1] :  # 3루 주자와 2루 주자가 동시에 있을 경우
-            print(f"{bases[2]} 3루 주자가 득점! 희생타점 올렸습니다.")
+            sink.runner_event("희생타", bases[2])
             bases[2] = None
             score += 1
             outs += 1
         elif bases[2] and bases[0]:  # 2루 주자와 1루 주자가 동시에 있을 경우
-            print(f"{bases[0]} 1루 주자가 병살 처리로 아웃되었습니다.")
+            sink.runner_event("병살", bases[0])
             bases[0] = None
             outs += 2
         elif bases[2]:  # 3루 주자만 있을 경우
-            print(f"{bases[2]} 3루 주자가 득점! 희생타점 올렸습니다.")
+            sink.runner_event("희생타", bases[2])
             bases[2] = None
             score += 1
             outs += 1
         elif bases[1]:  # 2루 주자만 있을 경우
-            print(f"{bases[1]} 2루 주자는 진루하지 못했습니다.")
+            sink.runner_event("2루 잔루", bases[1])
             outs += 1  # 2루 주자 처리 없이 아웃만 증가
         elif bases[0]:  # 1루 주자만 있을 경우
-            print(f"{bases[0]} 1루 주자가  병살 처리되어 아웃되었습니다.")
+            sink.runner_event("병살", bases[0])
             bases[0] = None
             outs += 2
         else:
@@ -570,64 +767,183 @@ def handle_ground_out(bases: List[Any], outs: int) -> (int, int):
 
     return score, outs
 
-def get_random_weather() -> str:
+# --- 주자 이동 전이표 ---
+# 전이표 결과 순서 (안타는 유형별로)
+TRANSITION_RESULTS = ["볼넷", "삼진", "단타", "2루타", "3루타", "홈런", "몸에 맞는 공", "땅볼 아웃", "플라이 아웃"]
+# 전이표를 만들 때 베이스에 올리는 표식 (인덱스 0~2: 1~3루 주자, 3: 타자, 4: 빈 베이스)
+RUNNER_LABELS = ("1루 주자", "2루 주자", "3루 주자", "타자 본인", None)
+
+
+class Transition(NamedTuple):
+    """
+    (결과, 베이스 비트마스크, 아웃 수) 하나의 전이.
+    - next_mask: 다음 베이스 비트마스크 (1루=1, 2루=2, 3루=4)
+    - outs: 타석 후 아웃 수
+    - runs: 득점
+    - sources: 타석 후 1/2/3루에 있는 선수가 타석 전 어디에 있었는지 (RUNNER_LABELS 인덱스)
+    - events: sink 에 보낼 이벤트 순서. (None, _) 은 at_bat_result, (종류, 인덱스) 는 그 주자의 runner_event
+    """
+    next_mask: int
+    outs: int
+    runs: int
+    sources: Tuple[int, int, int]
+    events: Tuple[Tuple[Optional[str], int], ...]
+
+
+class _RecordingSink(EventSink):
+    """전이표를 만들 때 apply_at_bat_result 가 보내는 이벤트 순서를 기록."""
+
+    def __init__(self):
+        self.events = []
+
+    def at_bat_result(self, batter_name: str, result: str, outs: int):
+        self.events.append((None, -1))
+
+    def runner_event(self, kind: str, runner: Any):
+        self.events.append((kind, RUNNER_LABELS.index(runner)))
+
+
+def build_transition_table() -> Dict[str, List[List[Transition]]]:
+    """
+    결과 -> [베이스 비트마스크][아웃 수] -> Transition 표.
+    표식을 올린 베이스로 apply_at_bat_result 를 직접 실행해서 만들기 때문에
+    주자 이동, 득점, 이벤트 순서가 기존 처리 함수(advance_runner, handle_ground_out 등)와 항상 같다.
+    """
+    table = {}
+    for result in TRANSITION_RESULTS:
+        rows = []
+        for mask in range(8):
+            row = []
+            for outs in range(3):
+                bases = [RUNNER_LABELS[i] if mask & (1 << i) else None for i in range(3)]
+                recorder = _RecordingSink()
+                runs, outs_after = apply_at_bat_result(bases, outs, result, RUNNER_LABELS[3], recorder)
+                sources = tuple(RUNNER_LABELS.index(runner) for runner in bases)  # "타자" 같은 임시 값이 남으면 ValueError
+                next_mask = sum(1 << i for i in range(3) if bases[i])
+                row.append(Transition(next_mask, outs_after, runs, sources, tuple(recorder.events)))
+            rows.append(row)
+        table[result] = rows
+    return table
+
+
+_transition_table: Optional[Dict[str, List[List[Transition]]]] = None
+
+
+def get_transition_table() -> Dict[str, List[List[Transition]]]:
+    """전이표는 처음 쓸 때 한 번만 만든다."""
+    global _transition_table
+    if _transition_table is None:
+        _transition_table = build_transition_table()
+    return _transition_table
+
+def get_random_weather(rng: Optional[random.Random] = None) -> str:
     """
     랜덤하게 경기장의 날씨를 반환.
+    :param rng: 난수기 (random.Random 호환, 기본: 전역 random 모듈)
     """
-    weather_options = ["맑음", "흐림", "비옴", "눈옴"]  # 날씨 옵션
-    return random.choice(weather_options)
+    if rng is None:
+        rng = random
+    return rng.choice(WEATHER_OPTIONS)
+
+# 선수/날씨별 날씨 반영 스탯 캐시 (최근에 쓴 순서로 최대 WEATHER_CACHE_SIZE 개):
+# (id(선수), 날씨, 타자 여부) -> (선수, 원본 스탯 사본, 선호 날씨, 스탯)
+WEATHER_CACHE_SIZE = 8192
+_weather_stats_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
 
-def apply_weather_effects(player: Dict[str, Any], weather: str, is_batter: bool = True):
+def get_weather_stats(player: Dict[str, Any], weather: str, is_batter: bool = True) -> Mapping[str, Any]:
     """
-    선수의 날씨 선호에 따른 스탯 조정.
+    선수의 날씨 선호를 반영한 읽기 전용 스탯을 반환.
+    선수와 날씨 조합마다 한 번만 계산해 캐시하며, player["stats"] 원본은 수정하지 않는다.
+    캐시에는 계산할 때의 원본 스탯 사본도 같이 두어, 원본을 직접 바꾼 경우에는 다시 계산한다.
+    원본이 그대로면 같은 스냅샷 객체를 돌려준다.
     :param player: 선수 데이터 (타자 또는 투수)
     :param weather: 현재 경기장의 날씨
     :param is_batter: 타자인지 여부 (True: 타자, False: 투수)
     """
+    key = (id(player), weather, is_batter)
+    cached = _weather_stats_cache.get(key)
+    if (cached is not None and cached[0] is player and cached[2] == player["weather"]
+            and cached[1] == player["stats"]):
+        _weather_stats_cache.move_to_end(key)
+        return cached[3]
+
+    source = dict(player["stats"])
+    stats = dict(source)
     if player["weather"] == weather:  # 선호하는 날씨와 일치할 경우
         if is_batter:
-            player["stats"]["볼넷%"] *= 0.9
-            player["stats"]["삼진%"] *= 0.9
-            player["stats"]["타율"] *= 1.2
+            stats["볼넷%"] *= 0.9
+            stats["삼진%"] *= 0.9
+            stats["타율"] *= 1.2
         else:
-            player["stats"]["볼넷/9"] *= 0.9
-            player["stats"]["삼진/9"] *= 1.2
-            player["stats"]["ERA"] *= 0.9
-
-def simulate_game(team1: Dict[str, Any], team2: Dict[str, Any],weather: str) -> None:
-    """팀1과 팀2의 9이닝 게임을 시뮬레이션하고 경기 과정을 출력."""
-    score_team1 = 0
-    score_team2 = 0
-
-    # 경기 시작: 선발 명단 출력
-    print("\n--- 경기 시작 ---")
-    print(f"팀1: {team1['team_name']}")
-    print_batter_list_by_position(team1["batters"])
-    print_selected_pitchers(team1["pitchers"]["starters"], team1["pitchers"]["relievers"])  # 팀1 투수 출력
-
-
+            stats["볼넷/9"] *= 0.9
+            stats["삼진/9"] *= 1.2
+            stats["ERA"] *= 0.9
+
+    snapshot = MappingProxyType(stats)
+    # 선수 객체도 같이 저장해 id 재사용으로 다른 선수의 스탯을 돌려주지 않게 한다
+    _weather_stats_cache[key] = (player, source, player["weather"], snapshot)
+    _weather_stats_cache.move_to_end(key)
+    if len(_weather_stats_cache) > WEATHER_CACHE_SIZE:
+        _weather_stats_cache.popitem(last=False)
+    return snapshot
+
+def clear_weather_cache():
+    """날씨 반영 스탯 캐시를 비운다 (변형 사본을 많이 만든 뒤 메모리를 바로 돌려줄 때)."""
+    _weather_stats_cache.clear()
+
+def apply_weather_effects(player: Dict[str, Any], weather: str, is_batter: bool = True) -> Mapping[str, Any]:
+    """
+    선수의 날씨 선호에 따른 스탯 조정.
+    예전처럼 player["stats"] 를 직접 곱하지 않고 get_weather_stats 의 읽기 전용 스탯을 반환.
+    """
+    return get_weather_stats(player, weather, is_batter)
 
-    print(f"\n팀2: {team2['team_name']}")
-    print_batter_list_by_position(team2["batters"])
-    print_selected_pitchers(team2["pitchers"]["starters"], team2["pitchers"]["relievers"])  # 팀2 투수 출력
+def simulate_game(team1: Dict[str, Any], team2: Dict[str, Any],weather: str, table: Optional[Any] = None, sink: Optional[EventSink] = None, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """
+    팀1과 팀2의 9이닝 게임을 시뮬레이션. table, rng 는 simulate_at_bat 참고.
+    경기마다 rng_streams.game_rng 로 만든 난수기를 넘기면 실행 순서와 무관하게 재현된다.
+    경기 과정은 sink(기본: 콘솔 출력)로 보내고, 경기 결과를 dict 로 반환.
+    :return: 팀 이름, 날씨, 팀별 점수와 이닝별 득점, 승리 팀 이름(무승부면 None)
+    """
+    if sink is None:
+        sink = CONSOLE_SINK
+    innings_team1 = []
+    innings_team2 = []
 
+    sink.game_start(team1, team2, weather)
 
     # 9이닝 시뮬레이션
+    # 공통 난수 스트림(variance.CommonRandom)은 반 이닝마다 독립된 하위 스트림을 쓴다
+    substream = getattr(rng, "substream", None)
     for inning in range(1, 10):
-            print(f"\n--- {inning}회초 ---")
-            score_team1 += simulate_inning(team1["batters"], team2["pitchers"], inning, weather)
-            print(f"\n--- {inning}회말 ---")
-            score_team2 += simulate_inning(team2["batters"], team1["pitchers"], inning, weather)
-
-    # 최종 결과 출력
-    print("\n--- 경기 종료 ---")
-    print(f"{team1['team_name']} {score_team1} : {score_team2} {team2['team_name']}")
+            sink.inning_start(inning, "초")
+            inning_rng = substream(inning, 0) if substream else rng
+            innings_team1.append(simulate_inning(team1["batters"], team2["pitchers"], inning, weather, table, sink, inning_rng))
+            sink.inning_start(inning, "말")
+            inning_rng = substream(inning, 1) if substream else rng
+            innings_team2.append(simulate_inning(team2["batters"], team1["pitchers"], inning, weather, table, sink, inning_rng))
+
+    score_team1 = sum(innings_team1)
+    score_team2 = sum(innings_team2)
     if score_team1 > score_team2:
-        print(f"{team1['team_name']} 승리!")
+        winner = team1["team_name"]
     elif score_team1 < score_team2:
-        print(f"{team2['team_name']} 승리!")
+        winner = team2["team_name"]
     else:
-        print("무승부!")
+        winner = None
+
+    result = {
+        "team1": team1["team_name"],
+        "team2": team2["team_name"],
+        "weather": weather,
+        "score_team1": score_team1,
+        "score_team2": score_team2,
+        "innings_team1": innings_team1,
+        "innings_team2": innings_team2,
+        "winner": winner,
+    }
+    sink.game_end(result)
+    return result
 
 # --- 메인 ---
 if __name__ == "__main__":
@@ -647,14 +963,17 @@ if __name__ == "__main__":
     # 모든 팀 데이터 통합
     all_teams = {user_team["team_name"]: user_team, **ai_teams}
 
+    # 경기 난수기 (시드를 고정하려면 random.Random(시드))
+    rng = random.Random()
+
     # 상대 팀 선택
-    opponent_team_name = random.choice(list(ai_teams.keys()))
+    opponent_team_name = rng.choice(list(ai_teams.keys()))
     opponent_team = ai_teams[opponent_team_name]
 
     # 구장 날씨 랜덤 설정
-    stadium_weather = get_random_weather()
+    stadium_weather = get_random_weather(rng)
     print(f"오늘의 경기 날씨: {stadium_weather}")
 
     # 게임 실행
-    simulate_game(user_team, opponent_team, stadium_weather)
+    simulate_game(user_team, opponent_team, stadium_weather, rng=rng)
 
@@ -0,0 +1,166 @@
+"""
+같은 대진의 경기 N개를 NumPy 배열로 한 번에 시뮬레이션하는 배치 엔진.
+
+simulate_game 과 같은 확률 모델(calculate_probability, determine_hit_type_direct)과
+같은 주자 이동 규칙(KBO.get_transition_table 의 전이표)을 사용한다.
+경기마다 베이스/아웃/점수 상태를 배열로 들고, 한 타석 단계마다 모든 경기의 결과를 한 번에 뽑는다.
+"""
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+import KBO
+
+# 배치 엔진의 타석 결과 순서 (안타는 단타/2루타/3루타/홈런으로 펼쳐서 사용)
+OUTCOMES = ["볼넷", "삼진", "단타", "2루타", "3루타", "홈런", "몸에 맞는 공", "땅볼 아웃", "플라이 아웃"]
+HIT_TYPES = ["단타", "2루타", "3루타", "홈런"]
+# 공통/대칭 난수 모드의 추첨 순서 (나쁜 결과 -> 좋은 결과): 역누적분포 추첨에서 u 와 1 - u 가 반대 결과가 되도록 한다
+VALUE_ORDER = [OUTCOMES.index(o) for o in ["삼진", "땅볼 아웃", "플라이 아웃", "볼넷", "몸에 맞는 공", "단타", "2루타", "3루타", "홈런"]]
+
+
+def hit_type_distribution(batter: Dict[str, Any]) -> List[float]:
+    """determine_hit_type_direct 와 같은 방식으로 단타/2루타/3루타/홈런 확률을 계산."""
+    total_hits = batter["stats"].get("안타", 0)
+    if total_hits == 0:
+        return [1.0, 0.0, 0.0, 0.0]
+    weights = [batter["stats"].get(hit_type, 0) / total_hits for hit_type in HIT_TYPES]
+    total = sum(weights)
+    if total <= 0:
+        return [1.0, 0.0, 0.0, 0.0]
+    return [w / total for w in weights]
+
+
+def outcome_distribution(batter: Dict[str, Any], pitcher: Dict[str, Any], weather: str) -> np.ndarray:
+    """타자 vs 투수 대결의 9가지 결과(OUTCOMES 순서) 확률을 계산."""
+    stats = (KBO.get_weather_stats(batter, weather, True), KBO.get_weather_stats(pitcher, weather, False))
+    walk = KBO.calculate_probability(batter, pitcher, "볼넷", weather, *stats)
+    strikeout = KBO.calculate_probability(batter, pitcher, "삼진", weather, *stats)
+    hit = KBO.calculate_probability(batter, pitcher, "안타", weather, *stats)
+    hit_by_pitch = KBO.calculate_probability(batter, pitcher, "몸에 맞는 공", weather, *stats)
+    ground_out = KBO.calculate_probability(batter, pitcher, "땅볼 아웃", weather, *stats)
+    fly_out = KBO.calculate_probability(batter, pitcher, "플라이 아웃", weather, *stats)
+
+    hit_types = hit_type_distribution(batter)
+    probabilities = np.array(
+        [walk, strikeout] + [hit * p for p in hit_types] + [hit_by_pitch, ground_out, fly_out],
+        dtype=float,
+    )
+    return probabilities / probabilities.sum()
+
+
+def build_transition_table() -> Dict[str, np.ndarray]:
+    """
+    (결과, 베이스 상태, 아웃 수) -> (다음 베이스 상태, 다음 아웃 수, 득점) 표를 만든다.
+    베이스 상태는 1루=1, 2루=2, 3루=4 비트마스크.
+    KBO.get_transition_table 을 배열로 옮긴 것이므로 simulate_inning 과 항상 같다.
+    """
+    shape = (len(OUTCOMES), 8, 3)
+    next_bases = np.zeros(shape, dtype=np.int8)
+    next_outs = np.zeros(shape, dtype=np.int8)
+    runs = np.zeros(shape, dtype=np.int8)
+
+    transitions = KBO.get_transition_table()
+    for o, result in enumerate(OUTCOMES):
+        for mask in range(8):
+            for outs in range(3):
+                step = transitions[result][mask][outs]
+                next_bases[o, mask, outs] = step.next_mask
+                next_outs[o, mask, outs] = step.outs
+                runs[o, mask, outs] = step.runs
+
+    return {"next_bases": next_bases, "next_outs": next_outs, "runs": runs}
+
+
+_TRANSITIONS: Optional[Dict[str, np.ndarray]] = None
+
+
+def get_transition_table() -> Dict[str, np.ndarray]:
+    """전이표는 한 번만 만들고 재사용."""
+    global _TRANSITIONS
+    if _TRANSITIONS is None:
+        _TRANSITIONS = build_transition_table()
+    return _TRANSITIONS
+
+
+def half_inning_table(batting_team: List[Dict[str, Any]], pitcher: Dict[str, Any], weather: str,
+                      table: Optional[Any] = None) -> np.ndarray:
+    """타순별 누적 결과 확률표 (타자 수, 9). table(MatchupTable)이 있으면 그 값을 그대로 사용."""
+    if table is not None:
+        return np.array([table.distribution(batter, pitcher, weather) for batter in batting_team])
+    cumulative = np.cumsum([outcome_distribution(batter, pitcher, weather) for batter in batting_team], axis=1)
+    cumulative[:, -1] = 1.0  # 부동소수 오차로 1 보다 작아지는 것을 방지
+    return cumulative
+
+
+def value_ordered(cumulative: np.ndarray) -> np.ndarray:
+    """OUTCOMES 순서의 누적 확률을 VALUE_ORDER 순서의 누적 확률로 변환."""
+    ordered = np.cumsum(np.diff(cumulative, axis=-1, prepend=0.0)[..., VALUE_ORDER], axis=-1)
+    ordered[..., -1] = 1.0
+    return ordered
+
+
+def play_half_innings(cumulative: np.ndarray, n_games: int, rng: np.random.Generator,
+                      uniforms: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    n_games 개 경기의 같은 반 이닝을 동시에 진행하고 경기별 득점을 반환.
+    simulate_inning 과 같이 타순 첫 타자부터 시작해 3아웃 또는 타자 명단 소진 시 종료.
+    :param uniforms: (타순, n_games) 균등난수. 주면 rng 대신 타순 자리별로 고정된 난수를 VALUE_ORDER 순서로 쓴다 (공통 난수용).
+    """
+    table = get_transition_table()
+    next_bases, next_outs, runs_table = table["next_bases"], table["next_outs"], table["runs"]
+
+    bases = np.zeros(n_games, dtype=np.int8)
+    outs = np.zeros(n_games, dtype=np.int8)
+    runs = np.zeros(n_games, dtype=np.int32)
+    if uniforms is not None:
+        ordered, lookup = value_ordered(cumulative), np.array(VALUE_ORDER)
+
+    for slot in range(cumulative.shape[0]):
+        active = np.flatnonzero(outs < 3)
+        if active.size == 0:
+            break
+        # 진행 중인 모든 경기의 타석 결과를 한 번에 추첨
+        if uniforms is None:
+            outcome = np.searchsorted(cumulative[slot], rng.random(active.size), side="right")
+        else:
+            outcome = lookup[np.searchsorted(ordered[slot], uniforms[slot, active], side="right")]
+        b = bases[active]
+        o = outs[active]
+        runs[active] += runs_table[outcome, b, o]
+        bases[active] = next_bases[outcome, b, o]
+        outs[active] = next_outs[outcome, b, o]
+
+    return runs
+
+
+def simulate_games_batch(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, n_games: int,
+                         seed: Optional[int] = None, table: Optional[Any] = None,
+                         uniforms: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    팀1(초 공격)과 팀2(말 공격)의 9이닝 경기를 n_games 번 한꺼번에 시뮬레이션.
+    table(MatchupTable)을 넘기면 대결 확률을 다시 계산하지 않는다.
+    :param uniforms: (18 반 이닝, 타순, n_games) 균등난수 (variance.crn_uniforms). 주면 seed 는 쓰지 않는다.
+    :return: 경기별 점수 배열과 승/무/패 비율.
+    """
+    rng = np.random.default_rng(seed)
+    score_team1 = np.zeros(n_games, dtype=np.int32)
+    score_team2 = np.zeros(n_games, dtype=np.int32)
+
+    for inning in range(1, 10):
+        pitcher2 = KBO.select_pitcher(team2["pitchers"], inning)
+        top, bottom = (None, None) if uniforms is None else (uniforms[2 * inning - 2], uniforms[2 * inning - 1])
+        score_team1 += play_half_innings(half_inning_table(team1["batters"], pitcher2, weather, table), n_games, rng, top)
+        pitcher1 = KBO.select_pitcher(team1["pitchers"], inning)
+        score_team2 += play_half_innings(half_inning_table(team2["batters"], pitcher1, weather, table), n_games, rng, bottom)
+
+    return {
+        "team1": team1["team_name"],
+        "team2": team2["team_name"],
+        "weather": weather,
+        "n_games": n_games,
+        "team1_scores": score_team1,
+        "team2_scores": score_team2,
+        "team1_win_rate": float(np.mean(score_team1 > score_team2)),
+        "team2_win_rate": float(np.mean(score_team1 < score_team2)),
+        "draw_rate": float(np.mean(score_team1 == score_team2)),
+    }
@@ -0,0 +1,265 @@
+"""
+시뮬레이션 핵심 경로 벤치마크.
+
+simulate_at_bat / simulate_inning / simulate_game / 배치 엔진 / 데이터 로더 / auto_configure_teams 의
+처리량(초당 타석·경기 수), 로더 cold/warm 시간, 최대 메모리(RSS)를 측정한다.
+네트워크나 원본 xlsx 없이도 돌 수 있도록 합성 로스터를 만들어 쓰며(--data synthetic),
+결과를 JSON 기준선으로 저장하고 다음 실행에서 비교해 설정한 비율 이상 느려지면 실패(종료 코드 1)한다.
+
+    python bench.py --save bench_baseline.json
+    python bench.py --compare bench_baseline.json --threshold 0.2
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+import KBO
+from batch_sim import simulate_games_batch
+from matchup_table import build_matchup_table
+from roster_cache import save_roster_cache, load_roster_cache
+
+try:
+    import resource  # 윈도우에는 없음
+except ImportError:
+    resource = None
+
+POSITIONS = ["포수", "내야수", "외야수"]
+BATTER_COLUMNS = ["볼넷%", "삼진%", "wRC", "타율", "타수", "안타", "단타", "2루타", "3루타", "홈런"]
+PITCHER_COLUMNS = ["ERA", "볼넷/9", "삼진/9"]
+
+
+class CountingSink(KBO.EventSink):
+    """타석 수만 세는 싱크."""
+
+    def __init__(self):
+        self.plate_appearances = 0
+
+    def plate_appearance(self, batter: Dict[str, Any], pitcher: Dict[str, Any]):
+        self.plate_appearances += 1
+
+
+# --- 합성 로스터 ---
+def synthetic_players(n_teams: int = 10, batters_per_team: int = 24, starters_per_team: int = 7,
+                      relievers_per_team: int = 14, seed: int = 0) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """load_pitcher_data / load_batter_data 와 같은 형식의 가짜 선수 데이터 (투수, 타자)."""
+    rng = random.Random(seed)
+    pitchers, batters = [], []
+    for t in range(n_teams):
+        team = f"팀{t}"
+        for i in range(batters_per_team):
+            at_bats = rng.randint(50, 600)
+            average = rng.uniform(0.200, 0.350)
+            hits = int(at_bats * average)
+            doubles, triples, home_runs = int(hits * 0.18), int(hits * 0.02), int(hits * 0.1)
+            batters.append({
+                "name": f"{team}-타자{i}",
+                "team": team,
+                "position": POSITIONS[i % len(POSITIONS)],
+                "weather": rng.choice(KBO.WEATHER_OPTIONS),
+                "stats": {
+                    "볼넷%": rng.uniform(4, 15), "삼진%": rng.uniform(10, 30), "wRC": rng.uniform(5, 120),
+                    "타율": average, "타수": at_bats, "안타": hits, "단타": hits - doubles - triples - home_runs,
+                    "2루타": doubles, "3루타": triples, "홈런": home_runs,
+                },
+            })
+        for i in range(starters_per_team + relievers_per_team):
+            pitchers.append({
+                "name": f"{team}-투수{i}",
+                "team": team,
+                "position": "선발" if i < starters_per_team else "불펜",
+                "weather": rng.choice(KBO.WEATHER_OPTIONS),
+                "stats": {"ERA": rng.uniform(2.0, 7.0), "볼넷/9": rng.uniform(2.0, 5.5), "삼진/9": rng.uniform(5.0, 11.0)},
+            })
+    return pitchers, batters
+
+
+def write_synthetic_xlsx(players: List[Dict[str, Any]], path: str):
+    """합성 선수 데이터를 원본 xlsx 와 같은 열 이름(선수명/팀/포지션/날씨/스탯)으로 저장."""
+    import pandas as pd
+    rows = [{"선수명": p["name"], "팀": p["team"], "포지션": p["position"], "날씨": p["weather"], **p["stats"]}
+            for p in players]
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+# --- 측정 ---
+def measure(fn: Callable[[], Any], min_time: float = 0.2, repeat: int = 3) -> float:
+    """fn 한 번의 실행 시간(초). min_time 이상 반복한 묶음을 repeat 번 재서 가장 빠른 값을 쓴다."""
+    best = float("inf")
+    for _ in range(repeat):
+        n = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            n += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / n)
+    return best
+
+
+def peak_rss_mb() -> Optional[float]:
+    """프로세스 최대 RSS (MB). resource 모듈이 없으면 None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # macOS 는 바이트, 리눅스는 KB
+
+
+def quiet(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """print 출력을 버리는 래퍼 (auto_configure_teams 등)."""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapper
+
+
+def bench_engine(team1: Dict[str, Any], team2: Dict[str, Any], min_time: float = 0.2) -> Dict[str, float]:
+    """타석/이닝/경기/배치 엔진 처리량."""
+    weather = KBO.WEATHER_OPTIONS[0]
+    table = build_matchup_table({"team1": team1, "team2": team2})
+    batter, pitcher = team1["batters"][0], team2["pitchers"]["starters"][0]
+    rng = random.Random(0)
+
+    counter = CountingSink()
+    n_games = 200
+    for _ in range(n_games):
+        KBO.simulate_game(team1, team2, weather, None, counter, rng)
+    pa_per_game = counter.plate_appearances / n_games
+
+    results = {"pa_per_game": pa_per_game}
+    for label, tbl in (("", None), ("_table", table)):
+        results[f"at_bat{label}_pa_per_sec"] = 1.0 / measure(
+            lambda: KBO.simulate_at_bat(batter, pitcher, weather, tbl, rng), min_time)
+        results[f"inning{label}_per_sec"] = 1.0 / measure(
+            lambda: KBO.simulate_inning(team1["batters"], team2["pitchers"], 1, weather, tbl, KBO.NULL_SINK, rng), min_time)
+        game_rate = 1.0 / measure(lambda: KBO.simulate_game(team1, team2, weather, tbl, KBO.NULL_SINK, rng), min_time)
+        results[f"game{label}_per_sec"] = game_rate
+        results[f"game{label}_pa_per_sec"] = game_rate * pa_per_game
+
+    batch_games = 10000
+    results["batch_games_per_sec"] = batch_games / measure(
+        lambda: simulate_games_batch(team1, team2, weather, batch_games, seed=0, table=table), min_time)
+    return results
+
+
+def bench_loaders(pitcher_file: str, batter_file: str, min_time: float = 0.2) -> Dict[str, float]:
+    """xlsx 로더(cold)와 roster_cache 캐시 로드(warm) 시간."""
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label, path, loader in (("pitcher", pitcher_file, KBO.load_pitcher_data),
+                                    ("batter", batter_file, KBO.load_batter_data)):
+            players = loader(path)  # pandas import 비용은 측정에서 제외
+            results[f"load_{label}_cold_sec"] = measure(lambda: loader(path), min_time, repeat=1)
+            cache_file = os.path.join(cache_dir, os.path.basename(path) + ".npz")
+            save_roster_cache(players, path, cache_file)
+            results[f"load_{label}_warm_sec"] = measure(lambda: load_roster_cache(path, cache_file), min_time)
+    return results
+
+
+def bench_configure(team_data: Dict[str, Any], min_time: float = 0.2) -> Dict[str, float]:
+    return {"auto_configure_sec": measure(quiet(lambda: KBO.auto_configure_teams(team_data, None)), min_time)}
+
+
+def run_benchmarks(data: str = "synthetic", pitcher_file: Optional[str] = None, batter_file: Optional[str] = None,
+                   min_time: float = 0.2) -> Dict[str, Any]:
+    """
+    전체 벤치마크 실행.
+    :param data: "synthetic"(합성 로스터) 또는 "bundled"(저장소의 xlsx)
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        if data == "synthetic":
+            pitchers, batters = synthetic_players()
+            pitcher_file = os.path.join(work_dir, "pitchers.xlsx")
+            batter_file = os.path.join(work_dir, "batters.xlsx")
+            write_synthetic_xlsx(pitchers, pitcher_file)
+            write_synthetic_xlsx(batters, batter_file)
+        metrics = bench_loaders(pitcher_file, batter_file, min_time)
+        team_data = KBO.group_by_team(KBO.load_pitcher_data(pitcher_file), KBO.load_batter_data(batter_file))
+
+    metrics.update(bench_configure(team_data, min_time))
+    teams = list(quiet(lambda: KBO.auto_configure_teams(team_data, None))().values())
+    metrics.update(bench_engine(teams[0], teams[1], min_time))
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return {
+        "data": data,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "metrics": metrics,
+    }
+
+
+# --- 기준선 비교 ---
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_sec")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    기준선 대비 threshold(비율) 이상 나빠진 지표 목록.
+    초당 처리량(_per_sec)은 낮아지면, 시간(_sec)과 메모리(_mb)는 높아지면 나빠진 것으로 본다.
+    """
+    regressions = []
+    for metric, base in baseline["metrics"].items():
+        value = results["metrics"].get(metric)
+        if value is None or base is None or metric == "pa_per_game":
+            continue
+        change = (base - value) / base if higher_is_better(metric) else (value - base) / base
+        if change > threshold:
+            regressions.append({"metric": metric, "baseline": base, "value": value, "slowdown": change})
+    return regressions
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    print(f"\n--- 벤치마크 ({results['data']}, Python {results['python']}) ---")
+    for metric, value in results["metrics"].items():
+        line = f"{metric:<28} {value:>14.4f}" if value is not None else f"{metric:<28} {'-':>14}"
+        base = baseline["metrics"].get(metric) if baseline else None
+        if base:
+            line += f"   (기준선 {base:.4f}, {value / base - 1:+.1%})"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 시뮬레이션 벤치마크")
+    parser.add_argument("--data", choices=["synthetic", "bundled"], default="synthetic", help="로스터 종류")
+    parser.add_argument("--pitchers", default=None, help="--data bundled 일 때 투수 xlsx 경로")
+    parser.add_argument("--batters", default=None, help="--data bundled 일 때 타자 xlsx 경로")
+    parser.add_argument("--min-time", type=float, default=0.2, help="측정 묶음당 최소 시간(초)")
+    parser.add_argument("--save", default=None, help="결과를 저장할 기준선 JSON 경로")
+    parser.add_argument("--compare", default=None, help="비교할 기준선 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 성능 저하 비율")
+    args = parser.parse_args()
+
+    if args.data == "bundled":
+        from season import DEFAULT_PITCHER_FILE, DEFAULT_BATTER_FILE
+        args.pitchers = args.pitchers or DEFAULT_PITCHER_FILE
+        args.batters = args.batters or DEFAULT_BATTER_FILE
+
+    bench_results = run_benchmarks(args.data, args.pitchers, args.batters, args.min_time)
+    baseline_results = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline_results = json.load(f)
+    print_report(bench_results, baseline_results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(bench_results, f, ensure_ascii=False, indent=2)
+        print(f"\n기준선 저장: {args.save}")
+
+    if baseline_results is not None:
+        failed = compare(bench_results, baseline_results, args.threshold)
+        for r in failed:
+            print(f"성능 저하: {r['metric']} {r['baseline']:.4f} -> {r['value']:.4f} ({r['slowdown']:.1%})")
+        if failed:
+            sys.exit(1)
+        print(f"\n기준선 대비 {args.threshold:.0%} 이상 느려진 지표 없음")
@@ -0,0 +1,228 @@
+"""
+선수별 박스스코어/시즌 기록 누적.
+
+BoxScore 는 model.Roster 의 정수 ID 로 색인하는 정수 배열(타자 x 타격 기록, 투수 x 투구 기록)을 미리 잡아 두고,
+BoxScoreSink 가 simulate_game 이벤트를 받아 해당 칸만 1씩 올린다 (이벤트마다 dict/객체를 만들지 않음).
+시뮬레이션이 끝나면 배열을 박스스코어나 시즌 기록표(dict 리스트)로 바꾼다.
+"""
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+import KBO
+from model import Roster
+
+BATTING_STATS = ["PA", "AB", "H", "2B", "3B", "HR", "BB", "HBP", "K", "R", "RBI"]
+PITCHING_STATS = ["BF", "OUTS", "H", "HR", "BB", "HBP", "K", "R", "ER"]
+(PA, AB, H, B2, B3, HR, BB, HBP, K, R, RBI) = range(len(BATTING_STATS))
+(P_BF, P_OUTS, P_H, P_HR, P_BB, P_HBP, P_K, P_R, P_ER) = range(len(PITCHING_STATS))
+
+# 타석 결과별로 올릴 타자/투수 기록 열 (타석 수/상대 타자 수는 따로 센다)
+BATTER_RESULT_COLUMNS = {
+    "단타": (AB, H),
+    "2루타": (AB, H, B2),
+    "3루타": (AB, H, B3),
+    "홈런": (AB, H, HR),
+    "볼넷": (BB,),
+    "몸에 맞는 공": (HBP,),
+    "삼진": (AB, K),
+    "땅볼 아웃": (AB,),
+    "플라이 아웃": (AB,),
+}
+PITCHER_RESULT_COLUMNS = {
+    "단타": (P_H,),
+    "2루타": (P_H,),
+    "3루타": (P_H,),
+    "홈런": (P_H, P_HR),
+    "볼넷": (P_BB,),
+    "몸에 맞는 공": (P_HBP,),
+    "삼진": (P_K,),
+    "땅볼 아웃": (),
+    "플라이 아웃": (),
+}
+SCORING_RUNNER_EVENTS = ("홈인", "태그업", "희생타")
+
+
+class BoxScore:
+    """
+    Roster ID 로 색인하는 누적 기록 배열.
+    - batting: (타자 수, len(BATTING_STATS)) int64
+    - pitching: (투수 수, len(PITCHING_STATS)) int64
+    """
+
+    def __init__(self, roster: Roster):
+        self.roster = roster
+        self.batting = np.zeros((len(roster.batters), len(BATTING_STATS)), dtype=np.int64)
+        self.pitching = np.zeros((len(roster.pitchers), len(PITCHING_STATS)), dtype=np.int64)
+
+    def reset(self):
+        self.batting[:] = 0
+        self.pitching[:] = 0
+
+    def copy(self) -> "BoxScore":
+        box = BoxScore.__new__(BoxScore)
+        box.roster = self.roster
+        box.batting = self.batting.copy()
+        box.pitching = self.pitching.copy()
+        return box
+
+    def __sub__(self, other: "BoxScore") -> "BoxScore":
+        """두 시점 누적값의 차이 (예: 경기 전후 -> 한 경기 박스스코어)."""
+        box = self.copy()
+        box.batting -= other.batting
+        box.pitching -= other.pitching
+        return box
+
+    def merge(self, batting: np.ndarray, pitching: np.ndarray):
+        """다른 프로세스에서 모은 같은 Roster 기준 배열을 더한다."""
+        self.batting += batting
+        self.pitching += pitching
+
+    def batting_line(self, batter_id: int) -> Dict[str, Any]:
+        """타자 한 명의 기록 (타율/출루율/장타율 포함)."""
+        player = self.roster.batters[batter_id]
+        s = self.batting[batter_id]
+        singles = s[H] - s[B2] - s[B3] - s[HR]
+        total_bases = singles + 2 * s[B2] + 3 * s[B3] + 4 * s[HR]
+        on_base_chances = s[AB] + s[BB] + s[HBP]
+        line = {"name": player.name, "team": player.team, "position": player.position}
+        line.update({stat: int(v) for stat, v in zip(BATTING_STATS, s)})
+        line["AVG"] = s[H] / s[AB] if s[AB] else 0.0
+        line["OBP"] = (s[H] + s[BB] + s[HBP]) / on_base_chances if on_base_chances else 0.0
+        line["SLG"] = total_bases / s[AB] if s[AB] else 0.0
+        return line
+
+    def pitching_line(self, pitcher_id: int) -> Dict[str, Any]:
+        """투수 한 명의 기록 (이닝은 아웃 수 / 3, 평균자책점 = 자책점 x 9 / 이닝)."""
+        player = self.roster.pitchers[pitcher_id]
+        s = self.pitching[pitcher_id]
+        innings = s[P_OUTS] / 3
+        line = {"name": player.name, "team": player.team, "position": player.position}
+        line.update({stat: int(v) for stat, v in zip(PITCHING_STATS, s)})
+        line["IP"] = f"{s[P_OUTS] // 3}.{s[P_OUTS] % 3}"  # 야구식 이닝 표기 (5.2 = 5와 2/3이닝)
+        line["ERA"] = s[P_ER] * 9 / innings if innings else 0.0
+        return line
+
+    def batting_table(self, team: Optional[str] = None, min_pa: int = 1) -> List[Dict[str, Any]]:
+        """타석이 min_pa 이상인 타자들의 기록 (team 을 주면 그 팀만)."""
+        ids = np.flatnonzero(self.batting[:, PA] >= min_pa).tolist()
+        lines = [self.batting_line(i) for i in ids]
+        return [line for line in lines if team is None or line["team"] == team]
+
+    def pitching_table(self, team: Optional[str] = None, min_outs: int = 0) -> List[Dict[str, Any]]:
+        """등판해서 아웃을 min_outs 개 이상 잡은 투수들의 기록 (team 을 주면 그 팀만)."""
+        ids = np.flatnonzero((self.pitching[:, P_BF] > 0) & (self.pitching[:, P_OUTS] >= min_outs)).tolist()
+        lines = [self.pitching_line(i) for i in ids]
+        return [line for line in lines if team is None or line["team"] == team]
+
+    def scaled(self, factor: float) -> "BoxScore":
+        """여러 시즌 누적값을 시즌 평균 등으로 나눌 때 사용 (반올림한 정수)."""
+        box = self.copy()
+        box.batting = np.rint(self.batting * factor).astype(np.int64)
+        box.pitching = np.rint(self.pitching * factor).astype(np.int64)
+        return box
+
+
+def print_batting_table(lines: List[Dict[str, Any]], limit: Optional[int] = None):
+    print(f"\n{'이름':<8} {'팀':<5} {'타석':>5} {'타수':>5} {'안타':>5} {'2루타':>5} {'3루타':>5} {'홈런':>4} "
+          f"{'볼넷':>4} {'삼진':>4} {'득점':>4} {'타점':>4} {'타율':>6} {'출루율':>6} {'장타율':>6}")
+    print("-" * 110)
+    for line in lines[:limit]:
+        print(f"{line['name']:<8} {line['team']:<5} {line['PA']:>5} {line['AB']:>5} {line['H']:>5} {line['2B']:>5} "
+              f"{line['3B']:>5} {line['HR']:>4} {line['BB']:>4} {line['K']:>4} {line['R']:>4} {line['RBI']:>4} "
+              f"{line['AVG']:>6.3f} {line['OBP']:>6.3f} {line['SLG']:>6.3f}")
+
+
+def print_pitching_table(lines: List[Dict[str, Any]], limit: Optional[int] = None):
+    print(f"\n{'이름':<8} {'팀':<5} {'이닝':>7} {'타자':>5} {'피안타':>5} {'피홈런':>5} {'볼넷':>4} {'삼진':>4} "
+          f"{'실점':>4} {'자책':>4} {'ERA':>6}")
+    print("-" * 85)
+    for line in lines[:limit]:
+        print(f"{line['name']:<8} {line['team']:<5} {line['IP']:>7} {line['BF']:>5} {line['H']:>5} {line['HR']:>5} "
+              f"{line['BB']:>4} {line['K']:>4} {line['R']:>4} {line['ER']:>4} {line['ERA']:>6.2f}")
+
+
+class BoxScoreSink(KBO.EventSink):
+    """
+    simulate_game 이벤트로 BoxScore 배열을 채우는 싱크.
+    이벤트의 주자는 이름뿐이므로 베이스별로 주자의 타자 ID 를 따로 들고, 타석이 끝날 때마다 옮긴다
+    (주자는 서로 앞지르지 않으므로 이름이 같은 선수가 있어도 베이스 순서로 구분된다).
+    실책이 없는 모델이라 실점은 모두 자책점으로 센다.
+    병살타 때 들어온 득점은 타점으로 치지 않는다 (득점 이벤트가 "병살" 보다 먼저 오므로 그 타석의 타점을 되돌린다).
+    """
+
+    def __init__(self, box: BoxScore):
+        self.box = box
+        self.batting = box.batting
+        self.pitching = box.pitching
+        self._on_base = [None, None, None]  # 베이스별 주자 이름 (이벤트와 비교용)
+        self._base_ids = [None, None, None]  # 베이스별 주자의 타자 ID
+
+    def inning_start(self, inning: int, half: str):
+        self._on_base[0] = self._on_base[1] = self._on_base[2] = None
+        self._base_ids[0] = self._base_ids[1] = self._base_ids[2] = None
+        self._outs = 0
+
+    def pitcher_change(self, pitcher: Dict[str, Any], weather: str):
+        self._pitcher = self.box.roster.pitcher_id(pitcher)
+
+    def plate_appearance(self, batter: Dict[str, Any], pitcher: Dict[str, Any]):
+        self._batter = self.box.roster.batter_id(batter)
+        self._rbi = 0
+        self._double_play = False
+        self._scored = set()  # 이번 타석에 득점한 주자의 타석 전 베이스
+        self.batting[self._batter, PA] += 1
+        self.pitching[self._pitcher, P_BF] += 1
+
+    def at_bat_result(self, batter_name: str, result: str, outs: int):
+        batter, pitcher = self._batter, self._pitcher
+        for column in BATTER_RESULT_COLUMNS[result]:
+            self.batting[batter, column] += 1
+        for column in PITCHER_RESULT_COLUMNS[result]:
+            self.pitching[pitcher, column] += 1
+        self.pitching[pitcher, P_OUTS] += outs - self._outs
+        self._outs = outs
+        if result == "홈런":
+            # 홈런은 주자 이벤트 없이 모두 득점하므로 직전 베이스 상태로 처리
+            for base, runner_id in enumerate(self._base_ids):
+                if runner_id is not None:
+                    self._scored.add(base)
+                    self._score(runner_id)
+            self._score(batter)
+
+    def runner_event(self, kind: str, runner: Any):
+        if kind in SCORING_RUNNER_EVENTS:
+            # 득점 이벤트는 앞 베이스 주자부터 오므로 이름이 같은 주자 중 가장 앞 베이스부터 쓴다
+            base = next((b for b in (2, 1, 0) if b not in self._scored and self._on_base[b] == runner), None)
+            if base is not None:
+                self._scored.add(base)
+            self._score(None if base is None else self._base_ids[base])
+        elif kind == "병살":
+            self.batting[self._batter, RBI] -= self._rbi
+            self._rbi = 0
+            self._double_play = True
+
+    def _score(self, runner_id: Optional[int]):
+        if runner_id is not None:
+            self.batting[runner_id, R] += 1
+        if not self._double_play:
+            self.batting[self._batter, RBI] += 1
+            self._rbi += 1
+        self.pitching[self._pitcher, P_R] += 1
+        self.pitching[self._pitcher, P_ER] += 1
+
+    def bases_state(self, bases: List[Any]):
+        # 앞 베이스부터, 그 베이스 이하에서 가장 앞에 있던 같은 이름 주자를 옮긴다 (없으면 타자)
+        used = set(self._scored)
+        ids = [None, None, None]
+        for base in (2, 1, 0):
+            if bases[base] is None:
+                continue
+            source = next((b for b in range(base, -1, -1) if b not in used and self._on_base[b] == bases[base]), None)
+            if source is None:
+                ids[base] = self._batter
+            else:
+                used.add(source)
+                ids[base] = self._base_ids[source]
+        self._base_ids[0], self._base_ids[1], self._base_ids[2] = ids
+        self._on_base[0], self._on_base[1], self._on_base[2] = bases
@@ -0,0 +1,240 @@
+"""
+입력 없이 돌리는 일괄 시뮬레이션 명령.
+
+select_user_team 은 input() 으로 팀과 선수 25명을 묻기 때문에 자동 작업이나 병렬 워커에서 쓸 수 없다.
+이 명령은 팀/타순/선발·불펜 구성과 대진 목록을 JSON 또는 YAML 파일(spec)로 받고,
+대진마다 여러 경기를 돌려 승률과 평균 득점을 table/json/csv 로 출력한다.
+
+spec 예시 (JSON, YAML 도 같은 구조):
+
+    {
+      "teams": {
+        "내 KIA": {"team": "KIA", "batters": ["김도영", ...], "starters": ["네일", ...], "relievers": [...]},
+        "LG 기본": {"team": "LG"}
+      },
+      "matchups": [
+        {"away": "내 KIA", "home": "LG 기본", "weather": "맑음", "games": 5000},
+        {"away": "삼성", "home": "내 KIA", "weather": "random"}
+      ],
+      "defaults": {"games": 1000, "weather": "맑음"}
+    }
+
+- teams 의 batters/starters/relievers 는 그 구단 선수 이름이며, 빠진 항목은 auto_configure_teams 구성으로 채운다.
+- 대진의 away/home 은 teams 의 이름이나 구단 이름(auto_configure_teams 구성)이다.
+- matchups 를 "all" 로 쓰거나 spec 대신 "auto" 를 주면 자동 구성 팀끼리 모든 대진(홈/원정 각각)을 돌린다.
+- weather 가 "random" 이면 시드로 정해지는 날씨를 쓴다.
+
+모든 대진은 같은 --seed 의 난수를 쓰므로 (공통 난수) 대진끼리 비교할 때 잡음이 작다.
+
+사용법: python cli.py --spec lineups.yaml --games 2000 --workers 4 --format csv --output result.csv
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+import KBO
+from matchup_cache import MatchupCache, matchup_key, simulate_matchup, ENGINES
+from rng_streams import game_rng
+from roster_cache import load_pitcher_data_cached, load_batter_data_cached
+from season import DEFAULT_PITCHER_FILE, DEFAULT_BATTER_FILE
+
+FORMATS = ("table", "json", "csv")
+OUTPUT_COLUMNS = ["away", "home", "weather", "games", "away_win_rate", "home_win_rate", "draw_rate",
+                  "away_runs", "home_runs"]
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """JSON 또는 YAML spec 파일을 읽는다 (YAML 은 PyYAML 이 있어야 한다)."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML spec 에는 PyYAML 이 필요합니다: pip install pyyaml (또는 JSON spec 사용)")
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def _pick(players: List[Dict[str, Any]], names: List[str], team_name: str, role: str) -> List[Dict[str, Any]]:
+    """이름 목록 순서대로 선수를 고른다 (같은 선수를 두 번 고르지 않는다)."""
+    picked = []
+    for name in names:
+        player = next((p for p in players if p["name"] == name and all(p is not q for q in picked)), None)
+        if player is None:
+            raise ValueError(f"{team_name} 팀 {role} 명단에 '{name}' 선수가 없습니다.")
+        picked.append(player)
+    return picked
+
+
+def build_team(team_data: Dict[str, Any], auto_teams: Dict[str, Any], spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    spec 한 팀 -> simulate_game 용 팀 dict.
+    :param spec: {"team": 구단, "batters": [...], "starters": [...], "relievers": [...]} (빠진 항목은 자동 구성)
+    """
+    team_name = spec.get("team")
+    if team_name not in team_data:
+        raise ValueError(f"알 수 없는 구단입니다: {team_name} (가능: {', '.join(team_data)})")
+    source, auto = team_data[team_name], auto_teams[team_name]
+    batters = _pick(source["batters"], spec["batters"], team_name, "타자") if "batters" in spec else auto["batters"]
+    starters = (_pick(source["pitchers"]["starters"], spec["starters"], team_name, "선발")
+                if "starters" in spec else auto["pitchers"]["starters"])
+    relievers = (_pick(source["pitchers"]["relievers"], spec["relievers"], team_name, "불펜")
+                 if "relievers" in spec else auto["pitchers"]["relievers"])
+    if not batters or not starters or not relievers:
+        raise ValueError(f"{team_name} 팀 구성에 타자/선발/불펜이 모두 있어야 합니다.")
+    return {"team_name": team_name, "batters": batters, "pitchers": {"starters": starters, "relievers": relievers}}
+
+
+def resolve_matchups(spec: Dict[str, Any], team_data: Dict[str, Any], games: Optional[int] = None,
+                     weather: Optional[str] = None, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    spec -> 실행할 대진 목록 [{"away", "home", "weather", "games"}] (away/home 은 팀 dict).
+    games/weather 를 주면 spec 의 defaults 보다 우선한다 (대진별 값이 있으면 그 값을 쓴다).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):  # 자동 구성 진행 메시지는 버린다
+        auto_teams = {team["team_name"]: team for team in KBO.auto_configure_teams(team_data, None).values()}
+    teams = dict(auto_teams)
+    for label, team_spec in (spec.get("teams") or {}).items():
+        teams[label] = build_team(team_data, auto_teams, team_spec)
+
+    defaults = spec.get("defaults") or {}
+    default_games = games or defaults.get("games", 1000)
+    default_weather = weather or defaults.get("weather", "random")
+
+    entries = spec.get("matchups", "all")
+    if entries == "all":
+        names = list(auto_teams)
+        entries = [{"away": away, "home": home} for away in names for home in names if away != home]
+
+    matchups = []
+    for i, entry in enumerate(entries):
+        for side in ("away", "home"):
+            if entry.get(side) not in teams:
+                raise ValueError(f"대진 {i + 1}: 알 수 없는 팀입니다: {entry.get(side)}")
+        match_weather = entry.get("weather", default_weather)
+        if match_weather == "random":
+            match_weather = KBO.get_random_weather(game_rng(seed, i))
+        elif match_weather not in KBO.WEATHER_OPTIONS:
+            raise ValueError(f"대진 {i + 1}: 날씨는 {KBO.WEATHER_OPTIONS} 또는 random 이어야 합니다.")
+        matchups.append({
+            "away": teams[entry["away"]],
+            "home": teams[entry["home"]],
+            "away_label": entry["away"],
+            "home_label": entry["home"],
+            "weather": match_weather,
+            "games": int(entry.get("games", default_games)),
+        })
+    return matchups
+
+
+def _run_matchup(job: tuple) -> Dict[str, Any]:
+    away, home, weather, games, engine, seed = job
+    return simulate_matchup(away, home, weather, games, engine, seed)
+
+
+def run_matchups(matchups: List[Dict[str, Any]], engine: str = "batch", seed: int = 0, workers: Optional[int] = 0,
+                 cache: Optional[MatchupCache] = None) -> List[Dict[str, Any]]:
+    """
+    대진들을 실행해 OUTPUT_COLUMNS 형식의 결과 행을 반환.
+    :param workers: 0 이면 현재 프로세스, None 이면 CPU 수만큼 프로세스
+    :param cache: 주면 같은 대진/경기 수/시드 결과를 다시 계산하지 않는다
+    """
+    jobs = [(m["away"], m["home"], m["weather"], m["games"], engine, seed) for m in matchups]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+    keys = [None] * len(jobs)
+    if cache is not None:
+        for i, job in enumerate(jobs):
+            keys[i] = matchup_key(*job)
+            results[i] = cache.get(keys[i])
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if workers == 0 or len(pending) <= 1:
+        computed = [_run_matchup(jobs[i]) for i in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            computed = list(executor.map(_run_matchup, [jobs[i] for i in pending]))
+    for i, result in zip(pending, computed):
+        results[i] = result
+        if cache is not None:
+            cache.put(keys[i], result)
+
+    rows = []
+    for matchup, result in zip(matchups, results):
+        rows.append({
+            "away": matchup["away_label"],
+            "home": matchup["home_label"],
+            "weather": matchup["weather"],
+            "games": matchup["games"],
+            "away_win_rate": result["team1_win_rate"],
+            "home_win_rate": result["team2_win_rate"],
+            "draw_rate": result["draw_rate"],
+            "away_runs": float(np.dot(np.arange(len(result["runs_team1"])), result["runs_team1"])),
+            "home_runs": float(np.dot(np.arange(len(result["runs_team2"])), result["runs_team2"])),
+        })
+    return rows
+
+
+def write_rows(rows: List[Dict[str, Any]], fmt: str, out):
+    """결과 행을 table/json/csv 형식으로 출력."""
+    if fmt == "json":
+        json.dump(rows, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+    elif fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        out.write(f"{'원정':<12} {'홈':<12} {'날씨':<4} {'경기':>7} {'원정승':>7} {'홈승':>7} {'무':>6} "
+                  f"{'원정득점':>7} {'홈득점':>7}\n")
+        out.write("-" * 86 + "\n")
+        for row in rows:
+            out.write(f"{row['away']:<12} {row['home']:<12} {row['weather']:<4} {row['games']:>7} "
+                      f"{row['away_win_rate']:>7.3f} {row['home_win_rate']:>7.3f} {row['draw_rate']:>6.3f} "
+                      f"{row['away_runs']:>7.2f} {row['home_runs']:>7.2f}\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KBO 대진 일괄 시뮬레이션 (입력 없이 spec 파일로 실행)")
+    parser.add_argument("--spec", default="auto", help="팀/대진 JSON 또는 YAML 파일, auto 면 자동 구성 팀 전체 대진")
+    parser.add_argument("--pitchers", default=DEFAULT_PITCHER_FILE, help="투수 데이터 xlsx 경로")
+    parser.add_argument("--batters", default=DEFAULT_BATTER_FILE, help="타자 데이터 xlsx 경로")
+    parser.add_argument("--games", type=int, default=None, help="대진별 경기 수 (spec 의 defaults 보다 우선)")
+    parser.add_argument("--weather", default=None, help="기본 날씨 (맑음/흐림/비옴/눈옴/random)")
+    parser.add_argument("--engine", choices=ENGINES, default="batch", help="batch: 배열 엔진, scalar: simulate_game")
+    parser.add_argument("--workers", type=int, default=0, help="프로세스 수 (0: 현재 프로세스)")
+    parser.add_argument("--seed", type=int, default=0, help="기준 시드")
+    parser.add_argument("--format", choices=FORMATS, default="table", help="출력 형식")
+    parser.add_argument("--output", default=None, help="출력 파일 (기본: 표준 출력)")
+    parser.add_argument("--cache", default=None, help="대진 결과 캐시 폴더 (matchup_cache)")
+    args = parser.parse_args(argv)
+
+    spec = {} if args.spec == "auto" else load_spec(args.spec)
+    team_data = KBO.group_by_team(load_pitcher_data_cached(args.pitchers), load_batter_data_cached(args.batters))
+    try:
+        matchups = resolve_matchups(spec, team_data, args.games, args.weather, args.seed)
+    except ValueError as e:
+        print(f"spec 오류: {e}", file=sys.stderr)
+        return 2
+
+    cache = MatchupCache(args.cache) if args.cache else None
+    rows = run_matchups(matchups, args.engine, args.seed, args.workers, cache)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            write_rows(rows, args.format, out)
+    else:
+        write_rows(rows, args.format, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+적응형 몬테카를로 대진 추정.
+
+고정된 경기 수를 돌리는 대신 경기 결과를 온라인 추정기(Welford 평균/분산, Wilson 구간)에 흘려 넣고,
+요청한 정밀도(신뢰구간 반폭)에 도달하면 바로 멈춘다. 경기는 점점 커지는 묶음(batch) 단위로 돌린다.
+묶음마다 (시드, 묶음 번호)로 난수 스트림이 정해지므로 결과는 재현된다.
+"""
+import math
+from statistics import NormalDist
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+
+import KBO
+from batch_sim import simulate_games_batch
+from rng_streams import game_rng, game_seed_sequence
+
+ENGINES = ("batch", "scalar")
+
+
+def z_value(confidence: float) -> float:
+    """양측 신뢰수준에 해당하는 표준정규 분위수 (0.95 -> 1.96)."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def wilson_interval(successes: float, n: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """이항 비율의 Wilson 점수 구간. n 이 0 이면 (0, 1)."""
+    if n == 0:
+        return 0.0, 1.0
+    z = z_value(confidence)
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class RunningStats:
+    """Welford 방식 온라인 평균/분산. 묶음 단위 추가는 Chan 의 병합 공식을 쓴다."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 편차 제곱합
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def update_batch(self, values: np.ndarray):
+        values = np.asarray(values, dtype=float)
+        n = values.size
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """표본 분산 (값이 2개 미만이면 0)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stderr(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count else float("inf")
+
+    def interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        half = z_value(confidence) * self.stderr
+        return self.mean - half, self.mean + half
+
+
+class MatchupEstimate:
+    """팀1 기준 승/무 비율과 득실차 추정기."""
+
+    def __init__(self, confidence: float = 0.95):
+        self.confidence = confidence
+        self.games = 0
+        self.wins = 0
+        self.draws = 0
+        self.run_diff = RunningStats()
+
+    def add(self, team1_scores: np.ndarray, team2_scores: np.ndarray):
+        team1_scores = np.asarray(team1_scores)
+        team2_scores = np.asarray(team2_scores)
+        self.games += team1_scores.size
+        self.wins += int(np.count_nonzero(team1_scores > team2_scores))
+        self.draws += int(np.count_nonzero(team1_scores == team2_scores))
+        self.run_diff.update_batch(team1_scores - team2_scores)
+
+    def win_interval(self) -> Tuple[float, float]:
+        return wilson_interval(self.wins, self.games, self.confidence)
+
+    def draw_interval(self) -> Tuple[float, float]:
+        return wilson_interval(self.draws, self.games, self.confidence)
+
+    def converged(self, precision: float, run_precision: Optional[float] = None) -> bool:
+        """승률 구간 반폭이 precision 이하이고 (주어졌다면) 득실차 구간 반폭이 run_precision 이하인지."""
+        low, high = self.win_interval()
+        if (high - low) / 2 > precision:
+            return False
+        if run_precision is not None:
+            low, high = self.run_diff.interval(self.confidence)
+            if (high - low) / 2 > run_precision:
+                return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "games": self.games,
+            "team1_win_rate": self.wins / self.games if self.games else None,
+            "draw_rate": self.draws / self.games if self.games else None,
+            "team1_win_interval": self.win_interval(),
+            "draw_interval": self.draw_interval(),
+            "run_diff_mean": self.run_diff.mean,
+            "run_diff_stderr": self.run_diff.stderr,
+            "run_diff_interval": self.run_diff.interval(self.confidence),
+            "confidence": self.confidence,
+        }
+
+
+def _scalar_batch(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, first_game: int, n_games: int,
+                  seed: int, table: Optional[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """simulate_game 을 n_games 번 돌린 점수 배열 (경기 번호별 독립 난수 스트림)."""
+    scores = np.zeros((2, n_games), dtype=np.int32)
+    for k in range(n_games):
+        result = KBO.simulate_game(team1, team2, weather, table, KBO.NULL_SINK, game_rng(seed, first_game + k))
+        scores[:, k] = result["score_team1"], result["score_team2"]
+    return scores[0], scores[1]
+
+
+def estimate_matchup(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, precision: float = 0.01,
+                     run_precision: Optional[float] = None, confidence: float = 0.95, initial_batch: int = 1000,
+                     growth: float = 2.0, max_games: int = 1_000_000, engine: str = "batch", seed: int = 0,
+                     table: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    팀1 대 팀2 대진을 정밀도에 도달할 때까지 적응적으로 시뮬레이션.
+    :param precision: 팀1 승률 Wilson 구간의 목표 반폭
+    :param run_precision: 득실차 평균 신뢰구간의 목표 반폭 (None 이면 보지 않음)
+    :param initial_batch: 첫 묶음 경기 수 (이후 growth 배씩 증가)
+    :param max_games: 최대 경기 수 (도달하면 converged=False 로 반환)
+    :param engine: "batch"(batch_sim 배치 엔진) 또는 "scalar"(simulate_game 반복)
+    :return: MatchupEstimate.to_dict() 에 팀 이름, 묶음 수, 수렴 여부를 더한 dict
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine 은 {ENGINES} 중 하나여야 합니다.")
+    if initial_batch < 1:
+        raise ValueError("initial_batch 는 1 이상이어야 합니다.")
+    if growth < 1:
+        raise ValueError("growth 는 1 이상이어야 합니다 (묶음 크기가 0 으로 줄면 끝나지 않음).")
+    estimate = MatchupEstimate(confidence)
+    batch_size, batches = initial_batch, 0
+    converged = False
+
+    while estimate.games < max_games:
+        n = min(int(batch_size), max_games - estimate.games)
+        if engine == "batch":
+            result = simulate_games_batch(team1, team2, weather, n, game_seed_sequence(seed, batches), table)
+            estimate.add(result["team1_scores"], result["team2_scores"])
+        else:
+            estimate.add(*_scalar_batch(team1, team2, weather, estimate.games, n, seed, table))
+        batches += 1
+        if estimate.converged(precision, run_precision):
+            converged = True
+            break
+        batch_size *= growth
+
+    return {
+        "team1": team1["team_name"],
+        "team2": team2["team_name"],
+        "weather": weather,
+        **estimate.to_dict(),
+        "batches": batches,
+        "converged": converged,
+    }
@@ -0,0 +1,301 @@
+"""
+선수 수정(트레이드, 스탯, 타순) 후 바뀐 부분만 다시 계산하는 증분 평가.
+
+선수 한 명을 바꿀 때마다 auto_configure_teams 와 모든 대진을 처음부터 다시 돌리는 대신,
+중간 결과를 그 결과가 의존하는 선수 목록과 함께 저장해 둔다.
+(날씨 반영 스탯은 KBO.get_weather_stats 가 따로 캐시하므로 여기서는 두지 않는다.)
+- 타석 결과 분포: (타자, 투수, 날씨) -> batch_sim.outcome_distribution
+- 반 이닝 득점 분포: (타순, 투수, 날씨) -> markov.half_inning_distribution
+- 팀 경기 득점 분포: (공격 타순, 수비 1~9회 투수, 날씨) -> 9이닝 합성
+- 대진 결과: (팀1 타순/투수, 팀2 타순/투수, 날씨) -> 승/무/패, 기대 득점 (markov.game_distribution 과 같은 값)
+선수를 수정하면 그 선수에 의존하는 항목만 지우고, 그 선수의 구단만 다시 자동 구성한다.
+키는 선수 객체(id) 단위라 타순이 바뀐 팀은 자연히 새 키가 되고, 안 바뀐 팀끼리의 대진은 그대로 재사용된다.
+구성이 바뀐 뒤에는 지금 팀 구성에 없는 타순/투수로 만든 항목을 지운다.
+
+    model = IncrementalModel(team_data)
+    model.matchup("KIA", "LG", "맑음")
+    model.edit_player("KIA", "김도영", stats={"타율": 0.300})
+    model.matchup("KIA", "LG", "맑음")   # KIA 선수가 들어간 항목만 다시 계산
+"""
+import contextlib
+import io
+from collections import defaultdict
+from typing import List, Dict, Any, Callable, Hashable, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+import KBO
+import markov
+from batch_sim import outcome_distribution
+from cli import build_team
+
+LAYERS = ["outcome", "half_inning", "team_runs", "matchup"]
+
+
+class DependencyCache:
+    """
+    값마다 의존하는 선수(id)를 기록하는 캐시. invalidate(선수)로 그 선수에 의존하는 값만 지운다.
+    선수 객체는 그 선수에 의존하는 항목이 남아 있는 동안만 붙잡아 두어(항목 수로 참조 계수)
+    id 가 다른 객체에 재사용되지 않게 한다.
+    """
+
+    def __init__(self):
+        self.values: Dict[Hashable, Any] = {}
+        self._deps: Dict[Hashable, Tuple[int, ...]] = {}
+        self._dependents: Dict[int, Set[Hashable]] = defaultdict(set)
+        self._pins: Dict[int, List[Any]] = {}  # id(선수) -> [선수, 의존 항목 수]
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.computed: Dict[str, int] = defaultdict(int)
+
+    def get(self, key: Tuple, players: Iterable[Dict[str, Any]], compute: Callable[[], Any]) -> Any:
+        """key 의 값 (없으면 compute() 로 계산해 players 의존성과 함께 저장). key[0] 은 층 이름."""
+        value = self.values.get(key)
+        if value is not None:
+            self.hits[key[0]] += 1
+            return value
+        value = compute()
+        self.computed[key[0]] += 1
+        players = list(players)
+        deps = tuple({id(player): player for player in players})
+        pinned = {id(player): player for player in players}
+        self.values[key] = value
+        self._deps[key] = deps
+        for dep in deps:
+            self._dependents[dep].add(key)
+            pin = self._pins.setdefault(dep, [pinned[dep], 0])
+            pin[1] += 1
+        return value
+
+    def _remove(self, key: Hashable):
+        """항목 하나를 지우고 의존 선수의 참조 수를 줄인다."""
+        del self.values[key]
+        for dep in self._deps.pop(key):
+            dependents = self._dependents[dep]
+            dependents.discard(key)
+            if not dependents:
+                del self._dependents[dep]
+            pin = self._pins[dep]
+            pin[1] -= 1
+            if not pin[1]:
+                del self._pins[dep]
+
+    def invalidate(self, player: Dict[str, Any]) -> int:
+        """player 에 의존하는 값을 모두 지우고 지운 개수를 반환."""
+        keys = list(self._dependents.get(id(player), ()))
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def evict(self, keep: Callable[[Tuple], bool]) -> int:
+        """keep(key) 가 거짓인 항목을 모두 지우고 지운 개수를 반환."""
+        keys = [key for key in self.values if not keep(key)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        self.values.clear()
+        self._deps.clear()
+        self._dependents.clear()
+        self._pins.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        sizes = defaultdict(int)
+        for key in self.values:
+            sizes[key[0]] += 1
+        return {layer: {"entries": sizes[layer], "hits": self.hits[layer], "computed": self.computed[layer]}
+                for layer in LAYERS}
+
+
+def _pitchers_by_inning(team: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [KBO.select_pitcher(team["pitchers"], inning) for inning in range(1, 10)]
+
+
+class IncrementalModel:
+    """
+    팀 데이터(group_by_team) 위의 증분 대진 평가.
+    팀은 처음에 auto_configure_teams 로 구성하고, set_lineup 으로 직접 정한 팀은 수정 후에도 그 구성을 유지한다.
+    """
+
+    def __init__(self, team_data: Dict[str, Any]):
+        self.team_data = team_data
+        self.cache = DependencyCache()
+        self.teams: Dict[str, Dict[str, Any]] = {}
+        self._manual: Dict[str, Dict[str, Any]] = {}
+        for team_name in team_data:
+            self._configure(team_name)
+
+    def _reconfigure(self, *team_names: str):
+        """구단들을 다시 구성하고, 지금 구성에 없는 타순/투수로 만든 항목을 지운다."""
+        for team_name in team_names:
+            self._configure(team_name)
+        self._evict_stale()
+
+    def _evict_stale(self) -> int:
+        lineups = {tuple(id(batter) for batter in team["batters"]) for team in self.teams.values()}
+        rotations = {tuple(id(pitcher) for pitcher in _pitchers_by_inning(team)) for team in self.teams.values()}
+        batters = {batter for lineup in lineups for batter in lineup}
+        pitchers = {pitcher for rotation in rotations for pitcher in rotation}
+
+        def keep(key: Tuple) -> bool:
+            layer = key[0]
+            if layer == "outcome":
+                return key[1] in batters and key[2] in pitchers
+            if layer == "half_inning":
+                return key[1] in lineups and key[2] in pitchers
+            if layer == "team_runs":
+                return key[1] in lineups and key[2] in rotations
+            return key[1] in lineups and key[2] in rotations and key[3] in lineups and key[4] in rotations
+        return self.cache.evict(keep)
+
+    def _configure(self, team_name: str):
+        """한 구단만 다시 구성 (직접 정한 구성이 있으면 그 이름들로 다시 고른다)."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            auto = {team["team_name"]: team for team in
+                    KBO.auto_configure_teams({team_name: self.team_data[team_name]}, None).values()}
+        if not auto:
+            self.teams.pop(team_name, None)
+            return
+        spec = self._manual.get(team_name)
+        self.teams[team_name] = auto[team_name] if spec is None else build_team(self.team_data, auto, spec)
+
+    # --- 캐시되는 계산 층 ---
+    def outcome(self, batter: Dict[str, Any], pitcher: Dict[str, Any], weather: str) -> np.ndarray:
+        """타자 vs 투수의 9가지 결과 확률 (batch_sim.OUTCOMES 순서)."""
+        return self.cache.get(("outcome", id(batter), id(pitcher), weather), [batter, pitcher],
+                              lambda: outcome_distribution(batter, pitcher, weather))
+
+    def half_inning(self, batters: List[Dict[str, Any]], pitcher: Dict[str, Any], weather: str) -> np.ndarray:
+        """타순이 pitcher 를 상대로 한 반 이닝 득점 분포."""
+        def compute():
+            # markov.outcome_probabilities 와 같은 반올림 처리 (누적 후 마지막 값을 1 로)
+            cumulative = np.cumsum([self.outcome(batter, pitcher, weather) for batter in batters], axis=1)
+            cumulative[:, -1] = 1.0
+            return markov.half_inning_distribution(np.diff(cumulative, axis=1, prepend=0.0))
+        key = ("half_inning", tuple(id(batter) for batter in batters), id(pitcher), weather)
+        return self.cache.get(key, batters + [pitcher], compute)
+
+    def team_runs(self, batting: Dict[str, Any], pitching: Dict[str, Any], weather: str) -> np.ndarray:
+        """batting 팀이 pitching 팀을 상대로 9이닝 동안 내는 득점 분포."""
+        batters, pitchers = batting["batters"], _pitchers_by_inning(pitching)
+
+        def compute():
+            game = np.array([1.0])
+            for pitcher in pitchers:
+                game = np.convolve(game, self.half_inning(batters, pitcher, weather))
+            return game
+        key = ("team_runs", tuple(id(batter) for batter in batters), tuple(id(p) for p in pitchers), weather)
+        return self.cache.get(key, batters + pitchers, compute)
+
+    def matchup(self, team1_name: str, team2_name: str, weather: str) -> Dict[str, Any]:
+        """팀1(초 공격) vs 팀2(말 공격) 결과 확률과 기대 득점."""
+        team1, team2 = self.teams[team1_name], self.teams[team2_name]
+        pitchers1, pitchers2 = _pitchers_by_inning(team1), _pitchers_by_inning(team2)
+
+        def compute():
+            runs1, runs2 = self.team_runs(team1, team2, weather), self.team_runs(team2, team1, weather)
+            joint = np.outer(runs1, runs2)
+            team1_win, draw = float(np.tril(joint, -1).sum()), float(np.trace(joint))
+            return {
+                "team1": team1_name,
+                "team2": team2_name,
+                "weather": weather,
+                "team1_win_rate": team1_win,
+                "draw_rate": draw,
+                "team2_win_rate": max(0.0, 1.0 - team1_win - draw),
+                "expected_runs_team1": markov.expected_value(runs1),
+                "expected_runs_team2": markov.expected_value(runs2),
+            }
+        key = ("matchup", tuple(id(batter) for batter in team1["batters"]), tuple(id(p) for p in pitchers1),
+               tuple(id(batter) for batter in team2["batters"]), tuple(id(p) for p in pitchers2), weather)
+        return self.cache.get(key, team1["batters"] + pitchers1 + team2["batters"] + pitchers2, compute)
+
+    def all_matchups(self, weathers: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """모든 (팀1, 팀2, 날씨) 대진."""
+        names = list(self.teams)
+        return [self.matchup(team1, team2, weather) for weather in (weathers or KBO.WEATHER_OPTIONS)
+                for team1 in names for team2 in names if team1 != team2]
+
+    # --- 수정 ---
+    def _players_named(self, team_name: str, player_name: str) -> List[Dict[str, Any]]:
+        """구단의 그 이름 선수 객체 전부 (선발/불펜 양쪽 명단에 있는 투수는 두 개)."""
+        team = self.team_data[team_name]
+        players = team["batters"] + team["pitchers"]["starters"] + team["pitchers"]["relievers"]
+        found = [player for player in players if player["name"] == player_name]
+        if not found:
+            raise ValueError(f"{team_name} 팀에 '{player_name}' 선수가 없습니다.")
+        return found
+
+    def edit_player(self, team_name: str, player_name: str, stats: Optional[Dict[str, Any]] = None,
+                    weather: Optional[str] = None) -> int:
+        """
+        선수 스탯/선호 날씨를 바꾸고 그 선수에 의존하는 항목만 무효화.
+        :return: 지운 캐시 항목 수
+        """
+        removed = 0
+        for player in self._players_named(team_name, player_name):
+            if stats:
+                player["stats"].update(stats)
+            if weather is not None:
+                player["weather"] = weather
+            removed += self.cache.invalidate(player)
+        self._reconfigure(team_name)
+        return removed
+
+    def trade_player(self, player_name: str, from_team: str, to_team: str) -> int:
+        """선수를 다른 구단으로 옮기고 두 구단만 다시 구성. :return: 지운 캐시 항목 수"""
+        if to_team not in self.team_data:
+            raise ValueError(f"알 수 없는 구단입니다: {to_team}")
+        removed = 0
+        source, target = self.team_data[from_team], self.team_data[to_team]
+        for player in self._players_named(from_team, player_name):
+            for roster, target_roster in ((source["batters"], target["batters"]),
+                                          (source["pitchers"]["starters"], target["pitchers"]["starters"]),
+                                          (source["pitchers"]["relievers"], target["pitchers"]["relievers"])):
+                if any(p is player for p in roster):
+                    roster[:] = [p for p in roster if p is not player]
+                    target_roster.append(player)
+            player["team"] = to_team
+            removed += self.cache.invalidate(player)
+        spec = self._manual.get(from_team)
+        for role in ("batters", "starters", "relievers"):
+            if spec and role in spec:  # 직접 정한 구성에서도 뺀다
+                spec[role] = [name for name in spec[role] if name != player_name]
+        self._reconfigure(from_team, to_team)
+        return removed
+
+    def set_lineup(self, team_name: str, batters: Optional[List[str]] = None, starters: Optional[List[str]] = None,
+                   relievers: Optional[List[str]] = None):
+        """타순/선발/불펜을 이름으로 직접 정한다 (빠진 항목은 자동 구성). 바뀐 타순은 새 키라 기존 항목은 그대로 둔다."""
+        spec = {"team": team_name}
+        for role, names in (("batters", batters), ("starters", starters), ("relievers", relievers)):
+            if names is not None:
+                spec[role] = list(names)
+        self._manual[team_name] = spec
+        self._reconfigure(team_name)
+
+    def reset_lineup(self, team_name: str):
+        """set_lineup 을 취소하고 자동 구성으로 되돌린다."""
+        self._manual.pop(team_name, None)
+        self._reconfigure(team_name)
+
+
+if __name__ == "__main__":
+    import time
+    from roster_cache import load_pitcher_data_cached, load_batter_data_cached
+    from season import DEFAULT_PITCHER_FILE, DEFAULT_BATTER_FILE
+
+    data = KBO.group_by_team(load_pitcher_data_cached(DEFAULT_PITCHER_FILE), load_batter_data_cached(DEFAULT_BATTER_FILE))
+    model = IncrementalModel(data)
+    started = time.perf_counter()
+    model.all_matchups()
+    print(f"전체 대진 계산: {time.perf_counter() - started:.2f}초")
+
+    team_name = next(iter(model.teams))
+    player = model.teams[team_name]["batters"][0]
+    started = time.perf_counter()
+    removed = model.edit_player(team_name, player["name"], stats={"타율": player["stats"]["타율"] + 0.02})
+    model.all_matchups()
+    print(f"{team_name} {player['name']} 수정 후 재계산: {time.perf_counter() - started:.2f}초 (무효화 {removed}개)")
+    for layer, layer_stats in model.cache.stats().items():
+        print(f"  {layer:<12} {layer_stats}")
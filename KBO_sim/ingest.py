@@ -0,0 +1,186 @@
+"""
+여러 시즌 선수 데이터 일괄 로드.
+
+load_pitcher_data / load_batter_data 는 2024 시즌 파일 하나씩만 읽고, 시트 전체를 읽은 뒤 iterrows 로 한 줄씩 처리한다.
+이 모듈은 폴더 안의 여러 시즌 .xlsx/.csv 파일을 프로세스(또는 스레드) 풀에서 동시에 읽는다.
+- 파일마다 로더가 실제로 쓰는 열(선수명, 팀, 포지션, 날씨, 스탯)만 읽고 (usecols), 열 단위로 선수 dict 를 만든다.
+- 팀 이름 정리(빈 값 제외, strip)와 선수 dict 형식은 기존 로더와 같다.
+- 시즌은 파일 이름의 연도(예: "KBO 2023 투수 종합지표.xlsx" -> 2023), 투수/타자 구분은 파일 이름("투수"/"타자") 또는 열 이름으로 정한다.
+- use_cache=True 면 roster_cache 의 .npz 캐시를 같이 쓴다.
+결과 선수 dict 에는 "season" 이 붙고, season_team_data 로 "2023 KIA" 같은 시즌별 팀 구성을 만들어 시대를 넘는 대진에 쓸 수 있다.
+
+사용법: python ingest.py 데이터폴더 --workers 8
+"""
+import argparse
+import glob
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import KBO
+from roster_cache import load_roster_cache, save_roster_cache
+
+# load_pitcher_data / load_batter_data 가 읽는 열
+BASE_COLUMNS = ["선수명", "팀", "포지션", "날씨"]
+PITCHER_STATS = ["ERA", "볼넷/9", "삼진/9"]
+BATTER_STATS = ["볼넷%", "삼진%", "wRC", "타율", "타수", "안타", "단타", "2루타", "3루타", "홈런"]
+STATS = {"pitcher": PITCHER_STATS, "batter": BATTER_STATS}
+
+SEASON_PATTERN = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)")
+CSV_ENCODINGS = ["utf-8-sig", "cp949"]
+FILE_PATTERNS = ["*.xlsx", "*.csv"]
+
+
+def season_of(path: str) -> int:
+    """파일 이름의 연도를 시즌으로 사용."""
+    match = SEASON_PATTERN.search(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"파일 이름에서 시즌(연도)을 찾을 수 없습니다: {path}")
+    return int(match.group(1))
+
+
+def _read_frame(path: str, columns: List[str], nrows: Optional[int] = None):
+    """필요한 열만 읽는다 (없는 열은 건너뜀)."""
+    import pandas as pd
+    wanted = set(columns)
+    usecols = lambda column: str(column).strip() in wanted
+    if path.lower().endswith(".csv"):
+        for encoding in CSV_ENCODINGS:
+            try:
+                frame = pd.read_csv(path, usecols=usecols, nrows=nrows, encoding=encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError(f"CSV 인코딩을 알 수 없습니다 ({', '.join(CSV_ENCODINGS)} 시도): {path}")
+    else:
+        frame = pd.read_excel(path, usecols=usecols, nrows=nrows)
+    frame.columns = [str(column).strip() for column in frame.columns]
+    return frame
+
+
+def kind_of(path: str) -> str:
+    """투수("pitcher")/타자("batter") 파일 구분. 파일 이름에 없으면 열 이름으로 판단."""
+    name = os.path.basename(path)
+    if "투수" in name:
+        return "pitcher"
+    if "타자" in name:
+        return "batter"
+    header = set(_read_frame(path, PITCHER_STATS + BATTER_STATS, nrows=0).columns)
+    if header & set(PITCHER_STATS):
+        return "pitcher"
+    if header & set(BATTER_STATS):
+        return "batter"
+    raise ValueError(f"투수/타자 파일인지 알 수 없습니다: {path}")
+
+
+def read_players(path: str, kind: str) -> List[Dict[str, Any]]:
+    """load_pitcher_data / load_batter_data 와 같은 선수 리스트를 필요한 열만 읽어 만든다."""
+    import pandas as pd
+    stat_names = STATS[kind]
+    frame = _read_frame(path, BASE_COLUMNS + stat_names)
+    missing = [column for column in BASE_COLUMNS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"{path}: 필수 열이 없습니다: {', '.join(missing)}")
+
+    columns = frame.to_dict("list")
+    stat_columns = [(stat, columns.get(stat)) for stat in stat_names]
+    players = []
+    for i, team_name in enumerate(columns["팀"]):
+        if pd.isna(team_name) or not str(team_name).strip():  # 빈 값 또는 공백 검사
+            continue
+        players.append({
+            "name": columns["선수명"][i],
+            "team": str(team_name).strip(),  # 공백 제거
+            "position": columns["포지션"][i],
+            "weather": columns["날씨"][i],
+            "stats": {stat: 0 if values is None else values[i] for stat, values in stat_columns},
+        })
+    return players
+
+
+def _load_file(path: str, kind: str, use_cache: bool) -> List[Dict[str, Any]]:
+    """워커에서 실행: 파일 하나를 (가능하면 캐시에서) 읽는다."""
+    players = load_roster_cache(path) if use_cache else None
+    if players is None:
+        players = read_players(path, kind)
+        if use_cache:
+            try:
+                save_roster_cache(players, path)
+            except OSError:
+                pass  # 읽기 전용 폴더면 캐시 없이 진행
+    return players
+
+
+def find_files(directory: str, patterns: Optional[List[str]] = None) -> List[str]:
+    """폴더 안의 선수 데이터 파일 (임시 파일 ~$... 제외)."""
+    paths = []
+    for pattern in patterns or FILE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(directory, pattern)))
+    return sorted(path for path in paths if not os.path.basename(path).startswith("~$"))
+
+
+def load_seasons(paths: List[str], workers: Optional[int] = None, executor: str = "process",
+                 use_cache: bool = True) -> Dict[int, Dict[str, List[Dict[str, Any]]]]:
+    """
+    여러 파일을 동시에 읽어 시즌별 선수 리스트로 모은다.
+    :param executor: "process"(기본, 엑셀 파싱이 CPU 작업이라) 또는 "thread"
+    :return: {시즌: {"pitchers": [...], "batters": [...]}}, 선수 dict 에는 "season" 이 붙는다
+    """
+    jobs: List[Tuple[str, str, int]] = [(path, kind_of(path), season_of(path)) for path in paths]
+    if executor == "process":
+        pool_class = ProcessPoolExecutor
+    elif executor == "thread":
+        pool_class = ThreadPoolExecutor
+    else:
+        raise ValueError("executor 는 'process' 또는 'thread' 여야 합니다.")
+
+    if workers == 0 or len(jobs) <= 1:
+        loaded = [_load_file(path, kind, use_cache) for path, kind, _ in jobs]
+    else:
+        with pool_class(max_workers=workers) as pool:
+            loaded = list(pool.map(_load_file, [job[0] for job in jobs], [job[1] for job in jobs],
+                                   [use_cache] * len(jobs)))
+
+    seasons: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+    for (path, kind, season), players in zip(jobs, loaded):
+        roster = seasons.setdefault(season, {"pitchers": [], "batters": []})
+        for player in players:
+            player["season"] = season
+        roster["pitchers" if kind == "pitcher" else "batters"].extend(players)
+    return dict(sorted(seasons.items()))
+
+
+def load_directory(directory: str, workers: Optional[int] = None, executor: str = "process",
+                   use_cache: bool = True) -> Dict[int, Dict[str, List[Dict[str, Any]]]]:
+    """폴더 안의 모든 .xlsx/.csv 시즌 파일을 읽는다 (load_seasons 참고)."""
+    paths = find_files(directory)
+    if not paths:
+        raise ValueError(f"선수 데이터 파일이 없습니다: {directory}")
+    return load_seasons(paths, workers, executor, use_cache)
+
+
+def season_team_data(seasons: Dict[int, Dict[str, List[Dict[str, Any]]]]) -> Dict[str, Any]:
+    """시즌별 group_by_team 결과를 "시즌 팀" 이름(예: "2023 KIA")으로 합친 팀 데이터."""
+    team_data = {}
+    for season, roster in seasons.items():
+        for team_name, team in KBO.group_by_team(roster["pitchers"], roster["batters"]).items():
+            label = f"{season} {team_name}"
+            team_data[label] = {**team, "team_name": label}
+    return team_data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여러 시즌 선수 데이터 일괄 로드")
+    parser.add_argument("directory", help="시즌별 .xlsx/.csv 파일이 있는 폴더")
+    parser.add_argument("--workers", type=int, default=None, help="동시에 읽을 파일 수 (0: 순서대로)")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process", help="풀 종류")
+    parser.add_argument("--no-cache", action="store_true", help="roster_cache 를 쓰지 않는다")
+    args = parser.parse_args()
+
+    loaded = load_directory(args.directory, args.workers, args.executor, not args.no_cache)
+    for season, roster in loaded.items():
+        print(f"{season} 시즌: 투수 {len(roster['pitchers'])}명, 타자 {len(roster['batters'])}명")
+    teams = season_team_data(loaded)
+    print(f"시즌별 팀 {len(teams)}개: {', '.join(teams)}")
@@ -0,0 +1,188 @@
+"""
+타순/투수진 최적화.
+
+auto_configure_teams 는 wRC 순으로 타자를 뽑을 뿐 타순을 따로 정하지 않는다.
+여기서는 auto_configure_teams 의 구성에서 시작해 타순 교체, 후보 선수 기용, 선발/불펜 순서 변경을
+이웃 후보로 삼는 담금질 기법(simulated annealing)으로 특정 상대/날씨에서의 기대 득점 또는 승률을 높인다.
+후보 평가는 markov.game_distribution 으로 정확히 계산하고, 같은 구성은 캐시하며,
+한 단계의 후보들은 프로세스 풀에서 나눠 평가한다.
+"""
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import KBO
+import markov
+from matchup_table import MatchupTable
+from model import Roster, Team, build_roster
+
+OBJECTIVES = ("win", "runs")
+
+# 워커 프로세스별 상태
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(batter_dicts: List[Dict[str, Any]], pitcher_dicts: List[Dict[str, Any]], opponent: Team,
+                 weather: str, home: bool, objective: str):
+    roster = Roster(batter_dicts, pitcher_dicts)
+    _worker["roster"] = roster
+    _worker["table"] = MatchupTable(roster.batter_dicts, roster.pitcher_dicts, [weather])
+    _worker["opponent"] = roster.team_to_dict(opponent)
+    _worker["weather"] = weather
+    _worker["home"] = home
+    _worker["objective"] = objective
+
+
+def _score(team: Team) -> float:
+    """현재 워커 설정으로 팀 구성 하나를 평가 (클수록 좋음)."""
+    roster, opponent = _worker["roster"], _worker["opponent"]
+    team_dict = roster.team_to_dict(team)
+    if _worker["home"]:
+        result = markov.game_distribution(opponent, team_dict, _worker["weather"], _worker["table"])
+        win, runs = result["team2_win_rate"], result["expected_runs_team2"]
+    else:
+        result = markov.game_distribution(team_dict, opponent, _worker["weather"], _worker["table"])
+        win, runs = result["team1_win_rate"], result["expected_runs_team1"]
+    if _worker["objective"] == "runs":
+        return runs
+    return win + 0.5 * result["draw_rate"]  # 무승부는 절반 승리로 계산
+
+
+def _score_many(teams: List[Team]) -> List[float]:
+    return [_score(team) for team in teams]
+
+
+def _swap(items: Tuple[int, ...], rng: random.Random) -> Tuple[int, ...]:
+    """두 자리를 맞바꾼 튜플."""
+    items = list(items)
+    i, j = rng.sample(range(len(items)), 2)
+    items[i], items[j] = items[j], items[i]
+    return tuple(items)
+
+
+def _replace(items: Tuple[int, ...], pool: List[int], rng: random.Random, fits=lambda old, new: True) -> Tuple[int, ...]:
+    """items 중 하나를 pool 에서 아직 안 쓴 선수로 교체 (fits 조건을 만족하는 경우만)."""
+    unused = [p for p in pool if p not in items]
+    i = rng.randrange(len(items))
+    candidates = [p for p in unused if fits(items[i], p)]
+    if not candidates:
+        return items
+    items = list(items)
+    items[i] = rng.choice(candidates)
+    return tuple(items)
+
+
+class LineupOptimizer:
+    """
+    한 팀의 타순/투수진을 상대 팀과 날씨에 맞춰 최적화.
+    :param roster: 리그 전체 Roster
+    :param team_pool: 해당 팀의 전체 선수 (group_by_team 의 팀 dict)
+    :param opponent: 상대 팀 구성 (dict)
+    :param home: True 면 말 공격(팀2)으로 평가
+    :param objective: "win"(승률) 또는 "runs"(기대 득점)
+    """
+
+    def __init__(self, roster: Roster, team_pool: Dict[str, Any], opponent: Dict[str, Any], weather: str,
+                 home: bool = False, objective: str = "win", workers: Optional[int] = None, seed: int = 0):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective 는 {OBJECTIVES} 중 하나여야 합니다.")
+        self.roster = roster
+        self.batter_pool = [roster.batter_id(b) for b in team_pool["batters"]]
+        self.starter_pool = [roster.pitcher_id(p) for p in team_pool["pitchers"]["starters"]]
+        self.reliever_pool = [roster.pitcher_id(p) for p in team_pool["pitchers"]["relievers"]]
+        self.rng = random.Random(seed)
+        self.cache: Dict[Team, float] = {}
+        init_args = (roster.batter_dicts, roster.pitcher_dicts, roster.team_from_dict(opponent), weather, home, objective)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        if self.workers == 0:
+            _init_worker(*init_args)  # 현재 프로세스에서 바로 평가
+            self.pool = None
+        else:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=init_args)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def evaluate(self, teams: List[Team]) -> List[float]:
+        """후보들을 평가 (캐시에 없는 것만 계산하고, 나머지는 프로세스 풀에 나눠 보냄)."""
+        todo = list({team: None for team in teams if team not in self.cache})
+        if todo:
+            if self.pool is None:
+                scores = _score_many(todo)
+            else:
+                n_chunks = min(len(todo), self.workers)
+                chunks = [todo[i::n_chunks] for i in range(n_chunks)]
+                scores_by_team = {}
+                for chunk, chunk_scores in zip(chunks, self.pool.map(_score_many, chunks)):
+                    scores_by_team.update(zip(chunk, chunk_scores))
+                scores = [scores_by_team[team] for team in todo]
+            self.cache.update(zip(todo, scores))
+        return [self.cache[team] for team in teams]
+
+    def neighbor(self, team: Team) -> Team:
+        """타순 교체 / 후보 기용 / 선발·불펜 교체 중 하나를 무작위로 적용."""
+        move = self.rng.randrange(5)
+        batters, starters, relievers = team.batters, team.starters, team.relievers
+        if move <= 1:
+            batters = _swap(batters, self.rng)  # 타순 교체 (가장 자주)
+        elif move == 2:
+            position = {i: self.roster.batters[i].position for i in self.batter_pool}
+            batters = _replace(batters, self.batter_pool, self.rng, lambda old, new: position[old] == position[new])
+        elif move == 3:
+            starters = _swap(starters, self.rng) if self.rng.random() < 0.5 else _replace(starters, self.starter_pool, self.rng)
+        else:
+            relievers = _swap(relievers, self.rng) if self.rng.random() < 0.5 else _replace(relievers, self.reliever_pool, self.rng)
+        return Team(team.team_name, batters, starters, relievers)
+
+    def optimize(self, initial: Team, iterations: int = 200, batch_size: int = 16,
+                 start_temperature: float = 0.02, cooling: float = 0.97) -> Dict[str, Any]:
+        """
+        담금질 기법으로 구성을 개선.
+        매 단계 batch_size 개의 이웃을 한꺼번에 평가하고 그중 가장 좋은 후보를 메트로폴리스 기준으로 채택.
+        """
+        current = best = initial
+        current_score = best_score = initial_score = self.evaluate([initial])[0]
+        temperature = start_temperature
+
+        for _ in range(iterations):
+            candidates = [self.neighbor(current) for _ in range(batch_size)]
+            scores = self.evaluate(candidates)
+            candidate_score, candidate = max(zip(scores, candidates), key=lambda x: x[0])
+            delta = candidate_score - current_score
+            if delta > 0 or self.rng.random() < math.exp(delta / max(temperature, 1e-12)):
+                current, current_score = candidate, candidate_score
+                if current_score > best_score:
+                    best, best_score = current, current_score
+            temperature *= cooling
+
+        return {
+            "team": self.roster.team_to_dict(best),
+            "lineup": best,
+            "score": best_score,
+            "initial_score": initial_score,
+            "evaluations": len(self.cache),
+        }
+
+
+def optimize_team(team_data: Dict[str, Any], team_name: str, opponent: Dict[str, Any], weather: str,
+                  home: bool = False, objective: str = "win", iterations: int = 200, batch_size: int = 16,
+                  workers: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+    """
+    auto_configure_teams 의 구성을 시작점으로 team_name 팀을 opponent 상대로 최적화.
+    :param team_data: group_by_team 결과
+    :param opponent: auto_configure_teams / select_user_team 형식의 상대 팀
+    """
+    initial = next(team for team in KBO.auto_configure_teams(team_data, None).values()
+                   if team["team_name"] == team_name)
+    roster = build_roster(team_data, {"opponent": opponent})
+    with LineupOptimizer(roster, team_data[team_name], opponent, weather, home, objective, workers, seed) as optimizer:
+        return optimizer.optimize(roster.team_from_dict(initial), iterations, batch_size)
@@ -0,0 +1,143 @@
+"""
+베이스/아웃 상태 마르코프 체인으로 득점 분포를 정확히 계산하는 해석적 엔진.
+
+simulate_inning 의 반 이닝은 (베이스 8가지 x 아웃 0~2) 상태 위의 유한 상태 기계이고,
+타순 첫 타자부터 시작해 3아웃 또는 타자 명단 소진 시 끝난다.
+타순별 결과 확률(batch_sim.half_inning_table)과 주자 이동 전이표(batch_sim.get_transition_table)로
+상태 확률을 한 타석씩 전파하면 난수 없이 이닝/경기 득점 분포를 얻을 수 있다.
+"""
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+import KBO
+from batch_sim import OUTCOMES, get_transition_table, half_inning_table
+
+N_STATES = 24          # 베이스 비트마스크(8) x 아웃(3)
+END_STATE = N_STATES   # 3아웃 (흡수 상태)
+MAX_RUNS_PER_PA = 4    # 한 타석 최대 득점 (만루 홈런)
+
+_transition_tensor: Optional[np.ndarray] = None
+
+
+def state_index(bases: int, outs: int) -> int:
+    """(베이스 비트마스크, 아웃 수) -> 상태 번호."""
+    return bases + 8 * outs
+
+
+def transition_tensor() -> np.ndarray:
+    """
+    A[r, o, s, t] = 상태 s 에서 결과 o 가 나오면 상태 t 로 가며 r 점을 얻는지 (0/1).
+    3아웃 상태(END_STATE)는 그대로 머문다.
+    """
+    global _transition_tensor
+    if _transition_tensor is None:
+        table = get_transition_table()
+        tensor = np.zeros((MAX_RUNS_PER_PA + 1, len(OUTCOMES), N_STATES + 1, N_STATES + 1))
+        for o in range(len(OUTCOMES)):
+            for bases in range(8):
+                for outs in range(3):
+                    next_outs = table["next_outs"][o, bases, outs]
+                    target = END_STATE if next_outs >= 3 else state_index(table["next_bases"][o, bases, outs], next_outs)
+                    tensor[table["runs"][o, bases, outs], o, state_index(bases, outs), target] = 1.0
+            tensor[0, o, END_STATE, END_STATE] = 1.0
+        _transition_tensor = tensor
+    return _transition_tensor
+
+
+def outcome_probabilities(batting_team: List[Dict[str, Any]], pitcher: Dict[str, Any], weather: str,
+                          table: Optional[Any] = None) -> np.ndarray:
+    """타순별 9가지 결과 확률 (타자 수, 9)."""
+    cumulative = half_inning_table(batting_team, pitcher, weather, table)
+    return np.diff(cumulative, axis=1, prepend=0.0)
+
+
+def half_inning_distribution(probabilities: np.ndarray) -> np.ndarray:
+    """
+    반 이닝 득점 분포.
+    :param probabilities: 타순별 결과 확률 (타자 수, 9)
+    :return: dist[k] = k 점을 낼 확률
+    """
+    tensor = transition_tensor()
+    n_batters = probabilities.shape[0]
+    max_runs = MAX_RUNS_PER_PA * n_batters
+    state = np.zeros((N_STATES + 1, max_runs + 1))
+    state[state_index(0, 0), 0] = 1.0
+
+    for slot in range(n_batters):
+        # 득점 수별 상태 전이 행렬 M[r] = sum_o p_o * A[r, o]
+        moves = np.einsum("o,rost->rst", probabilities[slot], tensor)
+        next_state = np.zeros_like(state)
+        for r in range(MAX_RUNS_PER_PA + 1):
+            shifted = moves[r].T @ state
+            next_state[:, r:] += shifted[:, :max_runs + 1 - r]
+        state = next_state
+
+    # 3아웃이든 타자 명단 소진이든 이닝은 끝나므로 모든 상태를 합친다
+    return state.sum(axis=0)
+
+
+def run_expectancy(probabilities: np.ndarray) -> np.ndarray:
+    """
+    상태별 남은 이닝 기대 득점.
+    :return: (타순, 베이스, 아웃) 배열, 해당 타순 타자가 그 상황에서 타석에 설 때 이닝 끝까지의 기대 득점
+    """
+    tensor = transition_tensor()
+    runs = np.arange(MAX_RUNS_PER_PA + 1)
+    n_batters = probabilities.shape[0]
+    expected = np.zeros((n_batters + 1, N_STATES + 1))  # 마지막 행은 명단 소진 (0점)
+
+    for slot in range(n_batters - 1, -1, -1):
+        moves = np.einsum("o,rost->rst", probabilities[slot], tensor)
+        # 이번 타석 득점 + 다음 상태의 기대 득점
+        expected[slot] = np.einsum("r,rs->s", runs, moves.sum(axis=2)) + moves.sum(axis=0) @ expected[slot + 1]
+        expected[slot, END_STATE] = 0.0
+
+    return expected[:n_batters, :N_STATES].reshape(n_batters, 3, 8).transpose(0, 2, 1)
+
+
+def team_run_distribution(batting_team: Dict[str, Any], pitching_team: Dict[str, Any], weather: str,
+                          table: Optional[Any] = None) -> Dict[str, Any]:
+    """9이닝 동안 batting_team 이 pitching_team 을 상대로 내는 이닝별/경기 득점 분포."""
+    game = np.array([1.0])
+    innings = []
+    for inning in range(1, 10):
+        pitcher = KBO.select_pitcher(pitching_team["pitchers"], inning)
+        inning_dist = half_inning_distribution(outcome_probabilities(batting_team["batters"], pitcher, weather, table))
+        innings.append(inning_dist)
+        game = np.convolve(game, inning_dist)
+    return {"innings": innings, "game": game}
+
+
+def expected_value(distribution: np.ndarray) -> float:
+    return float(np.dot(np.arange(len(distribution)), distribution))
+
+
+def game_distribution(team1: Dict[str, Any], team2: Dict[str, Any], weather: str,
+                      table: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    simulate_game 과 같은 조건의 정확한 경기 결과 분포.
+    :return: 팀별 이닝/경기 득점 분포, 기대 득점, 팀1 승/무/패 확률
+    """
+    runs1 = team_run_distribution(team1, team2, weather, table)
+    runs2 = team_run_distribution(team2, team1, weather, table)
+    dist1, dist2 = runs1["game"], runs2["game"]
+
+    # joint[a, b] = 팀1 a점, 팀2 b점
+    joint = np.outer(dist1, dist2)
+    team1_win = float(np.tril(joint, -1).sum())
+    draw = float(np.trace(joint))
+    return {
+        "team1": team1["team_name"],
+        "team2": team2["team_name"],
+        "weather": weather,
+        "innings_team1": runs1["innings"],
+        "innings_team2": runs2["innings"],
+        "runs_team1": dist1,
+        "runs_team2": dist2,
+        "expected_runs_team1": expected_value(dist1),
+        "expected_runs_team2": expected_value(dist2),
+        "team1_win_rate": team1_win,
+        "draw_rate": draw,
+        "team2_win_rate": max(0.0, 1.0 - team1_win - draw),
+    }
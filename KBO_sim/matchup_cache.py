@@ -0,0 +1,254 @@
+"""
+대진 결과 캐시 (메모리 LRU + 디스크).
+
+auto_configure_teams 로 만든 같은 (타순, 투수진, 상대, 날씨) 조합은 여러 번 다시 요청되는데,
+요청마다 simulate_game 을 수천 번 다시 돌리는 대신 결과(승/무/패 확률, 팀별 득점 분포)를 저장해 둔다.
+
+키는 내용 기반 해시다. 두 팀의 타순별 타자와 이닝별로 실제 등판하는 투수의 날씨 반영 스탯(get_weather_stats),
+날씨, 엔진 종류/버전, 주자 이동 전이표, 경기 수, 시드를 SHA-256 으로 묶는다.
+선수 스탯이나 규칙이 바뀌면 키가 달라지므로 따로 무효화할 필요가 없다.
+
+메모리에는 최근 항목 memory_items 개를 두고, 디스크에는 키별 .npz 파일을 두며
+전체 크기가 max_bytes 를 넘으면 가장 오래 쓰지 않은 파일부터 지운다 (파일 수정 시각을 사용 시각으로 사용).
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+import KBO
+from batch_sim import simulate_games_batch
+from rng_streams import game_rng
+
+ENGINE_VERSION = 1  # 확률 모델이 바뀌면 올린다 (주자 이동 규칙은 전이표 해시로 자동 반영)
+ENGINES = ("batch", "scalar")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+# get_weather_stats 스냅샷별 해시. 원본 스탯이 그대로인 동안은 같은 스냅샷 객체이므로 객체와 함께 저장해 재사용한다
+_player_digests: Dict[int, Any] = {}
+_MAX_PLAYER_DIGESTS = 65536
+
+
+def player_digest(player: Dict[str, Any], weather: str, is_batter: bool) -> str:
+    """선수 이름과 날씨 반영 스탯의 해시."""
+    stats = KBO.get_weather_stats(player, weather, is_batter)
+    cached = _player_digests.get(id(stats))
+    if cached is not None and cached[0] is stats:
+        return cached[1]
+    values = [[name, float(value) if isinstance(value, (int, float, np.number)) else str(value)]
+              for name, value in sorted(stats.items())]
+    digest = hashlib.sha256(json.dumps([player["name"], values], ensure_ascii=False).encode()).hexdigest()
+    if len(_player_digests) >= _MAX_PLAYER_DIGESTS:
+        _player_digests.clear()
+    _player_digests[id(stats)] = (stats, digest)
+    return digest
+
+
+def team_fingerprint(team: Dict[str, Any], weather: str) -> List[Any]:
+    """경기 결과에 영향을 주는 팀 내용: 타순별 타자와 1~9회 투수의 (이름, 날씨 반영 스탯) 해시."""
+    batters = [player_digest(batter, weather, True) for batter in team["batters"]]
+    pitchers = [player_digest(KBO.select_pitcher(team["pitchers"], inning), weather, False) for inning in range(1, 10)]
+    return [team["team_name"], batters, pitchers]
+
+
+_rules_digest: Optional[str] = None
+
+
+def rules_digest() -> str:
+    """주자 이동 전이표의 해시 (규칙이 바뀌면 캐시 키도 바뀐다)."""
+    global _rules_digest
+    if _rules_digest is None:
+        table = KBO.get_transition_table()
+        rows = [[result, [[step[:4] for step in row] for row in table[result]]] for result in KBO.TRANSITION_RESULTS]
+        _rules_digest = hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+    return _rules_digest
+
+
+def matchup_key(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, n_games: int,
+                engine: str = "batch", seed: int = 0) -> str:
+    """대진 결과의 캐시 키 (SHA-256 16진 문자열)."""
+    payload = {
+        "engine": [engine, ENGINE_VERSION, rules_digest()],
+        "weather": weather,
+        "n_games": n_games,
+        "seed": seed,
+        "team1": team_fingerprint(team1, weather),
+        "team2": team_fingerprint(team2, weather),
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()).hexdigest()
+
+
+def simulate_matchup(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, n_games: int,
+                     engine: str = "batch", seed: int = 0) -> Dict[str, Any]:
+    """
+    대진을 n_games 번 시뮬레이션해 캐시에 저장할 결과를 만든다.
+    :return: 팀1 승/팀2 승/무승부 확률과 팀별 득점 분포(runs_team1[k] = k 점을 낸 경기 비율)
+    """
+    if engine == "batch":
+        result = simulate_games_batch(team1, team2, weather, n_games, seed=seed)
+        score1, score2 = result["team1_scores"], result["team2_scores"]
+    elif engine == "scalar":
+        scores = np.zeros((2, n_games), dtype=np.int32)
+        for k in range(n_games):
+            game = KBO.simulate_game(team1, team2, weather, sink=KBO.NULL_SINK, rng=game_rng(seed, k))
+            scores[:, k] = game["score_team1"], game["score_team2"]
+        score1, score2 = scores
+    else:
+        raise ValueError(f"engine 은 {ENGINES} 중 하나여야 합니다.")
+
+    return {
+        "team1": team1["team_name"],
+        "team2": team2["team_name"],
+        "weather": weather,
+        "n_games": n_games,
+        "team1_win_rate": float(np.mean(score1 > score2)),
+        "team2_win_rate": float(np.mean(score1 < score2)),
+        "draw_rate": float(np.mean(score1 == score2)),
+        "runs_team1": np.bincount(score1) / n_games,
+        "runs_team2": np.bincount(score2) / n_games,
+    }
+
+
+class MatchupCache:
+    """
+    대진 결과 캐시.
+    :param directory: 디스크 저장 폴더 (None 이면 메모리만 사용)
+    :param memory_items: 메모리 LRU 에 둘 결과 수
+    :param max_bytes: 디스크 저장 최대 크기 (넘으면 오래 쓰지 않은 파일부터 삭제)
+    """
+
+    def __init__(self, directory: Optional[str] = None, memory_items: int = 1024, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        self._disk_bytes = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(os.path.getsize(path) for path in self._disk_files())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def _disk_files(self) -> List[str]:
+        return [os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith(".npz")]
+
+    def _remember(self, key: str, value: Dict[str, Any]):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """저장된 결과 (없으면 None). 메모리 -> 디스크 순서로 찾는다."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+        value = self._read(key) if self.directory is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """결과를 메모리와 디스크에 저장."""
+        with self._lock:
+            self._remember(key, value)
+        if self.directory is not None:
+            self._write(key, value)
+
+    def lookup(self, team1: Dict[str, Any], team2: Dict[str, Any], weather: str, n_games: int,
+               engine: str = "batch", seed: int = 0) -> Dict[str, Any]:
+        """캐시에 있으면 바로 반환, 없으면 simulate_matchup 으로 계산해 저장."""
+        key = matchup_key(team1, team2, weather, n_games, engine, seed)
+        value = self.get(key)
+        if value is None:
+            value = simulate_matchup(team1, team2, weather, n_games, engine, seed)
+            self.put(key, value)
+        return value
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                value = json.loads(str(data["meta"]))
+                value["runs_team1"] = data["runs_team1"]
+                value["runs_team2"] = data["runs_team2"]
+            os.utime(path)  # 사용 시각 갱신 (삭제 순서용)
+        except (OSError, KeyError, ValueError):
+            return None
+        return value
+
+    def _write(self, key: str, value: Dict[str, Any]):
+        path = self._path(key)
+        meta = {k: v for k, v in value.items() if k not in ("runs_team1", "runs_team2")}
+        # 같은 폴더를 여러 프로세스가 공유하므로 임시 파일 이름은 매번 새로 만든다
+        fd, tmp_path = tempfile.mkstemp(prefix=key + ".", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, meta=np.array(json.dumps(meta, ensure_ascii=False)),
+                         runs_team1=value["runs_team1"], runs_team2=value["runs_team2"])
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._disk_bytes += os.path.getsize(path) - old_size
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """오래 쓰지 않은 파일부터 지워 max_bytes 의 90% 아래로 맞춘다."""
+        files = []
+        for path in self._disk_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        files.sort()
+        self._disk_bytes = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if self._disk_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._disk_bytes -= size
+
+    def clear(self):
+        """메모리와 디스크 캐시를 모두 비운다."""
+        with self._lock:
+            self._memory.clear()
+            if self.directory is not None:
+                for path in self._disk_files():
+                    os.remove(path)
+            self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_items": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
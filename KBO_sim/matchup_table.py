@@ -0,0 +1,132 @@
+"""
+타자 x 투수 x 날씨 대결 결과 확률표.
+
+simulate_at_bat 은 타석마다 calculate_probability 를 여섯 번 부르고 안타 유형 가중치도 다시 계산한다.
+대부분의 대결은 시즌 내내 반복되므로, 로스터마다 한 번 전체 확률표를 만들어 두고
+타석에서는 균등난수 하나와 이진 탐색(bisect)으로 결과를 뽑는다.
+"""
+import random
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+import KBO
+from batch_sim import OUTCOMES, HIT_TYPES, VALUE_ORDER, value_ordered
+
+# simulate_at_bat 의 결과 순서
+AT_BAT_OUTCOMES = ["볼넷", "삼진", "안타", "몸에 맞는 공", "땅볼 아웃", "플라이 아웃"]
+
+
+def _stat_columns(players: List[Dict[str, Any]], weathers: List[str], names: List[str],
+                  is_batter: bool) -> Dict[str, np.ndarray]:
+    """get_weather_stats 로 날씨를 반영한 스탯 배열 (선수 수, 날씨 수)."""
+    snapshots = [[KBO.get_weather_stats(player, weather, is_batter) for weather in weathers] for player in players]
+    return {name: np.array([[stats[name] for stats in row] for row in snapshots], dtype=float) for name in names}
+
+
+def outcome_probabilities(batter_stats: Dict[str, np.ndarray], pitcher_stats: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    calculate_probability 의 공식을 배열 단위로 계산.
+    입력 배열은 서로 브로드캐스트 가능해야 하며, 결과의 마지막 축이 AT_BAT_OUTCOMES 순서의 정규화된 확률.
+    """
+    walk_raw = batter_stats["볼넷%"] * 0.2 + (11 + 2.5 * (pitcher_stats["볼넷/9"] - 4.2))
+    strikeout_raw = batter_stats["삼진%"] * 0.2 + (20 + 2.5 * (pitcher_stats["삼진/9"] - 7.2))
+    hit_raw = batter_stats["타율"] * 100 + ((pitcher_stats["ERA"] - 4.8) * 0.06)
+    out = np.maximum(0, 0.5 * (100 - (hit_raw + walk_raw + strikeout_raw)))
+
+    walk, strikeout, hit = np.maximum(0, walk_raw), np.maximum(0, strikeout_raw), np.maximum(0, hit_raw)
+    hit_by_pitch = np.full_like(hit, 3.0)  # 고정값
+    probabilities = np.stack([walk, strikeout, hit, hit_by_pitch, out, out], axis=-1)
+    return probabilities / probabilities.sum(axis=-1, keepdims=True)
+
+
+def hit_type_probabilities(batters: List[Dict[str, Any]]) -> np.ndarray:
+    """determine_hit_type_direct 와 같은 단타/2루타/3루타/홈런 확률 (타자 수, 4)."""
+    counts = np.array([[batter["stats"].get(hit_type, 0) for hit_type in HIT_TYPES] for batter in batters], dtype=float)
+    total_hits = np.array([batter["stats"].get("안타", 0) for batter in batters], dtype=float)
+    weights = np.divide(counts, total_hits[:, None], out=np.zeros_like(counts), where=total_hits[:, None] != 0)
+    total = weights.sum(axis=1, keepdims=True)
+    # 안타 기록이 없으면 determine_hit_type_direct 처럼 단타로 처리
+    no_hits = total[:, 0] <= 0
+    weights[no_hits] = [1.0, 0.0, 0.0, 0.0]
+    total[no_hits] = 1.0
+    return weights / total
+
+
+class MatchupTable:
+    """
+    로스터 전체의 대결 결과 누적 확률표.
+    - outcome_cumulative: (타자, 투수, 날씨, 6) simulate_at_bat 결과의 누적 확률
+    - hit_cumulative: (타자, 4) 안타 유형의 누적 확률 (날씨/투수와 무관)
+    - cumulative: (타자, 투수, 날씨, 9) 두 단계를 합친 batch_sim.OUTCOMES 순서의 누적 확률
+    """
+
+    def __init__(self, batters: List[Dict[str, Any]], pitchers: List[Dict[str, Any]],
+                 weathers: Optional[List[str]] = None):
+        self.batters = list(batters)
+        self.pitchers = list(pitchers)
+        self.weathers = list(weathers or KBO.WEATHER_OPTIONS)
+        # 선수 dict 자체를 키로 사용 (같은 이름의 선발/불펜 중복 행이 있으므로 이름으로는 구분 불가)
+        self.batter_index = {id(batter): i for i, batter in enumerate(self.batters)}
+        self.pitcher_index = {id(pitcher): i for i, pitcher in enumerate(self.pitchers)}
+        self.weather_index = {weather: i for i, weather in enumerate(self.weathers)}
+
+        batter_columns = _stat_columns(self.batters, self.weathers, ["볼넷%", "삼진%", "타율"], is_batter=True)
+        pitcher_columns = _stat_columns(self.pitchers, self.weathers, ["볼넷/9", "삼진/9", "ERA"], is_batter=False)
+        batter_stats = {k: v[:, None, :] for k, v in batter_columns.items()}
+        pitcher_stats = {k: v[None, :, :] for k, v in pitcher_columns.items()}
+        probabilities = outcome_probabilities(batter_stats, pitcher_stats)
+        hit_types = hit_type_probabilities(self.batters)
+
+        self.outcome_cumulative = np.cumsum(probabilities, axis=-1)
+        self.hit_cumulative = np.cumsum(hit_types, axis=-1)
+
+        hit = probabilities[..., 2:3] * hit_types[:, None, None, :]
+        combined = np.concatenate([probabilities[..., :2], hit, probabilities[..., 3:]], axis=-1)
+        self.cumulative = np.cumsum(combined, axis=-1)
+        self.cumulative[..., -1] = 1.0  # 부동소수 오차로 1 보다 작아지는 것을 방지
+
+        # 자주 쓰는 행은 파이썬 리스트로 캐시해 bisect 로 바로 탐색
+        self._rows: Dict[Tuple[int, int, int], List[float]] = {}
+        self._aligned_rows: Dict[Tuple[int, int, int], List[float]] = {}
+
+    def _key(self, batter: Dict[str, Any], pitcher: Dict[str, Any], weather: str) -> Tuple[int, int, int]:
+        try:
+            return self.batter_index[id(batter)], self.pitcher_index[id(pitcher)], self.weather_index[weather]
+        except KeyError:
+            raise ValueError(f"확률표에 없는 대결입니다: {batter['name']} vs {pitcher['name']} ({weather})")
+
+    def distribution(self, batter: Dict[str, Any], pitcher: Dict[str, Any], weather: str) -> np.ndarray:
+        """OUTCOMES 순서의 누적 확률 (9,)."""
+        return self.cumulative[self._key(batter, pitcher, weather)]
+
+    def sample(self, batter: Dict[str, Any], pitcher: Dict[str, Any], weather: str,
+               rng: Optional[random.Random] = None) -> str:
+        """
+        균등난수 하나와 이진 탐색으로 타석 결과(안타는 유형까지)를 결정. rng 기본값은 전역 random 모듈.
+        공통 난수 스트림(rng.aligned)이면 batch_sim.VALUE_ORDER 순서로 추첨한다.
+        """
+        key = self._key(batter, pitcher, weather)
+        if getattr(rng, "aligned", False):
+            row = self._aligned_rows.get(key)
+            if row is None:
+                row = self._aligned_rows[key] = value_ordered(self.cumulative[key]).tolist()
+            return OUTCOMES[VALUE_ORDER[bisect_right(row, rng.random())]]
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = self.cumulative[key].tolist()
+        return OUTCOMES[bisect_right(row, (rng or random).random())]
+
+
+def build_matchup_table(team_data: Dict[str, Any], weathers: Optional[List[str]] = None) -> MatchupTable:
+    """group_by_team / auto_configure_teams 결과의 모든 타자와 투수로 확률표를 만든다."""
+    batters, pitchers = [], []
+    for team in team_data.values():
+        batters.extend(team["batters"])
+        pitchers.extend(team["pitchers"]["starters"])
+        pitchers.extend(team["pitchers"]["relievers"])
+    # 같은 선수가 여러 팀 구성에 들어 있을 수 있으므로 중복 제거
+    batters = list({id(batter): batter for batter in batters}.values())
+    pitchers = list({id(pitcher): pitcher for pitcher in pitchers}.values())
+    return MatchupTable(batters, pitchers, weathers)
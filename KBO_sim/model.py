@@ -0,0 +1,216 @@
+"""
+정수 ID 기반 선수/팀 모델.
+
+기존 선수 데이터는 {"name", "team", "position", "weather", "stats": {...}} 형태의 중첩 dict 라
+선수를 한글 문자열 키로 찾고, 팀 변형을 만들 때마다 선수 dict 리스트를 새로 만든다.
+여기서는 __slots__ 클래스(Batter, Pitcher), 정수 ID 튜플로 된 팀(Team),
+그리고 선수 dict 에 정수 ID 를 붙이는 Roster 를 제공한다.
+시뮬레이션 함수는 선수 dict 객체를 그대로 쓰므로 Roster 는 원본 dict 만 저장하고,
+Batter/Pitcher 객체와 스탯 열은 꺼낼 때 만든다. 팀 변형은 Team(정수 튜플)로 들고 있으면 된다.
+"""
+from collections.abc import Sequence
+from typing import List, Dict, Any, Tuple, Optional
+
+import numpy as np
+
+# dict 스탯 키 -> 속성 이름
+BATTER_FIELDS = {
+    "볼넷%": "walk_rate",
+    "삼진%": "strikeout_rate",
+    "wRC": "wrc",
+    "타율": "average",
+    "타수": "at_bats",
+    "안타": "hits",
+    "단타": "singles",
+    "2루타": "doubles",
+    "3루타": "triples",
+    "홈런": "home_runs",
+}
+PITCHER_FIELDS = {
+    "ERA": "era",
+    "볼넷/9": "walks_per_9",
+    "삼진/9": "strikeouts_per_9",
+}
+INFO_FIELDS = ("player_id", "name", "team", "position", "weather")
+
+
+class Batter:
+    """타자 한 명 (float 스탯 필드)."""
+    __slots__ = INFO_FIELDS + tuple(BATTER_FIELDS.values())
+
+    def __init__(self, player_id: int, name: str, team: str, position: str, weather: str, **stats: float):
+        self.player_id = player_id
+        self.name = name
+        self.team = team
+        self.position = position
+        self.weather = weather
+        for attr in BATTER_FIELDS.values():
+            setattr(self, attr, float(stats.get(attr, 0.0)))
+
+    @classmethod
+    def from_dict(cls, player: Dict[str, Any], player_id: int) -> "Batter":
+        stats = {attr: player["stats"].get(key, 0) for key, attr in BATTER_FIELDS.items()}
+        return cls(player_id, player["name"], player["team"], player["position"], player["weather"], **stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """load_batter_data 와 같은 dict 형식으로 변환."""
+        return {
+            "name": self.name,
+            "team": self.team,
+            "position": self.position,
+            "weather": self.weather,
+            "stats": {key: getattr(self, attr) for key, attr in BATTER_FIELDS.items()},
+        }
+
+    def __repr__(self):
+        return f"Batter({self.player_id}, {self.name}, {self.team}, {self.position})"
+
+
+class Pitcher:
+    """투수 한 명 (float 스탯 필드)."""
+    __slots__ = INFO_FIELDS + tuple(PITCHER_FIELDS.values())
+
+    def __init__(self, player_id: int, name: str, team: str, position: str, weather: str, **stats: float):
+        self.player_id = player_id
+        self.name = name
+        self.team = team
+        self.position = position
+        self.weather = weather
+        for attr in PITCHER_FIELDS.values():
+            setattr(self, attr, float(stats.get(attr, 0.0)))
+
+    @classmethod
+    def from_dict(cls, player: Dict[str, Any], player_id: int) -> "Pitcher":
+        stats = {attr: player["stats"].get(key, 0) for key, attr in PITCHER_FIELDS.items()}
+        return cls(player_id, player["name"], player["team"], player["position"], player["weather"], **stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """load_pitcher_data 와 같은 dict 형식으로 변환."""
+        return {
+            "name": self.name,
+            "team": self.team,
+            "position": self.position,
+            "weather": self.weather,
+            "stats": {key: getattr(self, attr) for key, attr in PITCHER_FIELDS.items()},
+        }
+
+    def __repr__(self):
+        return f"Pitcher({self.player_id}, {self.name}, {self.team}, {self.position})"
+
+
+class Team:
+    """
+    팀 구성. 선수는 Roster 의 정수 ID 튜플로만 들고 있으므로
+    타순/로테이션 변형을 많이 만들어도 메모리가 거의 들지 않고, 그대로 해시 키로 쓸 수 있다.
+    """
+    __slots__ = ("team_name", "batters", "starters", "relievers")
+
+    def __init__(self, team_name: str, batters: Tuple[int, ...], starters: Tuple[int, ...], relievers: Tuple[int, ...]):
+        self.team_name = team_name
+        self.batters = tuple(batters)
+        self.starters = tuple(starters)
+        self.relievers = tuple(relievers)
+
+    def key(self) -> Tuple[str, Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]:
+        return self.team_name, self.batters, self.starters, self.relievers
+
+    def __eq__(self, other):
+        return isinstance(other, Team) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"Team({self.team_name}, 타자 {len(self.batters)}명, 선발 {len(self.starters)}명, 불펜 {len(self.relievers)}명)"
+
+
+class _PlayerViews(Sequence):
+    """선수 dict 리스트 위의 읽기 전용 Batter/Pitcher 목록 (꺼낼 때마다 만들고 저장하지 않는다)."""
+    __slots__ = ("_dicts", "_cls")
+
+    def __init__(self, dicts: List[Dict[str, Any]], cls):
+        self._dicts = dicts
+        self._cls = cls
+
+    def __len__(self):
+        return len(self._dicts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._cls.from_dict(self._dicts[index], index)
+
+
+class Roster:
+    """
+    리그 전체 선수 목록. 타자와 투수는 각각 0 부터 시작하는 정수 ID 를 가진다.
+    - batter_dicts / pitcher_dicts: 시뮬레이션 함수에 넘길 원본 dict (ID 가 인덱스, 유일한 저장소)
+    - batters / pitchers: ID 로 꺼내는 Batter / Pitcher 객체 (꺼낼 때 원본 dict 로 만든다)
+    원본 dict 를 그대로 두는 것은 team_to_dict 가 같은 객체를 돌려줘야 선수 객체(id) 기준 캐시가 맞기 때문이다.
+    """
+
+    def __init__(self, batter_dicts: List[Dict[str, Any]], pitcher_dicts: List[Dict[str, Any]]):
+        self.batter_dicts = list(batter_dicts)
+        self.pitcher_dicts = list(pitcher_dicts)
+        self.batters = _PlayerViews(self.batter_dicts, Batter)
+        self.pitchers = _PlayerViews(self.pitcher_dicts, Pitcher)
+        # dict 객체 -> ID (같은 이름의 선발/불펜 중복 행이 있으므로 객체 자체로 구분)
+        self._batter_ids = {id(player): i for i, player in enumerate(self.batter_dicts)}
+        self._pitcher_ids = {id(player): i for i, player in enumerate(self.pitcher_dicts)}
+
+    def batter_id(self, player: Dict[str, Any]) -> int:
+        return self._batter_ids[id(player)]
+
+    def pitcher_id(self, player: Dict[str, Any]) -> int:
+        return self._pitcher_ids[id(player)]
+
+    def batter_column(self, key: str) -> np.ndarray:
+        """타자 스탯 한 열 (예: "타율"), ID 순서."""
+        return _stat_column(self.batter_dicts, key, BATTER_FIELDS)
+
+    def pitcher_column(self, key: str) -> np.ndarray:
+        """투수 스탯 한 열 (예: "ERA"), ID 순서."""
+        return _stat_column(self.pitcher_dicts, key, PITCHER_FIELDS)
+
+    def team_from_dict(self, team: Dict[str, Any]) -> Team:
+        """select_user_team / auto_configure_teams 형식의 팀 dict 를 Team 으로 변환."""
+        return Team(
+            team["team_name"],
+            tuple(self.batter_id(b) for b in team["batters"]),
+            tuple(self.pitcher_id(p) for p in team["pitchers"]["starters"]),
+            tuple(self.pitcher_id(p) for p in team["pitchers"]["relievers"]),
+        )
+
+    def team_to_dict(self, team: Team) -> Dict[str, Any]:
+        """Team 을 simulate_game 에 넘길 수 있는 dict 로 변환 (선수 dict 는 원본 객체를 재사용)."""
+        return {
+            "team_name": team.team_name,
+            "batters": [self.batter_dicts[i] for i in team.batters],
+            "pitchers": {
+                "starters": [self.pitcher_dicts[i] for i in team.starters],
+                "relievers": [self.pitcher_dicts[i] for i in team.relievers],
+            },
+        }
+
+
+def _stat_column(players: List[Dict[str, Any]], key: str, fields: Dict[str, str]) -> np.ndarray:
+    if key not in fields:
+        raise ValueError(f"알 수 없는 스탯입니다: {key}")
+    return np.array([float(player["stats"].get(key, 0)) for player in players], dtype=float)
+
+
+def build_roster(team_data: Dict[str, Any], extra_teams: Optional[Dict[str, Any]] = None) -> Roster:
+    """
+    group_by_team 결과(와 선택적으로 auto_configure_teams 결과)의 모든 선수로 Roster 를 만든다.
+    같은 dict 객체는 한 번만 등록된다.
+    """
+    batters, pitchers = {}, {}
+    for teams in (team_data, extra_teams or {}):
+        for team in teams.values():
+            for batter in team["batters"]:
+                batters.setdefault(id(batter), batter)
+            for pitcher in team["pitchers"]["starters"] + team["pitchers"]["relievers"]:
+                pitchers.setdefault(id(pitcher), pitcher)
+    return Roster(list(batters.values()), list(pitchers.values()))
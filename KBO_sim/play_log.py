@@ -0,0 +1,94 @@
+"""
+경기 중계를 NDJSON(한 줄에 JSON 하나) 파일로 기록하는 이벤트 싱크.
+
+print 로 콘솔에 찍는 대신 이벤트를 메모리에 모아 두었다가 한 번에 파일에 쓴다.
+각 줄에는 경기 번호(g), 이닝(i), 초/말(h), 이벤트 종류(e)가 들어간다.
+"""
+import json
+from typing import List, Dict, Any, Optional, TextIO
+
+from KBO import EventSink
+
+
+class NDJSONSink(EventSink):
+    """
+    플레이 바이 플레이 기록기.
+    :param path: 기록할 파일 경로 (file 을 주면 무시)
+    :param file: 이미 열려 있는 텍스트 파일
+    :param buffer_events: 이 개수만큼 모이면 파일에 쓴다
+    :param rosters: True 면 game_start 에 양 팀 명단 이름도 기록
+    """
+
+    def __init__(self, path: Optional[str] = None, file: Optional[TextIO] = None,
+                 buffer_events: int = 10000, rosters: bool = False):
+        if file is None and path is None:
+            raise ValueError("path 또는 file 중 하나는 필요합니다.")
+        self._owns_file = file is None
+        self.file = file if file is not None else open(path, "w", encoding="utf-8")
+        self.buffer_events = buffer_events
+        self.rosters = rosters
+        self._buffer: List[str] = []
+        self.game_id = -1
+        self.inning = 0
+        self.half = ""
+
+    def _write(self, event: Dict[str, Any]):
+        event["g"] = self.game_id
+        self._buffer.append(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+        if len(self._buffer) >= self.buffer_events:
+            self.flush()
+
+    def game_start(self, team1: Dict[str, Any], team2: Dict[str, Any], weather: str):
+        self.game_id += 1
+        event = {"e": "game_start", "team1": team1["team_name"], "team2": team2["team_name"], "weather": weather}
+        if self.rosters:
+            event["batters1"] = [batter["name"] for batter in team1["batters"]]
+            event["batters2"] = [batter["name"] for batter in team2["batters"]]
+        self._write(event)
+
+    def inning_start(self, inning: int, half: str):
+        self.inning = inning
+        self.half = half
+
+    def pitcher_change(self, pitcher: Dict[str, Any], weather: str):
+        self._write({"e": "pitcher", "i": self.inning, "h": self.half, "p": pitcher["name"]})
+
+    def plate_appearance(self, batter: Dict[str, Any], pitcher: Dict[str, Any]):
+        pass  # 결과 이벤트에 타자 이름이 같이 기록된다
+
+    def at_bat_result(self, batter_name: str, result: str, outs: int):
+        self._write({"e": "pa", "i": self.inning, "h": self.half, "b": batter_name, "r": result, "o": outs})
+
+    def runner_event(self, kind: str, runner: Any):
+        self._write({"e": "runner", "i": self.inning, "h": self.half, "k": kind, "n": runner})
+
+    def inning_end(self, score: int):
+        self._write({"e": "inning_end", "i": self.inning, "h": self.half, "s": score})
+
+    def game_end(self, result: Dict[str, Any]):
+        self._write({"e": "game_end", "s1": result["score_team1"], "s2": result["score_team2"],
+                     "winner": result["winner"]})
+
+    def flush(self):
+        """모아 둔 이벤트를 파일에 한 번에 쓴다."""
+        if self._buffer:
+            self.file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self._owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_play_log(path: str) -> List[Dict[str, Any]]:
+    """NDJSON 중계 파일을 이벤트 dict 리스트로 읽는다."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,271 @@
+"""
+팀 간 승률표로 정규시즌 순위 분포와 포스트시즌(와일드카드 ~ 한국시리즈) 진출/우승 확률을 계산.
+
+시즌을 경기 단위로 수백 번 돌리면 경기 수가 수백만이 되지만, 경기 결과는 (원정, 홈) 두 팀에만 달려 있으므로
+10 x 10 승/무 확률표를 한 번 만들어 두고 그 위에서 계산한다.
+- win_matrix: 원정 i 가 홈 j 를 이길/비길 확률. 날씨(무작위 4가지)와 양 팀 5인 로테이션(season.day_roster)을 고르게 평균한다.
+  engine="markov" 는 반 이닝 득점 분포(markov)로 정확히, "batch" 는 simulate_games_batch 로 추정한다.
+- season_odds: 일정(season.build_season_schedule)의 경기들을 승률표로 시즌 n_sims 개씩 배열로 한꺼번에 뽑아 최종 순위 분포를 구하고,
+  나온 상위 5팀 순서마다 포스트시즌을 아래 규칙으로 정확히(동적 계획법) 계산해 평균한다.
+- 포스트시즌: 와일드카드(4위 홈, 4위는 1승 또는 1무면 진출, 5위는 2승 필요) -> 준플레이오프(3위, 5전 3선승)
+  -> 플레이오프(2위, 5전 3선승) -> 한국시리즈(1위, 7전 4선승). 시리즈 무승부는 재경기로 보고 승부가 난 경기만 센다.
+
+사용법: python postseason.py --sims 20000 --matrix win_matrix.npz
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+import KBO
+import markov
+from batch_sim import simulate_games_batch
+from matchup_table import build_matchup_table
+from roster_cache import load_pitcher_data_cached, load_batter_data_cached
+from season import (DEFAULT_PITCHER_FILE, DEFAULT_BATTER_FILE, GAMES_PER_TEAM, ROTATION_SIZE,
+                    build_season_schedule, day_roster)
+
+POSTSEASON_TEAMS = 5
+# (라운드 이름, 상위 시드, 경기 수, 상위 시드 홈 경기 번호)
+SERIES = [
+    ("준플레이오프", 3, 5, (0, 1, 4)),
+    ("플레이오프", 2, 5, (0, 1, 4)),
+    ("한국시리즈", 1, 7, (0, 1, 5, 6)),
+]
+ROUNDS = ["와일드카드", "준플레이오프", "플레이오프", "한국시리즈", "우승"]
+
+
+def _run_distribution(batting: Dict[str, Any], pitching: Dict[str, Any], weather: str, table: Any,
+                      halves: Dict[Tuple[int, int, str], np.ndarray]) -> np.ndarray:
+    """markov.team_run_distribution 과 같은 9이닝 득점 분포. 같은 (타선, 투수, 날씨) 반 이닝 분포는 재사용한다."""
+    game = np.array([1.0])
+    for inning in range(1, 10):
+        pitcher = KBO.select_pitcher(pitching["pitchers"], inning)
+        key = (id(batting["batters"]), id(pitcher), weather)
+        half = halves.get(key)
+        if half is None:
+            half = markov.half_inning_distribution(markov.outcome_probabilities(batting["batters"], pitcher, weather, table))
+            halves[key] = half
+        game = np.convolve(game, half)
+    return game
+
+
+def _decide(dist1: np.ndarray, dist2: np.ndarray) -> Tuple[float, float]:
+    """득점 분포 두 개 -> (팀1 승, 무) 확률."""
+    joint = np.outer(dist1, dist2)
+    return float(np.tril(joint, -1).sum()), float(np.trace(joint))
+
+
+def win_matrix(teams: List[Dict[str, Any]], engine: str = "markov", n_games: int = 400, seed: int = 0,
+               rotation: bool = True) -> Dict[str, Any]:
+    """
+    팀 간 승률표.
+    :param teams: auto_configure_teams 로 구성한 팀 리스트 (순서가 팀 번호)
+    :param engine: "markov"(정확) 또는 "batch"(simulate_games_batch, (날씨, 선발 조합)마다 n_games 경기)
+    :param rotation: True 면 season.day_roster 로 5인 로테이션의 선발 조합을 평균, False 면 simulate_game 처럼 팀 구성 그대로
+    :return: {"team_names", "win": (n, n) 원정 i 가 홈 j 를 이길 확률, "draw": (n, n) 비길 확률}
+    """
+    n = len(teams)
+    table = build_matchup_table({team["team_name"]: team for team in teams})
+    slots = range(ROTATION_SIZE) if rotation else [None]
+    rosters = [[team if slot is None else day_roster(team, slot) for slot in slots] for team in teams]
+    cells = len(KBO.WEATHER_OPTIONS) * len(slots) ** 2
+
+    win = np.zeros((n, n))
+    draw = np.zeros((n, n))
+    halves: Dict[Tuple[int, int, str], np.ndarray] = {}
+    for i in range(n):
+        for j in range(n):
+            if i == j:
+                continue
+            for w, weather in enumerate(KBO.WEATHER_OPTIONS):
+                if engine == "markov":
+                    # 원정 i 의 득점은 홈 j 선발(b)에, 홈 j 의 득점은 원정 i 선발(a)에만 달려 있다
+                    away_runs = [_run_distribution(teams[i], rosters[j][b], weather, table, halves) for b in range(len(slots))]
+                    home_runs = [_run_distribution(teams[j], rosters[i][a], weather, table, halves) for a in range(len(slots))]
+                    for dist1 in away_runs:
+                        for dist2 in home_runs:
+                            p_win, p_draw = _decide(dist1, dist2)
+                            win[i, j] += p_win / cells
+                            draw[i, j] += p_draw / cells
+                elif engine == "batch":
+                    for a in range(len(slots)):
+                        for b in range(len(slots)):
+                            result = simulate_games_batch(rosters[i][a], rosters[j][b], weather, n_games,
+                                                          seed=np.random.SeedSequence([seed, i, j, w, a, b]), table=table)
+                            win[i, j] += result["team1_win_rate"] / cells
+                            draw[i, j] += result["draw_rate"] / cells
+                else:
+                    raise ValueError("engine 은 'markov' 또는 'batch' 여야 합니다.")
+    return {"team_names": [team["team_name"] for team in teams], "win": win, "draw": draw}
+
+
+def save_matrix(matrix: Dict[str, Any], path: str):
+    """승률표를 .npz 로 저장 (매일 순위 확률을 다시 계산할 때 재사용)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # 여러 프로세스가 같은 경로에 저장해도 서로의 임시 파일을 덮어쓰지 않도록 이름을 매번 새로 만든다
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, team_names=np.array(matrix["team_names"]), win=matrix["win"], draw=matrix["draw"])
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def load_matrix(path: str) -> Dict[str, Any]:
+    with np.load(path) as data:
+        return {"team_names": data["team_names"].tolist(), "win": data["win"], "draw": data["draw"]}
+
+
+def _game_probability(matrix: Dict[str, Any], high: int, low: int, high_home: bool) -> float:
+    """무승부를 뺀 한 경기에서 high 가 이길 확률."""
+    win, draw = matrix["win"], matrix["draw"]
+    if high_home:
+        return (1.0 - win[low, high] - draw[low, high]) / (1.0 - draw[low, high])
+    return win[high, low] / (1.0 - draw[high, low])
+
+
+def series_probability(matrix: Dict[str, Any], high: int, low: int, games: int, high_home_games: Tuple[int, ...]) -> float:
+    """games 전 (games // 2 + 1) 선승제 시리즈에서 상위 시드 high 가 이길 확률 (경기 번호별 홈 구장 반영)."""
+    needed = games // 2 + 1
+    p_home = _game_probability(matrix, high, low, True)
+    p_away = _game_probability(matrix, high, low, False)
+    # prob[a, b] = high a 승, low b 승 상태에 있을 확률
+    prob = np.zeros((needed + 1, needed + 1))
+    prob[0, 0] = 1.0
+    for a in range(needed):
+        for b in range(needed):
+            if prob[a, b] == 0.0:
+                continue
+            p = p_home if a + b in high_home_games else p_away
+            prob[a + 1, b] += prob[a, b] * p
+            prob[a, b + 1] += prob[a, b] * (1.0 - p)
+    return float(prob[needed, :needed].sum())
+
+
+def bracket_odds(matrix: Dict[str, Any], seeding: List[int]) -> np.ndarray:
+    """
+    상위 5팀 순서(seeding[0] = 1위)가 정해졌을 때 팀별 라운드 진출 확률 (팀 수, len(ROUNDS)).
+    열은 ROUNDS 순서이며 해당 라운드에 나갈(마지막 열은 우승할) 확률.
+    """
+    odds = np.zeros((len(matrix["team_names"]), len(ROUNDS)))
+    fourth, fifth = seeding[3], seeding[4]
+    odds[fourth, 0] = odds[fifth, 0] = 1.0
+
+    # 와일드카드: 4위 홈 2경기, 5위는 2연승해야 진출 (무승부는 4위 진출)
+    fifth_wins = matrix["win"][fifth, fourth]
+    challenger = {fourth: 1.0 - fifth_wins ** 2, fifth: fifth_wins ** 2}
+
+    for r, (_, seed, games, high_home_games) in enumerate(SERIES, start=1):
+        high = seeding[seed - 1]
+        odds[high, r] = 1.0
+        for team, p in challenger.items():
+            odds[team, r] += p
+        winners = {high: 0.0}
+        for team, p in challenger.items():
+            p_high = series_probability(matrix, high, team, games, high_home_games)
+            winners[high] += p * p_high
+            winners[team] = winners.get(team, 0.0) + p * (1.0 - p_high)
+        challenger = winners
+    for team, p in challenger.items():
+        odds[team, len(ROUNDS) - 1] += p
+    return odds
+
+
+def season_odds(matrix: Dict[str, Any], n_sims: int = 10000, seed: int = 0, schedule: Optional[np.ndarray] = None,
+                record: Optional[np.ndarray] = None, chunk: int = 2000) -> Dict[str, Any]:
+    """
+    남은 일정을 승률표로 n_sims 번 뽑아 최종 순위 분포와 포스트시즌 확률을 계산.
+    :param schedule: (경기 수, 2) 남은 (원정, 홈) 일정. 기본은 정규시즌 전체 일정
+    :param record: (팀 수, 3) 현재까지 (승, 패, 무). 기본은 0
+    :return: 팀별 평균 승/패/무, 순위 분포 positions[팀, 순위], 라운드 진출 확률 rounds[팀, ROUNDS]
+    """
+    n = len(matrix["team_names"])
+    if schedule is None:
+        schedule = build_season_schedule(n, GAMES_PER_TEAM)
+    if record is None:
+        record = np.zeros((n, 3))
+    away, home = schedule[:, 0], schedule[:, 1]
+    p_away = matrix["win"][away, home]
+    p_decided = p_away + matrix["draw"][away, home]  # u 가 이보다 작으면 원정 승 또는 무
+    # 경기 -> 팀 합산용 (경기 수, 팀 수) 행렬
+    away_onehot = np.eye(n, dtype=np.float32)[away]
+    home_onehot = np.eye(n, dtype=np.float32)[home]
+
+    rng = np.random.default_rng(seed)
+    totals = np.zeros((n, 3))
+    positions = np.zeros((n, n))
+    seedings: Dict[Tuple[int, ...], int] = {}
+    for start in range(0, n_sims, chunk):
+        size = min(chunk, n_sims - start)
+        u = rng.random((size, len(schedule)))
+        away_win = (u < p_away).astype(np.float32)
+        home_win = (u >= p_decided).astype(np.float32)
+        draws = 1.0 - away_win - home_win
+        wins = away_win @ away_onehot + home_win @ home_onehot + record[:, 0]
+        losses = home_win @ away_onehot + away_win @ home_onehot + record[:, 1]
+        ties = draws @ away_onehot + draws @ home_onehot + record[:, 2]
+        totals += np.stack([wins.sum(0), losses.sum(0), ties.sum(0)], axis=1)
+
+        # 승률(승 / (승 + 패)) 순위, 동률은 무작위로 가른다
+        decided = wins + losses
+        win_pct = np.divide(wins, decided, out=np.zeros_like(wins), where=decided > 0)
+        order = np.lexsort((rng.random(win_pct.shape), -win_pct), axis=1)
+        np.add.at(positions, (order, np.arange(n)), 1)
+        for row in map(tuple, order[:, :POSTSEASON_TEAMS].tolist()):
+            seedings[row] = seedings.get(row, 0) + 1
+
+    rounds = np.zeros((n, len(ROUNDS)))
+    for seeding, count in seedings.items():
+        rounds += count * bracket_odds(matrix, list(seeding))
+    return {
+        "team_names": matrix["team_names"],
+        "n_sims": n_sims,
+        "record": totals / n_sims,
+        "positions": positions / n_sims,
+        "rounds": rounds / n_sims,
+    }
+
+
+def print_odds(odds: Dict[str, Any]):
+    """팀별 평균 성적, 1위/가을야구/라운드별 확률 출력 (평균 승수 순)."""
+    print(f"\n--- 정규시즌/포스트시즌 확률 ({odds['n_sims']}시즌) ---")
+    print(f"{'팀':<8} {'승':>6} {'패':>6} {'무':>5} {'1위':>7} {'5위 이내':>8} " + " ".join(f"{r:>8}" for r in ROUNDS[1:]))
+    print("-" * 95)
+    for i in np.argsort(-odds["record"][:, 0]):
+        wins, losses, draws = odds["record"][i]
+        top5 = odds["positions"][i, :POSTSEASON_TEAMS].sum()
+        rounds = " ".join(f"{p:>8.3f}" for p in odds["rounds"][i, 1:])
+        print(f"{odds['team_names'][i]:<8} {wins:>6.1f} {losses:>6.1f} {draws:>5.1f} "
+              f"{odds['positions'][i, 0]:>7.3f} {top5:>8.3f} {rounds}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 정규시즌 순위/포스트시즌 확률 (팀 간 승률표 기반)")
+    parser.add_argument("--sims", type=int, default=10000, help="뽑을 시즌 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--engine", choices=["markov", "batch"], default="markov", help="승률표 계산 방식")
+    parser.add_argument("--games", type=int, default=400, help="batch 엔진의 (날씨, 선발 조합)별 경기 수")
+    parser.add_argument("--matrix", default=None, help="승률표 .npz (있으면 불러오고, 없으면 계산해 저장)")
+    parser.add_argument("--pitchers", default=DEFAULT_PITCHER_FILE, help="투수 데이터 xlsx 경로")
+    parser.add_argument("--batters", default=DEFAULT_BATTER_FILE, help="타자 데이터 xlsx 경로")
+    args = parser.parse_args()
+
+    if args.matrix and os.path.exists(args.matrix):
+        matrix = load_matrix(args.matrix)
+    else:
+        team_data = KBO.group_by_team(load_pitcher_data_cached(args.pitchers), load_batter_data_cached(args.batters))
+        with contextlib.redirect_stdout(io.StringIO()):
+            all_teams = list(KBO.auto_configure_teams(team_data, None).values())
+        matrix = win_matrix(all_teams, args.engine, args.games, args.seed)
+        if args.matrix:
+            save_matrix(matrix, args.matrix)
+    print_odds(season_odds(matrix, args.sims, args.seed))
@@ -0,0 +1,204 @@
+"""
+시뮬레이션 함수 계측 (선택 사용).
+
+켜면 KBO 모듈의 주요 함수를 계측 래퍼로 바꿔 끼워 함수별 호출 수와 누적 시간(하위 호출 포함),
+경기당 타석 수와 경기 소요 시간 히스토그램을 모은다.
+KBO 함수들은 서로를 모듈 전역 이름으로 호출하므로 래퍼가 내부 호출까지 잡는다.
+끄면 원래 함수로 되돌리므로, 켜지 않은 상태에서는 비용이 전혀 없다.
+
+    with profiling.profile() as prof:
+        KBO.simulate_game(team1, team2, "맑음", sink=KBO.NULL_SINK)
+    print(prof.to_prometheus())
+"""
+import bisect
+import functools
+import json
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence
+
+import KBO
+
+# 계측 대상 KBO 함수
+INSTRUMENTED = [
+    "simulate_game",
+    "simulate_inning",
+    "simulate_at_bat",
+    "select_pitcher",
+    "calculate_probability",
+    "determine_hit_type_direct",
+    "calculate_out_probability",
+    "get_weather_stats",
+]
+# 주자 이동은 simulate_inning 안의 전이표 조회라 따로 계측하지 않는다 (apply_at_bat_result 등은 전이표를 만들 때만 호출됨)
+
+# 히스토그램 구간 상한
+GAME_SECONDS_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0]
+PLATE_APPEARANCE_BUCKETS = [30, 40, 50, 60, 70, 80, 90, 100, 110, 120, 126]
+
+
+class Histogram:
+    """고정 구간 히스토그램 (Prometheus histogram 과 같은 le 구간)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        total, result = 0, []
+        for c in self.counts:
+            total += c
+            result.append(total)
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """구간 상한 기준 분위수 근사 (값이 없으면 None)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, total in zip(self.buckets + [float("inf")], self.cumulative()):
+            if total >= target:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"buckets": self.buckets, "counts": self.counts, "sum": self.sum, "count": self.count}
+
+
+class Profiler:
+    """
+    KBO 함수 계측기.
+    :param functions: 계측할 KBO 함수 이름 (기본: INSTRUMENTED)
+    """
+
+    def __init__(self, functions: Optional[List[str]] = None):
+        self.functions = list(functions or INSTRUMENTED)
+        self._originals: Dict[str, Callable] = {}
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def reset(self):
+        self.calls = {name: 0 for name in self.functions}
+        self.seconds = {name: 0.0 for name in self.functions}
+        self.game_seconds = Histogram(GAME_SECONDS_BUCKETS)
+        self.game_plate_appearances = Histogram(PLATE_APPEARANCE_BUCKETS)
+
+    def _wrap(self, name: str, fn: Callable) -> Callable:
+        calls, seconds, clock = self.calls, self.seconds, time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds[name] += clock() - start
+                calls[name] += 1
+
+        return wrapper
+
+    def _wrap_game(self, fn: Callable) -> Callable:
+        """simulate_game 래퍼: 호출 수/시간에 더해 경기당 타석 수와 소요 시간 히스토그램을 기록."""
+        calls, seconds, clock = self.calls, self.seconds, time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            plate_appearances = calls.get("simulate_at_bat", 0)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                seconds["simulate_game"] += elapsed
+                calls["simulate_game"] += 1
+                self.game_seconds.observe(elapsed)
+                self.game_plate_appearances.observe(calls.get("simulate_at_bat", 0) - plate_appearances)
+
+        return wrapper
+
+    def enable(self):
+        """KBO 함수를 계측 래퍼로 교체."""
+        if self.enabled:
+            return
+        for name in self.functions:
+            fn = getattr(KBO, name)
+            self._originals[name] = fn
+            setattr(KBO, name, self._wrap_game(fn) if name == "simulate_game" else self._wrap(name, fn))
+
+    def disable(self):
+        """원래 함수로 복원 (모은 값은 유지)."""
+        for name, fn in self._originals.items():
+            setattr(KBO, name, fn)
+        self._originals.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "functions": {
+                name: {
+                    "calls": self.calls[name],
+                    "seconds": self.seconds[name],
+                    "mean_us": self.seconds[name] / self.calls[name] * 1e6 if self.calls[name] else None,
+                }
+                for name in self.functions
+            },
+            "games": self.calls.get("simulate_game", 0),
+            "game_seconds": self.game_seconds.to_dict(),
+            "game_plate_appearances": self.game_plate_appearances.to_dict(),
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = "kbo_sim") -> str:
+        """Prometheus 텍스트 노출 형식."""
+        lines = [
+            f"# HELP {prefix}_function_calls_total KBO 함수 호출 수",
+            f"# TYPE {prefix}_function_calls_total counter",
+        ]
+        lines += [f'{prefix}_function_calls_total{{function="{name}"}} {self.calls[name]}' for name in self.functions]
+        lines += [
+            f"# HELP {prefix}_function_seconds_total KBO 함수 누적 시간 (하위 호출 포함)",
+            f"# TYPE {prefix}_function_seconds_total counter",
+        ]
+        lines += [f'{prefix}_function_seconds_total{{function="{name}"}} {self.seconds[name]:.9f}'
+                  for name in self.functions]
+        for metric, histogram, help_text in (
+                ("game_seconds", self.game_seconds, "경기당 소요 시간"),
+                ("game_plate_appearances", self.game_plate_appearances, "경기당 타석 수")):
+            lines += [f"# HELP {prefix}_{metric} {help_text}", f"# TYPE {prefix}_{metric} histogram"]
+            for bound, total in zip(histogram.buckets + ["+Inf"], histogram.cumulative()):
+                lines.append(f'{prefix}_{metric}_bucket{{le="{bound}"}} {total}')
+            lines.append(f"{prefix}_{metric}_sum {histogram.sum}")
+            lines.append(f"{prefix}_{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def print_report(self):
+        print("\n--- 함수별 호출 수 / 누적 시간 ---")
+        for name in sorted(self.functions, key=lambda n: self.seconds[n], reverse=True):
+            if self.calls[name]:
+                print(f"{name:<28} {self.calls[name]:>10}회 {self.seconds[name]:>10.4f}초 "
+                      f"({self.seconds[name] / self.calls[name] * 1e6:.2f}us/회)")
+        if self.game_seconds.count:
+            print(f"경기 {self.game_seconds.count}개, 경기당 평균 {self.game_seconds.sum / self.game_seconds.count * 1e3:.3f}ms, "
+                  f"타석 {self.game_plate_appearances.sum / self.game_plate_appearances.count:.1f}개")
+
+
+@contextmanager
+def profile(functions: Optional[List[str]] = None) -> Iterator[Profiler]:
+    """with 블록 동안만 계측."""
+    profiler = Profiler(functions)
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
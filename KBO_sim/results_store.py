@@ -0,0 +1,358 @@
+"""
+시뮬레이션 결과 저장소 (추가 전용, 열 단위).
+
+경기 단위(games)와 타석 단위(plate_appearances) 기록을 열마다 .npy 파일로 나눠 청크 단위로 저장한다.
+팀/선수/결과/날씨 문자열은 정수 코드로 바꾸고 사전은 manifest.json 에 둔다.
+manifest 에는 팀별/선수별로 해당 코드가 들어 있는 청크 번호 색인이 있어서,
+특정 팀이나 선수의 시즌/통산 기록을 조회할 때 관련 청크만 메모리 맵으로 읽는다.
+ResultsSink 를 simulate_game 의 sink 로 넘기면 경기가 끝날 때마다 기록이 쌓인다.
+저장소 하나에는 쓰는 프로세스가 하나뿐이어야 한다 (청크 번호, 코드 사전, manifest 를 프로세스마다 따로 관리한다).
+여러 프로세스의 결과는 각자 다른 폴더에 쓴다.
+
+    store = ResultsStore("results")
+    with ResultsSink(store, season=0) as sink:
+        for k in range(1000):
+            sink.seed = k
+            KBO.simulate_game(team1, team2, "맑음", sink=sink, rng=game_rng(0, k))
+    store.batting_lines(season=0)
+"""
+import contextlib
+import json
+import os
+import tempfile
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+import KBO
+from batch_sim import OUTCOMES
+
+STORE_VERSION = 1
+DEFAULT_CHUNK_ROWS = 1_000_000
+HALVES = ["초", "말"]
+
+# 테이블별 열 이름과 자료형
+GAME_COLUMNS = {
+    "game_id": np.int64,
+    "season": np.int32,
+    "seed": np.int64,
+    "team1": np.int32,
+    "team2": np.int32,
+    "weather": np.int8,
+    "score_team1": np.int16,
+    "score_team2": np.int16,
+}
+PA_COLUMNS = {
+    "game_id": np.int64,
+    "season": np.int32,
+    "inning": np.int8,
+    "half": np.int8,
+    "team": np.int32,
+    "batter": np.int32,
+    "pitcher": np.int32,
+    "outcome": np.int8,
+    "runs": np.int8,
+    "outs": np.int8,
+}
+TABLES = {"games": GAME_COLUMNS, "plate_appearances": PA_COLUMNS}
+# 색인을 만드는 열 (테이블 -> 색인 이름 -> 열 목록)
+INDEX_COLUMNS = {
+    "games": {"team": ["team1", "team2"]},
+    "plate_appearances": {"team": ["team"], "player": ["batter", "pitcher"]},
+}
+# array.array 형식 코드 (청크를 채우는 동안 쓰는 버퍼)
+_TYPECODES = {np.int8: "b", np.int16: "h", np.int32: "i", np.int64: "q"}
+
+
+class ResultsStore:
+    """
+    청크 단위 열 저장소. 한 폴더에 동시에 쓰는 ResultsStore 는 하나여야 한다 (읽기는 여럿 가능).
+    :param directory: 저장 폴더 (없으면 만든다, 있으면 이어서 쓴다)
+    :param chunk_rows: 청크 하나의 최대 행 수
+    """
+
+    def __init__(self, directory: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest["version"] != STORE_VERSION:
+                raise ValueError(f"지원하지 않는 저장소 버전입니다: {self.manifest['version']}")
+        else:
+            self.manifest = {
+                "version": STORE_VERSION,
+                "next_game_id": 0,
+                "teams": [],
+                "players": [],  # [역할(타자/투수), 팀, 이름, 포지션]
+                "outcomes": OUTCOMES,
+                "weathers": KBO.WEATHER_OPTIONS,
+                "tables": {name: {"chunks": [], "index": {key: {} for key in INDEX_COLUMNS[name]}}
+                           for name in TABLES},
+            }
+        self._team_codes = {name: i for i, name in enumerate(self.manifest["teams"])}
+        self._player_codes = {tuple(p): i for i, p in enumerate(self.manifest["players"])}
+        self._outcome_codes = {name: i for i, name in enumerate(self.manifest["outcomes"])}
+        self._weather_codes = {name: i for i, name in enumerate(self.manifest["weathers"])}
+        self._buffers = {name: self._new_buffer(columns) for name, columns in TABLES.items()}
+
+    # --- 코드 사전 ---
+    @staticmethod
+    def _new_buffer(columns: Dict[str, Any]) -> Dict[str, array]:
+        return {column: array(_TYPECODES[dtype]) for column, dtype in columns.items()}
+
+    def team_code(self, team_name: str) -> int:
+        code = self._team_codes.get(team_name)
+        if code is None:
+            code = self._team_codes[team_name] = len(self.manifest["teams"])
+            self.manifest["teams"].append(team_name)
+        return code
+
+    def player_code(self, player: Dict[str, Any], role: str) -> int:
+        """선수 코드. (역할, 팀, 이름, 포지션)이 같으면 같은 선수로 본다."""
+        key = (role, player["team"], player["name"], player["position"])
+        code = self._player_codes.get(key)
+        if code is None:
+            code = self._player_codes[key] = len(self.manifest["players"])
+            self.manifest["players"].append(list(key))
+        return code
+
+    def outcome_code(self, outcome: str) -> int:
+        return self._outcome_codes[outcome]
+
+    def weather_code(self, weather: str) -> int:
+        return self._weather_codes[weather]
+
+    def next_game_id(self) -> int:
+        game_id = self.manifest["next_game_id"]
+        self.manifest["next_game_id"] += 1
+        return game_id
+
+    # --- 쓰기 ---
+    def append(self, table: str, row: Tuple[int, ...]):
+        """TABLES[table] 열 순서의 정수 행 하나를 추가."""
+        buffer = self._buffers[table]
+        for column, value in zip(buffer.values(), row):
+            column.append(value)
+        if len(next(iter(buffer.values()))) >= self.chunk_rows:
+            self.flush_table(table)
+
+    def flush_table(self, table: str, write_manifest: bool = True):
+        """
+        버퍼를 새 청크로 저장하고 색인/manifest 를 갱신.
+        :param write_manifest: False 면 manifest 파일은 호출한 쪽에서 한 번에 쓴다 (flush)
+        """
+        buffer = self._buffers[table]
+        rows = len(next(iter(buffer.values())))
+        if rows == 0:
+            return
+        info = self.manifest["tables"][table]
+        chunk_id = len(info["chunks"])
+        chunk_dir = os.path.join(self.directory, table, f"{chunk_id:05d}")
+        os.makedirs(chunk_dir, exist_ok=True)
+        columns = {}
+        for column, dtype in TABLES[table].items():
+            columns[column] = np.frombuffer(buffer[column], dtype=dtype)
+            np.save(os.path.join(chunk_dir, column + ".npy"), columns[column])
+
+        for key, index_columns in INDEX_COLUMNS[table].items():
+            codes = np.unique(np.concatenate([columns[c] for c in index_columns]))
+            for code in codes.tolist():
+                info["index"][key].setdefault(str(code), []).append(chunk_id)
+        info["chunks"].append({"id": chunk_id, "rows": rows})
+        self._buffers[table] = self._new_buffer(TABLES[table])
+        if write_manifest:
+            self._write_manifest()
+
+    def flush(self):
+        """모든 테이블의 버퍼를 저장하고 manifest 는 마지막에 한 번만 쓴다."""
+        for table in TABLES:
+            self.flush_table(table, write_manifest=False)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        path = os.path.join(self.directory, "manifest.json")
+        # 임시 파일에 다 쓴 뒤 교체하므로 읽는 쪽은 쓰다 만 manifest 를 보지 않는다
+        fd, tmp_path = tempfile.mkstemp(prefix="manifest.", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    # --- 읽기 ---
+    def _chunk_ids(self, table: str, index: Optional[str] = None, codes: Optional[List[int]] = None) -> List[int]:
+        info = self.manifest["tables"][table]
+        if index is None or codes is None:
+            return [chunk["id"] for chunk in info["chunks"]]
+        chunk_ids = set()
+        for code in codes:
+            chunk_ids.update(info["index"][index].get(str(code), []))
+        return sorted(chunk_ids)
+
+    def read(self, table: str, chunk_ids: Optional[List[int]] = None,
+             columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """저장된 청크를 열 dict 로 읽는다 (메모리 맵 후 이어 붙임). 아직 저장 안 된 버퍼는 포함하지 않는다."""
+        if chunk_ids is None:
+            chunk_ids = self._chunk_ids(table)
+        columns = columns or list(TABLES[table])
+        result = {}
+        for column in columns:
+            parts = [np.load(os.path.join(self.directory, table, f"{c:05d}", column + ".npy"), mmap_mode="r")
+                     for c in chunk_ids]
+            result[column] = np.concatenate(parts) if parts else np.zeros(0, dtype=TABLES[table][column])
+        return result
+
+    def player_codes(self, name: Optional[str] = None, team: Optional[str] = None,
+                     role: Optional[str] = None) -> List[int]:
+        """조건에 맞는 선수 코드 목록."""
+        return [i for i, (r, t, n, _) in enumerate(self.manifest["players"])
+                if (name is None or n == name) and (team is None or t == team) and (role is None or r == role)]
+
+    def plate_appearances(self, player: Optional[str] = None, team: Optional[str] = None,
+                          season: Optional[int] = None, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        타석 기록 조회. player(이름) 나 team 을 주면 색인으로 해당 청크만 읽는다.
+        player 는 타자/투수 양쪽으로 찾는다.
+        """
+        codes, index, player_codes = None, None, None
+        if player is not None:
+            player_codes = self.player_codes(player, team)
+            index, codes = "player", player_codes
+        elif team is not None:
+            index, codes = "team", [self._team_codes.get(team, -1)]
+        data = self.read("plate_appearances", self._chunk_ids("plate_appearances", index, codes))
+        mask = np.ones(len(data["game_id"]), dtype=bool)
+        if player_codes is not None:
+            mask &= np.isin(data["batter"], player_codes) | np.isin(data["pitcher"], player_codes)
+        elif team is not None:
+            mask &= data["team"] == self._team_codes.get(team, -1)
+        if season is not None:
+            mask &= data["season"] == season
+        columns = columns or list(PA_COLUMNS)
+        return {column: np.asarray(data[column][mask]) for column in columns}
+
+    def games(self, team: Optional[str] = None, season: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """경기 기록 조회 (team 을 주면 색인으로 해당 청크만 읽음)."""
+        code = self._team_codes.get(team, -1) if team is not None else None
+        data = self.read("games", self._chunk_ids("games", "team" if team is not None else None,
+                                                  [code] if team is not None else None))
+        mask = np.ones(len(data["game_id"]), dtype=bool)
+        if team is not None:
+            mask &= (data["team1"] == code) | (data["team2"] == code)
+        if season is not None:
+            mask &= data["season"] == season
+        return {column: np.asarray(values[mask]) for column, values in data.items()}
+
+    def batting_lines(self, player: Optional[str] = None, team: Optional[str] = None,
+                      season: Optional[int] = None) -> List[Dict[str, Any]]:
+        """타자별 타석 결과 집계 (타석, 결과별 횟수, 타석 중 득점)."""
+        data = self.plate_appearances(player, team, season, ["batter", "outcome", "runs"])
+        n_players, n_outcomes = len(self.manifest["players"]), len(self.manifest["outcomes"])
+        counts = np.zeros((n_players, n_outcomes), dtype=np.int64)
+        np.add.at(counts, (data["batter"], data["outcome"]), 1)
+        runs = np.bincount(data["batter"], weights=data["runs"], minlength=n_players)
+        lines = []
+        for code in np.flatnonzero(counts.sum(axis=1)).tolist():
+            role, player_team, name, position = self.manifest["players"][code]
+            if player is not None and name != player:
+                continue  # 투수로 검색된 타석은 제외
+            line = {"name": name, "team": player_team, "position": position, "PA": int(counts[code].sum()),
+                    "runs": int(runs[code])}
+            line.update({outcome: int(c) for outcome, c in zip(self.manifest["outcomes"], counts[code])})
+            lines.append(line)
+        return lines
+
+    def team_records(self, season: Optional[int] = None) -> List[Dict[str, Any]]:
+        """팀별 승/무/패와 득실점."""
+        data = self.games(season=season)
+        records = []
+        for code, team_name in enumerate(self.manifest["teams"]):
+            as1, as2 = data["team1"] == code, data["team2"] == code
+            scored = np.concatenate([data["score_team1"][as1], data["score_team2"][as2]]).astype(int)
+            allowed = np.concatenate([data["score_team2"][as1], data["score_team1"][as2]]).astype(int)
+            if scored.size == 0:
+                continue
+            records.append({
+                "team": team_name,
+                "games": int(scored.size),
+                "wins": int(np.count_nonzero(scored > allowed)),
+                "draws": int(np.count_nonzero(scored == allowed)),
+                "losses": int(np.count_nonzero(scored < allowed)),
+                "runs_scored": int(scored.sum()),
+                "runs_allowed": int(allowed.sum()),
+            })
+        return records
+
+    def export_parquet(self, table: str, path: str):
+        """테이블 전체를 Parquet 파일로 내보내기 (pyarrow 가 설치된 경우)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet 내보내기에는 pyarrow 가 필요합니다: pip install pyarrow")
+        pq.write_table(pa.table(self.read(table)), path)
+
+
+class ResultsSink(KBO.EventSink):
+    """
+    simulate_game 이벤트를 ResultsStore 에 기록하는 싱크.
+    seed / season 속성은 다음 경기에 기록할 값이므로 경기마다 바꿔 넣으면 된다.
+    타석 득점은 "타석 전 주자 + 타자 = 타석 후 주자 + 득점 + 새 아웃" 관계로 계산한다.
+    """
+
+    def __init__(self, store: ResultsStore, seed: int = 0, season: int = 0):
+        self.store = store
+        self.seed = seed
+        self.season = season
+        self._teams = (0, 0)
+        self.game_id = -1
+
+    def game_start(self, team1: Dict[str, Any], team2: Dict[str, Any], weather: str):
+        self.game_id = self.store.next_game_id()
+        self._teams = (self.store.team_code(team1["team_name"]), self.store.team_code(team2["team_name"]))
+        self._weather = self.store.weather_code(weather)
+
+    def inning_start(self, inning: int, half: str):
+        self._inning = inning
+        self._half = HALVES.index(half)
+        self._runners = 0
+        self._outs = 0
+
+    def plate_appearance(self, batter: Dict[str, Any], pitcher: Dict[str, Any]):
+        self._batter = self.store.player_code(batter, "타자")
+        self._pitcher = self.store.player_code(pitcher, "투수")
+
+    def at_bat_result(self, batter_name: str, result: str, outs: int):
+        self._outcome = self.store.outcome_code(result)
+        self._outs_after = outs
+
+    def bases_state(self, bases: List[Any]):
+        runners = (bases[0] is not None) + (bases[1] is not None) + (bases[2] is not None)
+        runs = self._runners + 1 - runners - (self._outs_after - self._outs)
+        self.store.append("plate_appearances", (
+            self.game_id, self.season, self._inning, self._half, self._teams[self._half],
+            self._batter, self._pitcher, self._outcome, runs, self._outs_after,
+        ))
+        self._runners, self._outs = runners, self._outs_after
+
+    def game_end(self, result: Dict[str, Any]):
+        self.store.append("games", (
+            self.game_id, self.season, self.seed, self._teams[0], self._teams[1], self._weather,
+            result["score_team1"], result["score_team2"],
+        ))
+
+    def close(self):
+        self.store.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
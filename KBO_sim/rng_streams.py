@@ -0,0 +1,95 @@
+"""
+경기별 재현 가능한 난수 스트림.
+
+시뮬레이션 함수들은 rng 인자(random.Random 호환 객체)를 받는다.
+여기서는 (기준 시드, 카운터...) 로 NumPy SeedSequence 를 만들어 경기마다 독립된 스트림을 주므로,
+워커 수나 실행 순서와 상관없이 "실행 s 의 k 번째 경기"는 항상 같은 결과가 나온다.
+PregeneratedRandom 은 균등난수를 블록 단위로 미리 뽑아 두고 하나씩 꺼내 쓴다.
+"""
+import random
+from itertools import chain, islice
+from operator import length_hint
+from typing import Iterator, List, Optional, Union
+
+import numpy as np
+
+DEFAULT_BLOCK_SIZE = 256  # 한 경기 타석 수(약 80) + 안타 유형 추첨을 넉넉히 덮는 크기
+BELOW_ONE = float(np.nextafter(1.0, 0.0))  # 대칭 난수 1 - u 가 1.0 이 되지 않도록 하는 상한
+
+
+def antithetic_uniforms(uniforms: np.ndarray) -> np.ndarray:
+    """대칭(antithetic) 난수 1 - u ([0, 1) 범위 유지)."""
+    return np.minimum(1.0 - uniforms, BELOW_ONE)
+
+
+def game_seed_sequence(run_seed: int, *counters: int) -> np.random.SeedSequence:
+    """기준 시드와 카운터(시즌 번호, 경기 번호 등)로 정해지는 SeedSequence."""
+    return np.random.SeedSequence([run_seed, *counters])
+
+
+class PregeneratedRandom(random.Random):
+    """
+    random.Random 호환 난수기. 균등난수를 NumPy PCG64 로 block_size 개씩 미리 만들어 두고 꺼내 쓴다.
+    random() 만 재정의하므로 choices / choice / randrange 등도 모두 이 스트림을 따른다.
+    getstate() 는 (SeedSequence, 꺼낸 난수 개수) 이고, setstate() 는 같은 시드로 다시 만들어 그 위치까지 건너뛴다.
+    copy / pickle 은 지원하지 않는다 (TypeError). 같은 스트림이 필요하면 getstate/setstate 나 시드를 쓴다.
+    :param seed: SeedSequence 또는 정수 시드 (None 이면 OS 엔트로피)
+    :param antithetic: True 면 같은 시드 스트림의 대칭 난수 1 - u 를 낸다
+    """
+
+    def __init__(self, seed: Union[np.random.SeedSequence, int, None] = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                 antithetic: bool = False):
+        self.block_size = block_size
+        self.antithetic = antithetic
+        super().__init__(seed)
+
+    def seed(self, a=None, version=2):
+        self.sequence = a if isinstance(a, np.random.SeedSequence) else np.random.SeedSequence(a)
+        generator = np.random.Generator(np.random.PCG64(self.sequence))
+        self._blocks = 0
+        self._current: Iterator[float] = iter(())
+
+        def blocks() -> Iterator[Iterator[float]]:
+            while True:
+                block = generator.random(self.block_size)
+                self._blocks += 1
+                # 꺼내 쓰는 블록 반복자를 들고 있어 getstate 에서 남은 개수를 알 수 있다
+                self._current = iter((antithetic_uniforms(block) if self.antithetic else block).tolist())
+                yield self._current
+
+        # 인스턴스 속성으로 덮어써서 타석마다 파이썬 함수 호출 한 단계를 줄인다
+        self.random = chain.from_iterable(blocks()).__next__
+
+    def random(self) -> float:
+        return self.random()  # seed() 에서 인스턴스 속성으로 대체됨
+
+    def getstate(self):
+        """(SeedSequence, 블록 크기, 대칭 여부, 지금까지 꺼낸 난수 개수)."""
+        position = self._blocks * self.block_size - length_hint(self._current)
+        return self.sequence, self.block_size, self.antithetic, position
+
+    def setstate(self, state):
+        """getstate() 의 상태로 되돌린다: 같은 시드로 다시 만들고 position 개를 건너뛴다."""
+        sequence, self.block_size, self.antithetic, position = state
+        self.seed(sequence)
+        for _ in islice(iter(self.random, None), position):
+            pass
+
+    def __reduce__(self):
+        raise TypeError(f"{type(self).__name__} 는 copy/pickle 을 지원하지 않습니다. getstate()/setstate() 나 시드를 쓰세요.")
+
+
+def game_rng(run_seed: int, *counters: int, pregenerate: bool = True) -> random.Random:
+    """
+    한 경기용 난수기.
+    :param pregenerate: False 면 같은 시드의 일반 random.Random (메르센 트위스터)
+    """
+    sequence = game_seed_sequence(run_seed, *counters)
+    if pregenerate:
+        return PregeneratedRandom(sequence)
+    return random.Random(int(sequence.generate_state(1, np.uint64)[0]))
+
+
+def spawn_seeds(run_seed: Optional[int], n: int) -> List[np.random.SeedSequence]:
+    """하위 작업 n 개에 나눠 줄 독립 SeedSequence (SeedSequence.spawn)."""
+    return np.random.SeedSequence(run_seed).spawn(n)
@@ -0,0 +1,150 @@
+"""
+선수 데이터 캐시.
+
+load_pitcher_data / load_batter_data 는 매번 pandas 로 xlsx 를 읽고 iterrows 로 dict 를 만든다.
+처음 한 번만 원본을 읽어 열 단위 .npz 파일(숫자 열 + 이름/팀 문자열 표)로 저장해 두고,
+이후에는 pandas 없이 NumPy 만으로 불러온다.
+캐시는 원본 파일의 수정 시각/크기와 SHA-256 해시로 검증한다.
+"""
+import contextlib
+import hashlib
+import json
+import math
+import os
+import tempfile
+from typing import List, Dict, Any, Optional, Callable
+
+import numpy as np
+
+import KBO
+
+CACHE_VERSION = 1
+CACHE_DIR_NAME = ".roster_cache"
+
+# 선수 dict 의 문자열 필드
+STRING_FIELDS = ["name", "team", "position", "weather"]
+
+
+def cache_path(source_path: str) -> str:
+    """원본 파일 옆 .roster_cache 폴더 안의 캐시 파일 경로."""
+    directory, filename = os.path.split(os.path.abspath(source_path))
+    return os.path.join(directory, CACHE_DIR_NAME, filename + ".npz")
+
+
+def file_hash(path: str) -> str:
+    """파일 내용의 SHA-256 해시."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def save_roster_cache(players: List[Dict[str, Any]], source_path: str, cache_file: Optional[str] = None,
+                      sha256: Optional[str] = None):
+    """
+    선수 리스트를 열 단위 .npz 로 저장 (임시 파일에 쓴 뒤 교체).
+    :param sha256: 이미 계산한 원본 해시 (없으면 다시 계산)
+    """
+    cache_file = cache_file or cache_path(source_path)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+    stat_names = list(players[0]["stats"].keys()) if players else []
+    source = os.stat(source_path)
+    meta = {
+        "version": CACHE_VERSION,
+        "mtime_ns": source.st_mtime_ns,
+        "size": source.st_size,
+        "sha256": sha256 or file_hash(source_path),
+        "stat_names": stat_names,
+    }
+
+    columns = {"meta": np.array(json.dumps(meta, ensure_ascii=False))}
+    for field in STRING_FIELDS:
+        values = [player[field] for player in players]
+        columns[f"str_{field}"] = np.array(["" if _is_missing(v) else str(v) for v in values])
+        columns[f"missing_{field}"] = np.array([_is_missing(v) for v in values], dtype=bool)
+    for i, stat in enumerate(stat_names):
+        values = [player["stats"].get(stat, 0) for player in players]
+        # 모두 정수면 정수 열로 저장해 출력 형식(예: 타수)을 원본과 같게 유지
+        is_int = all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in values)
+        columns[f"stat_{i}"] = np.array(values, dtype=np.int64 if is_int else np.float64)
+
+    # 여러 프로세스가 동시에 캐시를 만들어도 서로의 임시 파일을 건드리지 않도록 임시 파일 이름은 매번 새로 만든다
+    fd, tmp_file = tempfile.mkstemp(prefix=os.path.basename(cache_file) + ".", suffix=".tmp",
+                                    dir=os.path.dirname(cache_file))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp_file, cache_file)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_file)
+        raise
+
+
+def load_roster_cache(source_path: str, cache_file: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    캐시가 유효하면 선수 리스트를 반환, 없거나 원본과 다르면 None.
+    수정 시각과 크기가 같으면 바로 사용하고, 다르면 해시까지 비교한다.
+    해시가 같으면(원본을 다시 저장만 한 경우 등) 새 수정 시각으로 캐시를 다시 써서 다음부터는 해시를 건너뛴다.
+    """
+    cache_file = cache_file or cache_path(source_path)
+    if not os.path.exists(cache_file):
+        return None
+
+    with np.load(cache_file, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.get("version") != CACHE_VERSION:
+            return None
+        source = os.stat(source_path)
+        stale_meta = (meta["mtime_ns"], meta["size"]) != (source.st_mtime_ns, source.st_size)
+        if stale_meta:
+            if meta["size"] != source.st_size or meta["sha256"] != file_hash(source_path):
+                return None
+
+        strings = {}
+        for field in STRING_FIELDS:
+            values = data[f"str_{field}"].tolist()
+            missing = data[f"missing_{field}"].tolist()
+            strings[field] = [float("nan") if m else v for v, m in zip(values, missing)]
+        stats = {stat: data[f"stat_{i}"].tolist() for i, stat in enumerate(meta["stat_names"])}
+
+    players = [
+        {
+            "name": strings["name"][i],
+            "team": strings["team"][i],
+            "position": strings["position"][i],
+            "weather": strings["weather"][i],
+            "stats": {stat: values[i] for stat, values in stats.items()},
+        }
+        for i in range(len(strings["name"]))
+    ]
+    if stale_meta:
+        try:
+            save_roster_cache(players, source_path, cache_file, sha256=meta["sha256"])
+        except OSError:
+            pass  # 읽기 전용 폴더면 다음에도 해시로 검증
+    return players
+
+
+def _load_cached(file_path: str, loader: Callable[[str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    players = load_roster_cache(file_path)
+    if players is None:
+        players = loader(file_path)
+        save_roster_cache(players, file_path)
+    return players
+
+
+def load_pitcher_data_cached(file_path: str) -> List[Dict[str, Any]]:
+    """load_pitcher_data 와 같은 결과를 캐시에서 로드 (캐시가 없으면 만든다)."""
+    return _load_cached(file_path, KBO.load_pitcher_data)
+
+
+def load_batter_data_cached(file_path: str) -> List[Dict[str, Any]]:
+    """load_batter_data 와 같은 결과를 캐시에서 로드 (캐시가 없으면 만든다)."""
+    return _load_cached(file_path, KBO.load_batter_data)
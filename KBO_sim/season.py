@@ -0,0 +1,206 @@
+"""
+10개 구단 정규시즌(팀당 144경기) 시뮬레이션.
+
+auto_configure_teams 로 구성한 팀들로 실제 일정과 같은 라운드 로빈 일정을 만들고,
+선발 5명을 로테이션으로 돌리면서 시즌 단위 작업을 ProcessPoolExecutor 로 나눠 실행한다.
+워커는 중계 출력 없이(NULL_SINK) 경기당 한 줄짜리 정수 배열만 돌려준다.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+import KBO
+from boxscore import BoxScore, BoxScoreSink, print_batting_table, print_pitching_table
+from matchup_table import build_matchup_table
+from model import Roster, build_roster
+from rng_streams import game_rng
+from roster_cache import load_pitcher_data_cached, load_batter_data_cached
+
+GAMES_PER_TEAM = 144
+ROTATION_SIZE = 5
+
+# 경기 결과 배열의 열 순서
+RESULT_COLUMNS = ["season", "game", "away", "home", "away_runs", "home_runs", "weather"]
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PITCHER_FILE = os.path.join(DATA_DIR, "KBO 2024 투수 종합지표.xlsx")
+DEFAULT_BATTER_FILE = os.path.join(DATA_DIR, "KBO2024 타자 종합지표.xlsx")
+
+
+def build_season_schedule(n_teams: int, games_per_team: int = GAMES_PER_TEAM) -> np.ndarray:
+    """
+    라운드 로빈(서클 방식) 일정을 만든다. 매 경기일마다 모든 팀이 한 경기씩 치르며,
+    같은 두 팀은 홈/원정을 번갈아 가며 같은 횟수만큼 만난다.
+    :return: (경기 수, 2) 배열, 각 행은 (원정 팀 번호, 홈 팀 번호)
+    """
+    if n_teams % 2:
+        raise ValueError("팀 수는 짝수여야 합니다.")
+    rounds_per_cycle = n_teams - 1
+    if games_per_team % rounds_per_cycle:
+        raise ValueError(f"팀당 경기 수는 {rounds_per_cycle}의 배수여야 합니다.")
+
+    games = []
+    for cycle in range(games_per_team // rounds_per_cycle):
+        order = list(range(n_teams))
+        for _ in range(rounds_per_cycle):
+            for i in range(n_teams // 2):
+                away, home = order[i], order[n_teams - 1 - i]
+                if (i + cycle) % 2:  # 사이클마다 홈/원정 교대
+                    away, home = home, away
+                games.append((away, home))
+            order = [order[0], order[-1]] + order[1:-1]  # 첫 팀 고정, 나머지 회전
+    return np.array(games, dtype=np.int16)
+
+
+def rotation_slots(schedule: np.ndarray, n_teams: int) -> np.ndarray:
+    """각 경기의 (원정 선발 순번, 홈 선발 순번). 팀별 경기 수를 세어 5인 로테이션을 돌린다."""
+    played = np.zeros(n_teams, dtype=np.int64)
+    slots = np.zeros(schedule.shape, dtype=np.int16)
+    for g, (away, home) in enumerate(schedule):
+        slots[g] = (played[away] % ROTATION_SIZE, played[home] % ROTATION_SIZE)
+        played[away] += 1
+        played[home] += 1
+    return slots
+
+
+def day_roster(team: Dict[str, Any], slot: int) -> Dict[str, Any]:
+    """그날 선발 한 명만 starters 에 넣은 팀 구성 (선발이 1~5이닝을 던진다)."""
+    starters = team["pitchers"]["starters"]
+    return {
+        "team_name": team["team_name"],
+        "batters": team["batters"],
+        "pitchers": {"starters": [starters[slot % len(starters)]], "relievers": team["pitchers"]["relievers"]},
+    }
+
+
+# 워커 프로세스별 상태 (팀 구성과 대결 확률표는 워커 시작 시 한 번만 만든다)
+_worker: Dict[str, Any] = {}
+
+
+def season_roster(teams: List[Dict[str, Any]]) -> Roster:
+    """박스스코어용 Roster. 같은 팀 리스트면 어느 프로세스에서 만들어도 선수 ID 가 같다."""
+    return build_roster({team["team_name"]: team for team in teams})
+
+
+def _init_worker(teams: List[Dict[str, Any]], schedule: np.ndarray, box_scores: bool = False):
+    _worker["teams"] = teams
+    _worker["schedule"] = schedule
+    _worker["slots"] = rotation_slots(schedule, len(teams))
+    _worker["table"] = build_matchup_table({team["team_name"]: team for team in teams})
+    _worker["box"] = BoxScore(season_roster(teams)) if box_scores else None
+
+
+def _simulate_season(seed: int, season_index: int):
+    """
+    시즌 하나를 조용히 시뮬레이션하고 경기별 결과 배열(RESULT_COLUMNS)을 반환.
+    박스스코어를 모으는 워커면 (결과, 타격 기록 배열, 투구 기록 배열)을 반환.
+    """
+    teams, schedule, slots, table = _worker["teams"], _worker["schedule"], _worker["slots"], _worker["table"]
+    box = _worker["box"]
+    if box is not None:
+        box.reset()
+    sink = KBO.NULL_SINK if box is None else BoxScoreSink(box)
+
+    results = np.zeros((len(schedule), len(RESULT_COLUMNS)), dtype=np.int32)
+    for g, ((away, home), (away_slot, home_slot)) in enumerate(zip(schedule, slots)):
+        # (시드, 시즌, 경기) 별 독립 스트림이라 워커 수나 실행 순서와 관계없이 같은 경기는 같은 결과
+        rng = game_rng(seed, season_index, g)
+        weather = KBO.get_random_weather(rng)
+        game = KBO.simulate_game(day_roster(teams[away], away_slot), day_roster(teams[home], home_slot),
+                                 weather, table, sink, rng)
+        results[g] = (season_index, g, away, home, game["score_team1"], game["score_team2"],
+                      KBO.WEATHER_OPTIONS.index(weather))
+    if box is None:
+        return results
+    return results, box.batting.copy(), box.pitching.copy()
+
+
+def simulate_seasons(teams: List[Dict[str, Any]], n_seasons: int, workers: Optional[int] = None,
+                     seed: int = 0, box_scores: bool = False):
+    """
+    n_seasons 시즌을 프로세스 풀에서 시뮬레이션.
+    :param teams: auto_configure_teams 로 구성한 팀 리스트 (순서가 팀 번호)
+    :param box_scores: True 면 선수별 기록도 모아 (결과, 전체 시즌 누적 BoxScore)를 반환
+    :return: 모든 경기 결과 (경기 수, len(RESULT_COLUMNS))
+    """
+    schedule = build_season_schedule(len(teams))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(teams, schedule, box_scores)) as pool:
+        seasons = list(pool.map(_simulate_season, [seed] * n_seasons, range(n_seasons)))
+    if not box_scores:
+        return np.concatenate(seasons)
+
+    box = BoxScore(season_roster(teams))
+    for _, batting, pitching in seasons:
+        box.merge(batting, pitching)
+    return np.concatenate([season[0] for season in seasons]), box
+
+
+def compute_standings(results: np.ndarray, team_names: List[str]) -> List[Dict[str, Any]]:
+    """경기 결과로 시즌 평균 순위표(승/패/무, 승률, 득실점)를 계산. 승률 = 승 / (승 + 패)."""
+    n_seasons = len(np.unique(results[:, 0]))
+    away, home = results[:, 2], results[:, 3]
+    away_runs, home_runs = results[:, 4], results[:, 5]
+    n_teams = len(team_names)
+
+    wins = np.bincount(away, away_runs > home_runs, n_teams) + np.bincount(home, home_runs > away_runs, n_teams)
+    losses = np.bincount(away, away_runs < home_runs, n_teams) + np.bincount(home, home_runs < away_runs, n_teams)
+    draws = np.bincount(away, away_runs == home_runs, n_teams) + np.bincount(home, home_runs == away_runs, n_teams)
+    runs_scored = np.bincount(away, away_runs, n_teams) + np.bincount(home, home_runs, n_teams)
+    runs_allowed = np.bincount(away, home_runs, n_teams) + np.bincount(home, away_runs, n_teams)
+
+    standings = []
+    for i, name in enumerate(team_names):
+        decided = wins[i] + losses[i]
+        standings.append({
+            "team_name": name,
+            "wins": wins[i] / n_seasons,
+            "losses": losses[i] / n_seasons,
+            "draws": draws[i] / n_seasons,
+            "win_pct": wins[i] / decided if decided else 0.0,
+            "runs_scored": runs_scored[i] / n_seasons,
+            "runs_allowed": runs_allowed[i] / n_seasons,
+            "run_diff": (runs_scored[i] - runs_allowed[i]) / n_seasons,
+        })
+    return sorted(standings, key=lambda x: x["win_pct"], reverse=True)
+
+
+def print_standings(standings: List[Dict[str, Any]]):
+    """시즌 평균 순위표 출력."""
+    print("\n--- 시즌 순위 (시즌 평균) ---")
+    print(f"{'순위':<5} {'팀':<8} {'승':<7} {'패':<7} {'무':<6} {'승률':<7} {'득점':<8} {'실점':<8} {'득실차':<8}")
+    print("-" * 75)
+    for rank, row in enumerate(standings, 1):
+        print(f"{rank:<5} {row['team_name']:<8} {row['wins']:<7.1f} {row['losses']:<7.1f} {row['draws']:<6.1f} "
+              f"{row['win_pct']:<7.3f} {row['runs_scored']:<8.1f} {row['runs_allowed']:<8.1f} {row['run_diff']:<+8.1f}")
+
+
+# --- 메인 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 정규시즌 시뮬레이션")
+    parser.add_argument("--seasons", type=int, default=10, help="시뮬레이션할 시즌 수")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--seed", type=int, default=0, help="기준 시드")
+    parser.add_argument("--pitchers", default=DEFAULT_PITCHER_FILE, help="투수 데이터 xlsx 경로")
+    parser.add_argument("--batters", default=DEFAULT_BATTER_FILE, help="타자 데이터 xlsx 경로")
+    parser.add_argument("--box-scores", action="store_true", help="선수별 시즌 평균 기록 출력")
+    args = parser.parse_args()
+
+    team_data = KBO.group_by_team(load_pitcher_data_cached(args.pitchers), load_batter_data_cached(args.batters))
+    all_teams = list(KBO.auto_configure_teams(team_data, None).values())
+
+    if args.box_scores:
+        season_results, season_box = simulate_seasons(all_teams, args.seasons, args.workers, args.seed, box_scores=True)
+    else:
+        season_results = simulate_seasons(all_teams, args.seasons, args.workers, args.seed)
+    print_standings(compute_standings(season_results, [team["team_name"] for team in all_teams]))
+
+    if args.box_scores:
+        average = season_box.scaled(1 / args.seasons)
+        print("\n--- 홈런 상위 타자 (시즌 평균) ---")
+        print_batting_table(sorted(average.batting_table(), key=lambda x: x["HR"], reverse=True), limit=20)
+        print("\n--- 투수 기록 (시즌 평균, 이닝 순) ---")
+        print_pitching_table(sorted(average.pitching_table(), key=lambda x: x["OUTS"], reverse=True), limit=20)
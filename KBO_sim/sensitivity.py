@@ -0,0 +1,403 @@
+"""
+선수 스탯 민감도 분석: 타율/볼넷%/삼진%(타자), ERA/볼넷/9/삼진/9(투수)를 조금씩 바꿨을 때 득점과 승률이 얼마나 변하는지.
+
+calculate_probability 가 쓰는 스탯(calculate_out_probability 의 ERA/타율 포함)에 변화량 격자를 주고,
+선수 x 스탯 x 변화량마다 선수 사본(Perturbation.variant)을 만들어 모든 변형 로스터를 한 배치로 평가한다.
+- 모든 변형은 variance.crn_uniforms 의 같은 공통 난수(반 이닝, 타순, 경기)를 쓰므로 기준 로스터와의 차이에 잡음이 거의 없다.
+- 변형 선수가 나오지 않는 반 이닝은 공통 난수 덕분에 기준과 결과가 같으므로 다시 돌리지 않는다.
+  타자는 자기 팀 공격 9개 반 이닝, 투수는 자기가 던지는 이닝만 (변형, 반 이닝) 행이 된다.
+- 그 행에서도 바뀐 결과표로 뽑은 결과가 기준과 한 타석이라도 다른 경기만 (행, 경기) 항목으로 모아 한꺼번에 다시 진행한다.
+  변화량이 작으면 대부분의 경기는 그대로라 전체를 다시 돌리는 것보다 훨씬 적게 진행한다.
+- 경기별 (변화량 x 효과)의 기울기(원점을 지나는 최소제곱)를 평균해 스탯 1 단위당 득실차/승률 변화와 표준오차를 낸다.
+
+사용법: python sensitivity.py --games 1000 --stat 타율 --top 20
+"""
+import argparse
+import contextlib
+import io
+import math
+from itertools import permutations
+from typing import List, Dict, Any, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+import KBO
+from batch_sim import OUTCOMES, VALUE_ORDER, get_transition_table, half_inning_table, play_half_innings, value_ordered
+from roster_cache import load_pitcher_data_cached, load_batter_data_cached
+from season import DEFAULT_PITCHER_FILE, DEFAULT_BATTER_FILE
+from variance import HALF_INNINGS, crn_uniforms
+
+BATTER_STATS = ["볼넷%", "삼진%", "타율"]
+PITCHER_STATS = ["볼넷/9", "삼진/9", "ERA"]
+# 기본 변화량 격자 (스탯 -> 더하는 값)
+DEFAULT_GRID = {
+    "볼넷%": (-1.0, 1.0),
+    "삼진%": (-1.0, 1.0),
+    "타율": (-0.010, 0.010),
+    "볼넷/9": (-0.5, 0.5),
+    "삼진/9": (-0.5, 0.5),
+    "ERA": (-0.5, 0.5),
+}
+# 출력 단위 (타율은 1푼 = 0.010 당, 나머지는 1 당)
+REPORT_UNITS = {"타율": 0.010}
+CHUNK_GAMES = 200_000  # 한 번에 다시 돌릴 (행, 경기) 항목 수 상한
+
+
+class Perturbation(NamedTuple):
+    """선수 한 명의 스탯 하나를 delta 만큼 바꾼 변형. variant 는 바뀐 스탯을 가진 선수 사본."""
+    player: Dict[str, Any]
+    is_batter: bool
+    stat: str
+    delta: float
+    variant: Dict[str, Any]
+
+
+def perturb(player: Dict[str, Any], is_batter: bool, stat: str, delta: float) -> Perturbation:
+    """player["stats"][stat] 에 delta 를 더한 사본을 만든다 (원본은 그대로)."""
+    allowed = BATTER_STATS if is_batter else PITCHER_STATS
+    if stat not in allowed:
+        raise ValueError(f"{'타자' if is_batter else '투수'} 스탯은 {', '.join(allowed)} 중 하나여야 합니다: {stat}")
+    stats = dict(player["stats"])
+    stats[stat] = stats.get(stat, 0) + delta
+    return Perturbation(player, is_batter, stat, float(delta), {**player, "stats": stats})
+
+
+def _unique(players: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen, result = set(), []
+    for player in players:
+        if id(player) not in seen:
+            seen.add(id(player))
+            result.append(player)
+    return result
+
+
+def game_pitchers(team: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """경기에 실제로 나오는 투수 (select_pitcher 로 1~9이닝에 고르는 투수)."""
+    return _unique([KBO.select_pitcher(team["pitchers"], inning) for inning in range(1, 10)])
+
+
+def build_perturbations(teams: Sequence[Dict[str, Any]], grid: Optional[Dict[str, Sequence[float]]] = None
+                        ) -> List[Perturbation]:
+    """
+    팀들의 타순 타자와 등판 투수 전원에 대해 격자의 (스탯, 변화량) 변형을 만든다.
+    :param grid: 스탯 -> 변화량 목록 (기본: DEFAULT_GRID). 없는 스탯은 건너뛴다.
+    """
+    grid = DEFAULT_GRID if grid is None else grid
+    for stat in grid:
+        if stat not in BATTER_STATS and stat not in PITCHER_STATS:
+            raise ValueError(f"calculate_probability 가 쓰지 않는 스탯입니다: {stat}")
+    perturbations = []
+    for team in teams:
+        for is_batter, players, stats in ((True, _unique(team["batters"]), BATTER_STATS),
+                                          (False, game_pitchers(team), PITCHER_STATS)):
+            for player in players:
+                for stat in stats:
+                    for delta in grid.get(stat, ()):
+                        perturbations.append(perturb(player, is_batter, stat, delta))
+    return perturbations
+
+
+def _half_innings(team1: Dict[str, Any], team2: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """simulate_games_batch 의 반 이닝 순서(1회 초, 1회 말, ...)대로 (공격 팀, 투수)."""
+    halves = []
+    for inning in range(1, 10):
+        halves.append((team1, KBO.select_pitcher(team2["pitchers"], inning)))
+        halves.append((team2, KBO.select_pitcher(team1["pitchers"], inning)))
+    return halves
+
+
+def draw_outcomes(ordered: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+    """
+    VALUE_ORDER 순서 누적 확률 (..., 9) 과 균등난수 (...) 로 결과 번호(OUTCOMES 순서)를 뽑는다.
+    batch_sim.play_half_innings 의 공통 난수 모드와 같이 u 이하인 누적 확률 개수(searchsorted side="right")로 정한다.
+    """
+    return np.asarray(VALUE_ORDER)[np.count_nonzero(ordered <= uniforms[..., None], axis=-1)]
+
+
+def play_entries(ordered: np.ndarray, lengths: np.ndarray, halves: np.ndarray, uniforms: np.ndarray,
+                 rows: np.ndarray, games: np.ndarray) -> np.ndarray:
+    """
+    (행, 경기) 항목마다 그 행의 결과표와 그 경기의 공통 난수로 반 이닝을 동시에 진행.
+    :param ordered: (행, 타순, 9) VALUE_ORDER 순서 누적 확률 (타순이 짧은 행은 lengths 이후를 쓰지 않음)
+    :param lengths: (행,) 타순 길이
+    :param halves: (행,) 각 행이 쓸 반 이닝 번호 (uniforms 의 첫 축)
+    :param uniforms: (18 반 이닝, 타순, 경기 수) 공통 난수
+    :param rows: (항목,) 행 번호
+    :param games: (항목,) 경기 번호
+    :return: (항목,) 득점
+    """
+    table = get_transition_table()
+    next_bases, next_outs, runs_table = table["next_bases"], table["next_outs"], table["runs"]
+
+    bases = np.zeros(rows.size, dtype=np.int8)
+    outs = np.zeros(rows.size, dtype=np.int8)
+    runs = np.zeros(rows.size, dtype=np.int32)
+    row_lengths = lengths[rows]
+
+    for slot in range(ordered.shape[1]):
+        active = np.flatnonzero((outs < 3) & (slot < row_lengths))
+        if active.size == 0:
+            break
+        r = rows[active]
+        outcome = draw_outcomes(ordered[r, slot], uniforms[halves[r], slot, games[active]])
+        b = bases[active]
+        o = outs[active]
+        runs[active] += runs_table[outcome, b, o]
+        bases[active] = next_bases[outcome, b, o]
+        outs[active] = next_outs[outcome, b, o]
+
+    return runs
+
+
+def changed_games(ordered: np.ndarray, base_ordered: np.ndarray, base_outcomes: np.ndarray,
+                  uniforms: np.ndarray) -> np.ndarray:
+    """
+    변형 결과표로 뽑은 결과가 기준과 한 타석이라도 다른 경기 번호.
+    공통 난수에서는 나머지 경기의 진행이 기준과 똑같으므로 이 경기들만 다시 돌리면 된다.
+    :param ordered: (타순, 9) 변형 반 이닝의 VALUE_ORDER 누적 확률
+    :param base_ordered: (타순, 9) 기준 반 이닝의 누적 확률
+    :param base_outcomes: (타순, 경기 수) 기준 결과 번호
+    :param uniforms: (타순, 경기 수) 그 반 이닝의 공통 난수
+    """
+    slots = np.flatnonzero((ordered != base_ordered).any(axis=1))
+    if slots.size == 0:
+        return np.zeros(0, dtype=np.intp)
+    outcomes = draw_outcomes(ordered[slots, None, :], uniforms[slots])
+    return np.flatnonzero((outcomes != base_outcomes[slots]).any(axis=0))
+
+
+def matchup_sensitivity(team1: Dict[str, Any], team2: Dict[str, Any], weather: str,
+                        perturbations: Sequence[Perturbation], n_games: int = 1000, seed: int = 0,
+                        chunk_games: int = CHUNK_GAMES) -> Dict[str, Any]:
+    """
+    팀1(초 공격) vs 팀2(말 공격) 대진에서 각 변형의 경기별 효과를 공통 난수로 계산.
+    기준 점수는 simulate_games_batch(uniforms=crn_uniforms(seed, n_games, 타순 길이)) 와 같고,
+    변형 점수도 바꾼 선수로 simulate_games_batch 를 같은 난수로 돌린 결과와 같다.
+    :return: baseline 점수와, 변형마다 선수 팀 기준 경기별 득실차 변화 "runs" (변형 수, n_games),
+             승리(1)/그 외(0) 변화 "wins", 선수가 뛴 쪽 "side" (1: 팀1, 2: 팀2, None: 이 대진에 안 나옴)
+    """
+    lineup_size = max(len(team1["batters"]), len(team2["batters"]))
+    uniforms = crn_uniforms(seed, n_games, lineup_size)
+    halves = _half_innings(team1, team2)
+    lineups = [batting["batters"] for batting, _ in halves]
+    pitchers = [pitcher for _, pitcher in halves]
+
+    # 타자 x 투수 누적 확률 행은 한 번만 계산 (변형 타자는 자기 행만 바뀐다)
+    rows_memo: Dict[Tuple[int, int], np.ndarray] = {}
+
+    def table_for(lineup: List[Dict[str, Any]], pitcher: Dict[str, Any]) -> np.ndarray:
+        for batter in lineup:
+            if (id(batter), id(pitcher)) not in rows_memo:
+                rows_memo[id(batter), id(pitcher)] = half_inning_table([batter], pitcher, weather)[0]
+        return np.array([rows_memo[id(batter), id(pitcher)] for batter in lineup])
+
+    tables = [table_for(lineups[h], pitchers[h]) for h in range(HALF_INNINGS)]
+    base_runs = [play_half_innings(tables[h], n_games, None, uniforms[h]) for h in range(HALF_INNINGS)]
+    base_ordered = [value_ordered(table) for table in tables]
+    base_outcomes = [draw_outcomes(base_ordered[h][:, None, :], uniforms[h, :len(lineups[h])])
+                     for h in range(HALF_INNINGS)]
+    base_scores = np.zeros((2, n_games), dtype=np.int32)
+    for h in range(HALF_INNINGS):
+        base_scores[h % 2] += base_runs[h]
+
+    # (변형, 바뀌는 반 이닝) 행마다 결과가 달라지는 경기만 모아 한 번에 진행
+    variant_ordered: List[np.ndarray] = []
+    variant_halves: List[int] = []
+    touched: List[List[Tuple[int, int, np.ndarray]]] = []  # 변형별 (반 이닝, 행 번호, 다시 돌릴 경기)
+    for perturbation in perturbations:
+        player, variant, rows = perturbation.player, perturbation.variant, []
+        for h in range(HALF_INNINGS):
+            if perturbation.is_batter and any(batter is player for batter in lineups[h]):
+                table = table_for([variant if batter is player else batter for batter in lineups[h]], pitchers[h])
+            elif not perturbation.is_batter and pitchers[h] is player:
+                table = table_for(lineups[h], variant)
+            else:
+                continue
+            ordered = value_ordered(table)
+            games = changed_games(ordered, base_ordered[h], base_outcomes[h], uniforms[h, :len(lineups[h])])
+            rows.append((h, len(variant_ordered), games))
+            variant_ordered.append(ordered)
+            variant_halves.append(h)
+        touched.append(rows)
+
+    replayed = np.zeros(0, dtype=np.int32)
+    if variant_ordered:
+        lengths = np.array([ordered.shape[0] for ordered in variant_ordered])
+        stacked = np.ones((len(variant_ordered), lineup_size, len(OUTCOMES)))
+        for row, ordered in enumerate(variant_ordered):
+            stacked[row, :ordered.shape[0]] = ordered
+        entry_rows = np.concatenate([np.full(games.size, row, dtype=np.intp)
+                                     for rows in touched for _, row, games in rows] + [np.zeros(0, dtype=np.intp)])
+        entry_games = np.concatenate([games for rows in touched for _, _, games in rows] + [np.zeros(0, dtype=np.intp)])
+        replayed = np.concatenate([np.zeros(0, dtype=np.int32)] + [
+            play_entries(stacked, lengths, np.array(variant_halves), uniforms,
+                         entry_rows[start:start + chunk_games], entry_games[start:start + chunk_games])
+            for start in range(0, entry_rows.size, chunk_games)])
+
+    runs = np.zeros((len(perturbations), n_games), dtype=np.int32)
+    wins = np.zeros((len(perturbations), n_games), dtype=np.int8)
+    sides: List[Optional[int]] = []
+    offset = 0
+    for i, (perturbation, rows) in enumerate(zip(perturbations, touched)):
+        if not rows:
+            sides.append(None)
+            continue
+        scores = base_scores.copy()
+        for h, _, games in rows:
+            scores[h % 2, games] += replayed[offset:offset + games.size] - base_runs[h][games]
+            offset += games.size
+        # 타자는 공격하는 쪽, 투수는 수비하는 쪽이 선수 팀
+        own = rows[0][0] % 2 if perturbation.is_batter else 1 - rows[0][0] % 2
+        sides.append(own + 1)
+        base_diff = base_scores[own] - base_scores[1 - own]
+        diff = scores[own] - scores[1 - own]
+        runs[i] = diff - base_diff
+        wins[i] = (diff > 0).astype(np.int8) - (base_diff > 0)
+
+    return {
+        "team1": team1["team_name"],
+        "team2": team2["team_name"],
+        "weather": weather,
+        "n_games": n_games,
+        "team1_scores": base_scores[0],
+        "team2_scores": base_scores[1],
+        "runs": runs,
+        "wins": wins,
+        "side": sides,
+    }
+
+
+class _Accumulator:
+    """(선수, 역할, 스탯)별 경기 단위 기울기의 합/제곱합과 변화량별 평균 효과."""
+
+    def __init__(self, team_name: str, perturbation: Perturbation):
+        self.team_name = team_name
+        self.player = perturbation.player
+        self.is_batter = perturbation.is_batter
+        self.stat = perturbation.stat
+        self.deltas: List[float] = []
+        self.effects: Dict[float, List[float]] = {}  # delta -> [득실차 합, 승률 합, 경기 수]
+        self.sums = np.zeros(4)  # 득점 기울기 합, 제곱합, 승률 기울기 합, 제곱합
+        self.games = 0
+
+    def add(self, deltas: np.ndarray, runs: np.ndarray, wins: np.ndarray):
+        """runs/wins: (변화량 수, 경기 수) 같은 대진의 효과."""
+        scale = float(np.dot(deltas, deltas))
+        run_slope = deltas @ runs / scale
+        win_slope = deltas @ wins / scale
+        self.sums += [run_slope.sum(), np.dot(run_slope, run_slope), win_slope.sum(), np.dot(win_slope, win_slope)]
+        self.games += runs.shape[1]
+        for delta, run_row, win_row in zip(deltas.tolist(), runs, wins):
+            if delta not in self.effects:
+                self.deltas.append(delta)
+                self.effects[delta] = [0.0, 0.0, 0]
+            effect = self.effects[delta]
+            effect[0] += float(run_row.sum())
+            effect[1] += float(win_row.sum())
+            effect[2] += run_row.size
+
+    def row(self) -> Dict[str, Any]:
+        n = self.games
+        runs_mean, wins_mean = self.sums[0] / n, self.sums[2] / n
+        runs_var = max(self.sums[1] / n - runs_mean ** 2, 0.0) * n / max(n - 1, 1)
+        wins_var = max(self.sums[3] / n - wins_mean ** 2, 0.0) * n / max(n - 1, 1)
+        return {
+            "team": self.team_name,
+            "name": self.player["name"],
+            "role": "타자" if self.is_batter else "투수",
+            "stat": self.stat,
+            "games": n,
+            "deltas": sorted(self.deltas),
+            "runs_by_delta": [self.effects[d][0] / self.effects[d][2] for d in sorted(self.deltas)],
+            "wins_by_delta": [self.effects[d][1] / self.effects[d][2] for d in sorted(self.deltas)],
+            "runs_per_unit": float(runs_mean),
+            "runs_per_unit_stderr": math.sqrt(runs_var / n),
+            "wins_per_unit": float(wins_mean),
+            "wins_per_unit_stderr": math.sqrt(wins_var / n),
+        }
+
+
+def _accumulate(accumulators: Dict[Tuple[int, bool, str], _Accumulator], result: Dict[str, Any],
+                perturbations: Sequence[Perturbation], team_of: Optional[Dict[int, str]]):
+    groups: Dict[Tuple[int, bool, str], List[int]] = {}
+    for i, (perturbation, side) in enumerate(zip(perturbations, result["side"])):
+        if side is not None:
+            groups.setdefault((id(perturbation.player), perturbation.is_batter, perturbation.stat), []).append(i)
+    for key, indices in groups.items():
+        accumulator = accumulators.get(key)
+        if accumulator is None:
+            first = perturbations[indices[0]]
+            team_name = (team_of or {}).get(id(first.player), first.player.get("team"))
+            accumulator = accumulators[key] = _Accumulator(team_name, first)
+        deltas = np.array([perturbations[i].delta for i in indices])
+        accumulator.add(deltas, result["runs"][indices], result["wins"][indices])
+
+
+def marginal_values(results: Sequence[Tuple[Dict[str, Any], Sequence[Perturbation]]],
+                    team_of: Optional[Dict[int, str]] = None) -> List[Dict[str, Any]]:
+    """
+    matchup_sensitivity 결과들을 (선수, 역할, 스탯)별로 모아 스탯 1 단위당 효과를 계산.
+    경기마다 변화량과 효과의 원점 기울기 sum(d * y) / sum(d^2) 를 구해 평균하므로, 격자가 -d, +d 면 중앙 차분과 같다.
+    :param results: (matchup_sensitivity 결과, 그때 넘긴 변형 목록) 쌍
+    :param team_of: id(선수) -> 팀 이름 (없으면 선수 dict 의 "team")
+    :return: 선수별 행 (runs_per_unit: 선수 팀 경기당 득실차 변화, wins_per_unit: 승률 변화, 각 표준오차 포함)
+    """
+    accumulators: Dict[Tuple[int, bool, str], _Accumulator] = {}
+    for result, perturbations in results:
+        _accumulate(accumulators, result, perturbations, team_of)
+    return [accumulator.row() for accumulator in accumulators.values()]
+
+
+def league_sensitivity(teams: Sequence[Dict[str, Any]], grid: Optional[Dict[str, Sequence[float]]] = None,
+                       n_games: int = 1000, seed: int = 0, weathers: Optional[Sequence[str]] = None,
+                       chunk_games: int = CHUNK_GAMES) -> List[Dict[str, Any]]:
+    """
+    모든 (원정, 홈) 대진과 날씨에서 두 팀 선수 전원의 민감도를 계산해 선수별로 합친다 (marginal_values 참고).
+    대진마다 같은 seed 의 공통 난수를 쓰고, 변형 선수 사본은 한 번만 만들어 재사용한다.
+    :param weathers: 평균할 날씨 (기본: KBO.WEATHER_OPTIONS 전부)
+    """
+    weathers = list(weathers or KBO.WEATHER_OPTIONS)
+    by_team = {team["team_name"]: build_perturbations([team], grid) for team in teams}
+    team_of = {id(p.player): name for name, perturbations in by_team.items() for p in perturbations}
+    accumulators: Dict[Tuple[int, bool, str], _Accumulator] = {}
+    for team1, team2 in permutations(teams, 2):
+        perturbations = by_team[team1["team_name"]] + by_team[team2["team_name"]]
+        for weather in weathers:
+            # 대진마다 바로 합쳐 경기별 효과 배열을 오래 들고 있지 않는다
+            result = matchup_sensitivity(team1, team2, weather, perturbations, n_games, seed, chunk_games)
+            _accumulate(accumulators, result, perturbations, team_of)
+    KBO.clear_weather_cache()  # 변형 사본들의 날씨 스탯 캐시를 비운다
+    return [accumulator.row() for accumulator in accumulators.values()]
+
+
+def _load_teams(pitcher_file: str, batter_file: str) -> List[Dict[str, Any]]:
+    team_data = KBO.group_by_team(load_pitcher_data_cached(pitcher_file), load_batter_data_cached(batter_file))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return list(KBO.auto_configure_teams(team_data, None).values())
+
+
+def print_rows(rows: List[Dict[str, Any]]):
+    """선수별 민감도 표 (타율은 1푼 당, 나머지는 스탯 1 당)."""
+    print(f"{'팀':<5} {'선수':<8} {'역할':<3} {'스탯':<6} {'단위':>6} {'득실차':>8} {'±':>6} {'승률':>8} {'±':>6}")
+    for row in rows:
+        unit = REPORT_UNITS.get(row["stat"], 1.0)
+        print(f"{row['team']:<5} {row['name']:<8} {row['role']:<3} {row['stat']:<6} {unit:>6g} "
+              f"{row['runs_per_unit'] * unit:>+8.3f} {row['runs_per_unit_stderr'] * unit:>6.3f} "
+              f"{row['wins_per_unit'] * unit:>+8.4f} {row['wins_per_unit_stderr'] * unit:>6.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="선수 스탯 민감도 (스탯 단위당 득실차/승률 변화)")
+    parser.add_argument("--games", type=int, default=1000, help="대진/날씨별 경기 수")
+    parser.add_argument("--seed", type=int, default=0, help="공통 난수 시드")
+    parser.add_argument("--weather", choices=KBO.WEATHER_OPTIONS, action="append", help="날씨 (여러 번 가능, 기본: 전부)")
+    parser.add_argument("--stat", choices=list(DEFAULT_GRID), action="append", help="분석할 스탯 (여러 번 가능, 기본: 전부)")
+    parser.add_argument("--top", type=int, default=30, help="승률 영향이 큰 순서로 보여 줄 행 수 (0: 전부)")
+    parser.add_argument("--pitchers", default=DEFAULT_PITCHER_FILE, help="투수 데이터 xlsx 경로")
+    parser.add_argument("--batters", default=DEFAULT_BATTER_FILE, help="타자 데이터 xlsx 경로")
+    args = parser.parse_args()
+
+    grid = {stat: DEFAULT_GRID[stat] for stat in (args.stat or DEFAULT_GRID)}
+    rows = league_sensitivity(_load_teams(args.pitchers, args.batters), grid, args.games, args.seed, args.weather)
+    rows.sort(key=lambda row: abs(row["wins_per_unit"] * REPORT_UNITS.get(row["stat"], 1.0)), reverse=True)
+    print_rows(rows[:args.top] if args.top else rows)
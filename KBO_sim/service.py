@@ -0,0 +1,332 @@
+"""
+대진 예측 로컬 HTTP/JSON 서비스 (asyncio).
+
+요청마다 python KBO.py 를 새로 띄우면 선수 데이터 로드, 팀 구성, input() 대기가 매번 반복된다.
+이 서비스는 한 번 띄워 두고
+- 선수 데이터와 자동 구성 팀을 시작할 때 한 번만 만들고,
+- 워커 프로세스 풀도 시작할 때 팀 구성을 넘겨 미리 띄워 두며 (요청에는 팀 이름만 실어 보낸다),
+- 같은 대진/경기 수/시드 요청이 동시에 오면 계산 하나를 같이 기다리게 하고 (끝난 결과는 MatchupCache 에 저장),
+- 동시에 계산하는 요청 수를 제한해 대기열이 max_queue 를 넘으면 바로 503, 요청별 제한 시간을 넘으면 504 를 준다.
+기본으로 127.0.0.1 에서만 받는다.
+
+API
+- GET  /health  -> {"status": "ok", ...통계}
+- GET  /teams   -> 자동 구성 팀별 타순/선발/불펜 이름
+- POST /matchup {"away": "KIA", "home": "LG", "weather": "맑음", "games": 2000, "engine": "batch", "seed": 0}
+    away/home 은 구단 이름이나 cli.py spec 의 팀 형식({"team": "KIA", "batters": [...], ...}).
+
+사용법: python service.py --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Tuple, Union
+
+import numpy as np
+
+import KBO
+from cli import build_team
+from matchup_cache import MatchupCache, matchup_key, simulate_matchup, ENGINES
+from roster_cache import load_pitcher_data_cached, load_batter_data_cached
+from season import DEFAULT_PITCHER_FILE, DEFAULT_BATTER_FILE
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_GAMES = 200_000
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# 워커 프로세스별 자동 구성 팀 (풀 시작 시 한 번만 받는다)
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(teams: Dict[str, Dict[str, Any]]):
+    _worker["teams"] = teams
+
+
+def _warm_up() -> bool:
+    """워커를 미리 띄우고 전이표를 만들어 둔다."""
+    KBO.get_transition_table()
+    return True
+
+
+def _simulate(away: Union[str, Dict[str, Any]], home: Union[str, Dict[str, Any]], weather: str, games: int,
+              engine: str, seed: int) -> Dict[str, Any]:
+    """워커에서 실행. 팀은 이름(워커가 가진 팀)이나 직접 구성한 팀 dict."""
+    teams = _worker["teams"]
+    away_team = teams[away] if isinstance(away, str) else away
+    home_team = teams[home] if isinstance(home, str) else home
+    return simulate_matchup(away_team, home_team, weather, games, engine, seed)
+
+
+class SimulationService:
+    """
+    대진 예측 서비스 상태 (팀 구성, 워커 풀, 진행 중인 계산, 결과 캐시).
+    :param max_inflight: 동시에 워커로 보내는 계산 수 (기본: 워커 수)
+    :param max_queue: 계산 자리를 기다릴 수 있는 요청 수 (넘으면 503)
+    :param timeout: 요청별 제한 시간(초) (넘으면 504, 계산은 계속해 캐시에 남긴다)
+    """
+
+    def __init__(self, team_data: Dict[str, Any], workers: int = 2, max_inflight: Optional[int] = None,
+                 max_queue: int = 64, timeout: float = 30.0, cache: Optional[MatchupCache] = None):
+        self.team_data = team_data
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.teams = {team["team_name"]: team for team in KBO.auto_configure_teams(team_data, None).values()}
+        self.workers = workers
+        self.max_inflight = max_inflight or workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.cache = cache or MatchupCache()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.counters = {"requests": 0, "computed": 0, "coalesced": 0, "cached": 0, "rejected": 0, "timeouts": 0,
+                         "errors": 0}
+
+    async def start(self):
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.teams,))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm_up) for _ in range(self.workers)))
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def _resolve(self, spec: Any, side: str) -> Tuple[Union[str, Dict[str, Any]], Dict[str, Any]]:
+        """요청의 팀 -> (워커로 보낼 값, 팀 dict)."""
+        if isinstance(spec, str):
+            if spec not in self.teams:
+                raise HTTPError(400, f"{side}: 알 수 없는 구단입니다: {spec}")
+            return spec, self.teams[spec]
+        if isinstance(spec, dict):
+            try:
+                team = build_team(self.team_data, self.teams, spec)
+            except (ValueError, TypeError, KeyError) as e:
+                raise HTTPError(400, f"{side}: {e}")
+            return team, team
+        raise HTTPError(400, f"{side}: 구단 이름이나 팀 구성 객체가 필요합니다.")
+
+    async def matchup(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """대진 요청 처리: 캐시 -> 진행 중인 같은 계산 -> 새 계산 순서."""
+        self.counters["requests"] += 1
+        away, away_team = self._resolve(request.get("away"), "away")
+        home, home_team = self._resolve(request.get("home"), "home")
+        weather = request.get("weather", KBO.WEATHER_OPTIONS[0])
+        if weather not in KBO.WEATHER_OPTIONS:
+            raise HTTPError(400, f"weather 는 {KBO.WEATHER_OPTIONS} 중 하나여야 합니다.")
+        engine = request.get("engine", "batch")
+        if engine not in ENGINES:
+            raise HTTPError(400, f"engine 은 {ENGINES} 중 하나여야 합니다.")
+        try:
+            games, seed = int(request.get("games", 1000)), int(request.get("seed", 0))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "games 와 seed 는 정수여야 합니다.")
+        if not 1 <= games <= MAX_GAMES:
+            raise HTTPError(400, f"games 는 1 ~ {MAX_GAMES} 사이여야 합니다.")
+
+        key = matchup_key(away_team, home_team, weather, games, engine, seed)
+        result = await self._cache_call(self.cache.get, key)
+        if result is not None:
+            self.counters["cached"] += 1
+            return result
+
+        future = self._inflight.get(key)
+        if future is None:
+            # 대기 수는 여기서 바로 센다 (같은 루프 차례에 몰린 요청도 _compute 가 돌기 전에 걸러지도록)
+            if self._queued() >= self.max_queue:
+                self.counters["rejected"] += 1
+                raise HTTPError(503, "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도하세요.")
+            future = asyncio.ensure_future(self._compute(key, (away, home, weather, games, engine, seed)))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.counters["coalesced"] += 1
+
+        try:
+            # 제한 시간이 지나도 계산은 취소하지 않는다 (같이 기다리는 요청과 캐시를 위해)
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise HTTPError(504, f"{self.timeout}초 안에 계산을 마치지 못했습니다.")
+
+    def _queued(self) -> int:
+        """워커 슬롯을 기다리는 계산 수 (진행 중인 계산 중 max_inflight 를 넘는 만큼)."""
+        return max(0, len(self._inflight) - self.max_inflight)
+
+    def _finished(self, key: str, future: asyncio.Future):
+        self._inflight.pop(key, None)
+        # 기다리던 요청이 모두 504 로 끝났어도 예외를 꺼내 둔다 ("exception was never retrieved" 방지)
+        if not future.cancelled():
+            future.exception()
+
+    async def _cache_call(self, method, *args):
+        """디스크 캐시는 np.load/np.savez 와 삭제 검사가 있어 이벤트 루프 밖(스레드)에서 부른다."""
+        if self.cache.directory is None:
+            return method(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+    async def _compute(self, key: str, job: tuple) -> Dict[str, Any]:
+        await self._slots.acquire()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.pool, _simulate, *job)
+        finally:
+            self._slots.release()
+        self.counters["computed"] += 1
+        await self._cache_call(self.cache.put, key, result)
+        return result
+
+    def lineups(self) -> Dict[str, Any]:
+        return {name: {"batters": [b["name"] for b in team["batters"]],
+                       "starters": [p["name"] for p in team["pitchers"]["starters"]],
+                       "relievers": [p["name"] for p in team["pitchers"]["relievers"]]}
+                for name, team in self.teams.items()}
+
+    def health(self) -> Dict[str, Any]:
+        return {"status": "ok", "workers": self.workers, "inflight": len(self._inflight), "waiting": self._queued(),
+                **self.counters, "cache": self.cache.stats()}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"JSON 으로 바꿀 수 없는 값: {type(value)}")
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """HTTP/1.1 요청 하나를 읽는다 (연결이 닫히면 None)."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "잘못된 요청 줄입니다.")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "요청 본문이 너무 큽니다.")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+
+def _response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False, default=_json_value).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+async def _dispatch(service: SimulationService, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+    if path == "/health" and method == "GET":
+        return 200, service.health()
+    if path == "/teams" and method == "GET":
+        return 200, service.lineups()
+    if path == "/matchup":
+        if method != "POST":
+            raise HTTPError(405, "POST 로 요청하세요.")
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "본문이 올바른 JSON 이 아닙니다.")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "본문은 JSON 객체여야 합니다.")
+        started = time.perf_counter()
+        result = await service.matchup(request)
+        return 200, {**result, "elapsed_ms": (time.perf_counter() - started) * 1000}
+    raise HTTPError(404, f"없는 경로입니다: {path}")
+
+
+async def _handle_request(service: SimulationService, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+    """_dispatch 의 예외를 HTTP 응답으로 바꾼다 (계산/워커에서 난 예상 못 한 오류는 500)."""
+    try:
+        return await _dispatch(service, method, path, body)
+    except HTTPError as e:
+        return e.status, {"error": str(e)}
+    except Exception as e:
+        service.counters["errors"] += 1
+        traceback.print_exc()
+        return 500, {"error": f"계산 중 오류가 발생했습니다: {type(e).__name__}: {e}"}
+
+
+async def handle_connection(service: SimulationService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """연결 하나에서 요청을 차례로 처리 (keep-alive 지원)."""
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (asyncio.IncompleteReadError, ValueError):
+                status, payload = 400, {"error": "요청을 읽을 수 없습니다."}
+            else:
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await _handle_request(service, method, path, body)
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def serve(service: SimulationService, host: str = "127.0.0.1", port: int = 8765):
+    await service.start()
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    print(f"대진 예측 서비스 시작: http://{host}:{port} (워커 {service.workers}개)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBO 대진 예측 로컬 HTTP 서비스")
+    parser.add_argument("--host", default="127.0.0.1", help="바인드 주소 (기본: 로컬만)")
+    parser.add_argument("--port", type=int, default=8765, help="포트")
+    parser.add_argument("--workers", type=int, default=2, help="워커 프로세스 수")
+    parser.add_argument("--max-inflight", type=int, default=None, help="동시 계산 수 (기본: 워커 수)")
+    parser.add_argument("--max-queue", type=int, default=64, help="대기 요청 수 한도 (넘으면 503)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="요청별 제한 시간(초)")
+    parser.add_argument("--cache", default=None, help="결과 캐시 폴더 (기본: 메모리만)")
+    parser.add_argument("--pitchers", default=DEFAULT_PITCHER_FILE, help="투수 데이터 xlsx 경로")
+    parser.add_argument("--batters", default=DEFAULT_BATTER_FILE, help="타자 데이터 xlsx 경로")
+    args = parser.parse_args()
+
+    team_data = KBO.group_by_team(load_pitcher_data_cached(args.pitchers), load_batter_data_cached(args.batters))
+    service = SimulationService(team_data, args.workers, args.max_inflight, args.max_queue, args.timeout,
+                                MatchupCache(args.cache))
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,426 @@
+"""
+여러 머신에 나눠 돌리는 대규모 시뮬레이션 (코디네이터 / 워커).
+
+(원정, 홈, 날씨) 대진마다 경기 번호 0 ~ n_games-1 을 shard_games 개씩 잘라 샤드를 만든다.
+샤드는 (대진, 날씨, 경기 번호 범위)로만 정해지고 난수도 경기 번호/범위로 정해지므로
+워커 수나 어느 워커가 어떤 샤드를 맡았는지와 관계없이 합친 결과는 항상 같다.
+- scalar 엔진: 경기 k 는 game_rng(seed, k) (cli.py / matchup_cache 와 같은 스트림)
+- batch 엔진: 샤드마다 game_seed_sequence(seed, 첫 경기, 경기 수) 로 simulate_games_batch
+
+코디네이터는 multiprocessing.connection 소켓(authkey 인증)으로 워커에게 샤드를 빌려 주고,
+메시지는 pickle 이 아닌 JSON 바이트로만 주고받는다 (상대가 보낸 객체를 unpickle 하지 않음).
+authkey 는 기본값이 없으므로 --authkey 또는 환경 변수 KBO_SHARD_AUTHKEY 로 코디네이터와 워커에 같은 값을 준다.
+워커 연결이 끊기거나 lease_timeout 안에 결과가 오지 않으면 다른 워커에게 다시 준다.
+결과는 샤드 ID 로 합치므로 같은 샤드 결과가 두 번 와도 한 번만 더한다.
+journal 파일(JSON Lines)에 끝난 샤드를 남겨 두면 코디네이터를 다시 띄워도 남은 샤드만 돌린다.
+
+사용법:
+    export KBO_SHARD_AUTHKEY=...                                 (모든 머신에 같은 비밀 키)
+    python shard.py coordinator --host 0.0.0.0 --port 6100 --games 100000 --journal sweep.jsonl
+    python shard.py worker --address 192.168.0.10:6100          (머신마다 여러 개)
+    python shard.py local --workers 4 --games 20000              (한 머신에서 프로세스로 테스트)
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Listener, Client
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+import KBO
+from batch_sim import simulate_games_batch
+from rng_streams import game_rng, game_seed_sequence
+from roster_cache import load_pitcher_data_cached, load_batter_data_cached
+from season import DEFAULT_PITCHER_FILE, DEFAULT_BATTER_FILE
+
+DEFAULT_PORT = 6100
+AUTHKEY_ENV = "KBO_SHARD_AUTHKEY"
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+DEFAULT_SHARD_GAMES = 2000
+WAIT_SECONDS = 0.5
+
+
+class Shard(NamedTuple):
+    """대진 하나의 경기 번호 범위 [first_game, first_game + n_games)."""
+    away: str
+    home: str
+    weather: str
+    first_game: int
+    n_games: int
+    engine: str
+    seed: int
+
+    @property
+    def shard_id(self) -> str:
+        return f"{self.away}|{self.home}|{self.weather}|{self.engine}|{self.seed}|{self.first_game}+{self.n_games}"
+
+
+def _json_default(value: Any) -> Any:
+    """NumPy 스칼라/배열을 JSON 으로 보낼 수 있게 변환."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"JSON 으로 보낼 수 없는 값입니다: {type(value).__name__}")
+
+
+def send_message(conn, kind: str, payload: Any = None):
+    """(종류, 내용) 메시지를 JSON 바이트로 보낸다 (pickle 을 쓰지 않는다)."""
+    conn.send_bytes(json.dumps([kind, payload], ensure_ascii=False, default=_json_default).encode("utf-8"))
+
+
+def recv_message(conn) -> Tuple[str, Any]:
+    """send_message 로 보낸 메시지를 받는다. 형식이 틀리면 ValueError."""
+    message = json.loads(conn.recv_bytes(MAX_MESSAGE_BYTES))
+    if not (isinstance(message, list) and len(message) == 2 and isinstance(message[0], str)):
+        raise ValueError("잘못된 메시지 형식입니다.")
+    return message[0], message[1]
+
+
+def build_plan(team_names: List[str], n_games: int, weathers: Optional[List[str]] = None,
+               matchups: Optional[List[Tuple[str, str]]] = None, shard_games: int = DEFAULT_SHARD_GAMES,
+               engine: str = "batch", seed: int = 0) -> List[Shard]:
+    """
+    전체 작업을 샤드로 나눈다. 샤드 경계는 shard_games 로만 정해진다 (워커 수와 무관).
+    :param matchups: (원정, 홈) 목록 (기본: 모든 팀 쌍, 홈/원정 각각)
+    """
+    if matchups is None:
+        matchups = [(away, home) for away in team_names for home in team_names if away != home]
+    shards = []
+    for away, home in matchups:
+        for weather in weathers or KBO.WEATHER_OPTIONS:
+            for first in range(0, n_games, shard_games):
+                shards.append(Shard(away, home, weather, first, min(shard_games, n_games - first), engine, seed))
+    return shards
+
+
+def run_shard(teams: Dict[str, Dict[str, Any]], shard: Shard) -> Dict[str, Any]:
+    """샤드 하나를 시뮬레이션해 합칠 수 있는 집계(승/무/패 수, 득점 분포 수)를 반환."""
+    away, home = teams[shard.away], teams[shard.home]
+    if shard.engine == "scalar":
+        scores = np.zeros((2, shard.n_games), dtype=np.int64)
+        for k in range(shard.n_games):
+            game = KBO.simulate_game(away, home, shard.weather, sink=KBO.NULL_SINK,
+                                     rng=game_rng(shard.seed, shard.first_game + k))
+            scores[:, k] = game["score_team1"], game["score_team2"]
+        away_scores, home_scores = scores
+    elif shard.engine == "batch":
+        sequence = game_seed_sequence(shard.seed, shard.first_game, shard.n_games)
+        result = simulate_games_batch(away, home, shard.weather, shard.n_games, seed=sequence)
+        away_scores, home_scores = result["team1_scores"], result["team2_scores"]
+    else:
+        raise ValueError("engine 은 'batch' 또는 'scalar' 여야 합니다.")
+    return {
+        "shard": shard.shard_id,
+        "games": shard.n_games,
+        "away_wins": int(np.sum(away_scores > home_scores)),
+        "home_wins": int(np.sum(away_scores < home_scores)),
+        "draws": int(np.sum(away_scores == home_scores)),
+        "away_runs": np.bincount(away_scores).tolist(),
+        "home_runs": np.bincount(home_scores).tolist(),
+    }
+
+
+class ShardResults:
+    """샤드 결과 모음. 샤드 ID 로 한 번만 더하므로 같은 결과가 여러 번 와도 합계는 같다."""
+
+    def __init__(self, plan: List[Shard], journal: Optional[str] = None):
+        self.shards = {shard.shard_id: shard for shard in plan}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.duplicates = 0
+        self.journal = journal
+        if journal and os.path.exists(journal):
+            self._replay(journal)
+
+    def _replay(self, journal: str):
+        """journal 의 결과를 다시 더한다. 코디네이터가 쓰다가 죽어 잘린 마지막 줄은 잘라 내고 이어 쓴다."""
+        with open(journal, "rb+") as f:
+            data = f.read()
+            end = 0
+            for line in data.splitlines(keepends=True):
+                try:
+                    result = json.loads(line) if line.strip() else None
+                except ValueError:
+                    if end + len(line) < len(data):
+                        raise ValueError(f"journal 중간 줄이 손상되었습니다: {journal} ({end} 바이트 위치)")
+                    f.truncate(end)
+                    break
+                if result is not None:
+                    self.add(result, write=False)
+                end += len(line)
+                if not line.endswith(b"\n"):  # 줄바꿈 직전에 끊긴 마지막 줄
+                    f.write(b"\n")
+
+    def add(self, result: Dict[str, Any], write: bool = True) -> bool:
+        """결과를 더한다. 새 샤드면 True, 이미 있거나 계획에 없는 샤드면 False."""
+        shard_id = result["shard"]
+        if shard_id not in self.shards:
+            return False
+        if shard_id in self.results:
+            self.duplicates += 1
+            return False
+        self.results[shard_id] = result
+        if write and self.journal:
+            with open(self.journal, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        return True
+
+    @property
+    def complete(self) -> bool:
+        return len(self.results) == len(self.shards)
+
+    def merged(self) -> List[Dict[str, Any]]:
+        """(원정, 홈, 날씨) 별로 합친 결과 (계획 순서)."""
+        totals: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        for shard_id, shard in self.shards.items():
+            key = (shard.away, shard.home, shard.weather)
+            total = totals.setdefault(key, {"away": shard.away, "home": shard.home, "weather": shard.weather,
+                                            "games": 0, "away_wins": 0, "home_wins": 0, "draws": 0,
+                                            "away_runs": np.zeros(0, dtype=np.int64),
+                                            "home_runs": np.zeros(0, dtype=np.int64)})
+            result = self.results.get(shard_id)
+            if result is None:
+                continue
+            for field in ("games", "away_wins", "home_wins", "draws"):
+                total[field] += result[field]
+            for field in ("away_runs", "home_runs"):
+                counts = np.asarray(result[field], dtype=np.int64)
+                size = max(len(total[field]), len(counts))
+                total[field] = np.pad(total[field], (0, size - len(total[field]))) + np.pad(counts, (0, size - len(counts)))
+
+        rows = []
+        for total in totals.values():
+            games = max(total["games"], 1)
+            away_runs, home_runs = total.pop("away_runs"), total.pop("home_runs")
+            rows.append({
+                **total,
+                "away_win_rate": total["away_wins"] / games,
+                "home_win_rate": total["home_wins"] / games,
+                "draw_rate": total["draws"] / games,
+                "away_runs": float(np.dot(np.arange(len(away_runs)), away_runs)) / games,
+                "home_runs": float(np.dot(np.arange(len(home_runs)), home_runs)) / games,
+            })
+        return rows
+
+
+class Coordinator:
+    """
+    샤드를 워커에게 빌려 주고 결과를 모은다.
+    :param teams: 팀 이름 -> 팀 dict (워커가 접속하면 한 번 보낸다)
+    :param lease_timeout: 빌려 준 샤드를 이 시간(초) 안에 끝내지 못하면 다른 워커에게 다시 준다
+    """
+
+    def __init__(self, teams: Dict[str, Dict[str, Any]], plan: List[Shard], journal: Optional[str] = None,
+                 lease_timeout: float = 600.0):
+        self.teams = teams
+        self.results = ShardResults(plan, journal)
+        self.lease_timeout = lease_timeout
+        self._pending = deque(shard for shard in plan if shard.shard_id not in self.results.results)
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if self.results.complete:
+            self._done.set()
+
+    def _lease(self, worker: str) -> Optional[Shard]:
+        with self._lock:
+            while self._pending:
+                shard = self._pending.popleft()
+                if shard.shard_id not in self.results.results:
+                    self._leases[shard.shard_id] = (worker, time.monotonic())
+                    return shard
+            # 남은 샤드가 없으면 오래된 임대를 다시 준다 (결과가 둘 다 와도 한 번만 더함)
+            now = time.monotonic()
+            for shard_id, (owner, started) in self._leases.items():
+                if now - started > self.lease_timeout:
+                    self._leases[shard_id] = (worker, now)
+                    return self.results.shards[shard_id]
+        return None
+
+    def _complete(self, result: Dict[str, Any]):
+        with self._lock:
+            self.results.add(result)
+            self._leases.pop(result["shard"], None)
+            if self.results.complete:
+                self._done.set()
+
+    def _release(self, worker: str):
+        """연결이 끊긴 워커가 빌려 간 샤드를 다시 대기열 앞에 넣는다."""
+        with self._lock:
+            for shard_id, (owner, _) in list(self._leases.items()):
+                if owner == worker:
+                    del self._leases[shard_id]
+                    self._pending.appendleft(self.results.shards[shard_id])
+
+    def _handle(self, conn, worker: str):
+        try:
+            send_message(conn, "teams", self.teams)
+            while True:
+                message, result = recv_message(conn)
+                if result is not None:
+                    self._complete(result)
+                if message == "bye":
+                    break
+                if self._done.is_set():
+                    send_message(conn, "done")
+                    break
+                shard = self._lease(worker)
+                if shard is not None:
+                    send_message(conn, "shard", list(shard))
+                else:
+                    send_message(conn, "wait", WAIT_SECONDS)
+        except (EOFError, OSError, ValueError, KeyError, TypeError):
+            pass
+        finally:
+            self._release(worker)
+            conn.close()
+
+    def serve(self, address: Tuple[str, int], authkey: bytes,
+              ready: Optional[threading.Event] = None) -> ShardResults:
+        """워커 접속을 받아 모든 샤드가 끝날 때까지 돌리고 결과를 반환."""
+        _check_authkey(authkey)
+        listener = Listener(address, authkey=authkey)
+        self.address = listener.address
+        threading.Thread(target=self._accept, args=(listener,), daemon=True).start()
+        if ready is not None:
+            ready.set()
+        self._done.wait()
+        time.sleep(WAIT_SECONDS * 2)  # 대기 중인 워커가 done 을 받아 갈 시간
+        listener.close()  # 접속 대기 스레드는 accept 오류로 끝난다
+        return self.results
+
+    def _accept(self, listener: Listener):
+        count = 0
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError):
+                if self._done.is_set():
+                    return
+                continue  # 인증 실패 등은 무시하고 계속 받는다
+            count += 1
+            try:
+                _, name = recv_message(conn)
+                worker = f"{name}#{count}"  # 워커 이름 (같은 이름으로 다시 접속해도 구분)
+            except (EOFError, OSError, ValueError):
+                conn.close()
+                continue
+            threading.Thread(target=self._handle, args=(conn, worker), daemon=True).start()
+
+
+def _check_authkey(authkey: Optional[bytes]):
+    if not authkey:
+        raise ValueError(f"authkey 가 필요합니다 (--authkey 또는 환경 변수 {AUTHKEY_ENV}).")
+
+
+def worker(address: Tuple[str, int], authkey: bytes, name: Optional[str] = None,
+           max_shards: Optional[int] = None) -> int:
+    """
+    코디네이터에 접속해 샤드를 받아 돌린다. 끝난 샤드 수를 반환.
+    :param max_shards: 이만큼 돌리고 끝낸다 (재시작 시험용, 기본: 모두 끝날 때까지)
+    """
+    _check_authkey(authkey)
+    conn = Client(address, authkey=authkey)
+    send_message(conn, "hello", name or f"{socket.gethostname()}:{os.getpid()}")
+    _, teams = recv_message(conn)
+    finished, result = 0, None
+    try:
+        while True:
+            if max_shards is not None and finished >= max_shards:
+                send_message(conn, "bye", result)  # 마지막 결과만 넘기고 종료
+                break
+            send_message(conn, "next", result)
+            kind, payload = recv_message(conn)
+            if kind == "done":
+                break
+            result = None
+            if kind == "wait":
+                time.sleep(payload)
+                continue
+            result = run_shard(teams, Shard(*payload))
+            finished += 1
+    except (EOFError, OSError):
+        pass
+    finally:
+        conn.close()
+    return finished
+
+
+def run_local(teams: Dict[str, Dict[str, Any]], plan: List[Shard], n_workers: int = 2, journal: Optional[str] = None,
+              authkey: Optional[bytes] = None) -> ShardResults:
+    """한 머신에서 코디네이터(스레드)와 워커 프로세스 n_workers 개로 실행 (시험용, authkey 가 없으면 임의로 만든다)."""
+    authkey = authkey or os.urandom(32)
+    coordinator = Coordinator(teams, plan, journal)
+    ready = threading.Event()
+    holder: Dict[str, ShardResults] = {}
+    thread = threading.Thread(target=lambda: holder.setdefault("results", coordinator.serve(("127.0.0.1", 0), authkey, ready)))
+    thread.start()
+    ready.wait()
+    processes = [multiprocessing.Process(target=worker, args=(coordinator.address, authkey, f"local-{i}"))
+                 for i in range(n_workers)]
+    for process in processes:
+        process.start()
+    thread.join()
+    for process in processes:
+        process.join()
+    return holder["results"]
+
+
+def _load_teams(pitcher_file: str, batter_file: str) -> Dict[str, Dict[str, Any]]:
+    team_data = KBO.group_by_team(load_pitcher_data_cached(pitcher_file), load_batter_data_cached(batter_file))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {team["team_name"]: team for team in KBO.auto_configure_teams(team_data, None).values()}
+
+
+def _print_rows(rows: List[Dict[str, Any]]):
+    print(f"{'원정':<6} {'홈':<6} {'날씨':<4} {'경기':>8} {'원정승':>7} {'홈승':>7} {'무':>6} {'원정득점':>7} {'홈득점':>7}")
+    for row in rows:
+        print(f"{row['away']:<6} {row['home']:<6} {row['weather']:<4} {row['games']:>8} {row['away_win_rate']:>7.3f} "
+              f"{row['home_win_rate']:>7.3f} {row['draw_rate']:>6.3f} {row['away_runs']:>7.2f} {row['home_runs']:>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="샤드 단위 분산 시뮬레이션")
+    parser.add_argument("mode", choices=["coordinator", "worker", "local"])
+    parser.add_argument("--address", default=f"127.0.0.1:{DEFAULT_PORT}", help="worker: 코디네이터 주소 host:port")
+    parser.add_argument("--host", default="127.0.0.1", help="coordinator: 바인드 주소")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="coordinator: 포트")
+    parser.add_argument("--authkey", default=os.environ.get(AUTHKEY_ENV),
+                        help=f"접속 인증 키 (기본: 환경 변수 {AUTHKEY_ENV}, local 모드는 없으면 임의 생성)")
+    parser.add_argument("--games", type=int, default=10000, help="대진/날씨별 경기 수")
+    parser.add_argument("--shard-games", type=int, default=DEFAULT_SHARD_GAMES, help="샤드당 경기 수")
+    parser.add_argument("--engine", choices=["batch", "scalar"], default="batch")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--journal", default=None, help="끝난 샤드 기록 파일 (재시작 시 이어서 실행)")
+    parser.add_argument("--workers", type=int, default=2, help="local: 워커 프로세스 수")
+    parser.add_argument("--pitchers", default=DEFAULT_PITCHER_FILE, help="투수 데이터 xlsx 경로")
+    parser.add_argument("--batters", default=DEFAULT_BATTER_FILE, help="타자 데이터 xlsx 경로")
+    args = parser.parse_args()
+    key = args.authkey.encode() if args.authkey else None
+    if key is None and args.mode != "local":
+        parser.error(f"--authkey 또는 환경 변수 {AUTHKEY_ENV} 가 필요합니다.")
+
+    if args.mode == "worker":
+        host, port = args.address.rsplit(":", 1)
+        print(f"샤드 {worker((host, int(port)), key)}개 완료")
+    else:
+        all_teams = _load_teams(args.pitchers, args.batters)
+        shards = build_plan(list(all_teams), args.games, shard_games=args.shard_games, engine=args.engine, seed=args.seed)
+        started = time.perf_counter()
+        if args.mode == "local":
+            collected = run_local(all_teams, shards, args.workers, args.journal, key)
+        else:
+            print(f"샤드 {len(shards)}개, {args.host}:{args.port} 에서 워커 대기")
+            collected = Coordinator(all_teams, shards, args.journal).serve((args.host, args.port), key)
+        print(f"{len(shards)}개 샤드 완료 ({time.perf_counter() - started:.1f}초, 중복 결과 {collected.duplicates}개)")
+        _print_rows(collected.merged())
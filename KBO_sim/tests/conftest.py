@@ -0,0 +1,34 @@
+"""
+테스트 공통 준비: KBO_sim 폴더의 모듈을 import 할 수 있게 하고, 2024 선수 데이터로 만든 팀을 한 번만 읽는다.
+
+사용법: cd KBO_sim && python -m pytest -q
+"""
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import KBO  # noqa: E402
+from roster_cache import load_pitcher_data_cached, load_batter_data_cached  # noqa: E402
+
+PITCHER_FILE = os.path.join(ROOT, "KBO 2024 투수 종합지표.xlsx")
+BATTER_FILE = os.path.join(ROOT, "KBO2024 타자 종합지표.xlsx")
+
+
+@pytest.fixture(scope="session")
+def team_data():
+    """group_by_team 결과 (팀 이름 -> 전체 선수)."""
+    return KBO.group_by_team(load_pitcher_data_cached(PITCHER_FILE), load_batter_data_cached(BATTER_FILE))
+
+
+@pytest.fixture(scope="session")
+def teams(team_data):
+    """auto_configure_teams 로 구성한 10개 팀 (팀 이름 -> 팀)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {team["team_name"]: team for team in KBO.auto_configure_teams(team_data, None).values()}
@@ -0,0 +1,57 @@
+import numpy as np
+
+import KBO
+import markov
+from batch_sim import HIT_TYPES, OUTCOMES, get_transition_table, hit_type_distribution, outcome_distribution, \
+    simulate_games_batch
+from variance import crn_uniforms
+
+
+def test_transition_arrays_match_kbo_table():
+    arrays, table = get_transition_table(), KBO.get_transition_table()
+    for o, result in enumerate(OUTCOMES):
+        for mask in range(8):
+            for outs in range(3):
+                step = table[result][mask][outs]
+                assert (arrays["next_bases"][o, mask, outs], arrays["next_outs"][o, mask, outs],
+                        arrays["runs"][o, mask, outs]) == (step.next_mask, step.outs, step.runs)
+
+
+def test_outcome_distribution_uses_calculate_probability(teams):
+    batter, pitcher = teams["KIA"]["batters"][0], teams["LG"]["pitchers"]["starters"][0]
+    for weather in KBO.WEATHER_OPTIONS:
+        p = {o: KBO.calculate_probability(batter, pitcher, o, weather)
+             for o in ["볼넷", "삼진", "안타", "몸에 맞는 공", "땅볼 아웃", "플라이 아웃"]}
+        hits = dict(zip(HIT_TYPES, hit_type_distribution(batter)))
+        expected = np.array([p["볼넷"], p["삼진"]] + [p["안타"] * hits[h] for h in HIT_TYPES]
+                            + [p["몸에 맞는 공"], p["땅볼 아웃"], p["플라이 아웃"]])
+        np.testing.assert_allclose(outcome_distribution(batter, pitcher, weather), expected / expected.sum())
+
+
+def test_same_seed_same_games(teams):
+    first = simulate_games_batch(teams["KIA"], teams["LG"], "맑음", 500, seed=7)
+    second = simulate_games_batch(teams["KIA"], teams["LG"], "맑음", 500, seed=7)
+    np.testing.assert_array_equal(first["team1_scores"], second["team1_scores"])
+    np.testing.assert_array_equal(first["team2_scores"], second["team2_scores"])
+
+    uniforms = crn_uniforms(3, 500, 14)
+    first = simulate_games_batch(teams["KIA"], teams["LG"], "흐림", 500, uniforms=uniforms)
+    second = simulate_games_batch(teams["KIA"], teams["LG"], "흐림", 500, seed=99, uniforms=uniforms)
+    np.testing.assert_array_equal(first["team1_scores"], second["team1_scores"])
+
+
+def test_crn_uniforms_fixed_per_game_and_slot():
+    full = crn_uniforms(5, 600, 14)
+    part = crn_uniforms(5, 100, 16, first_game=250)
+    np.testing.assert_array_equal(full[:, :, 250:350], part[:, :14])
+    np.testing.assert_array_equal(crn_uniforms(5, 10, 9, antithetic=True), 1 - full[:, :9, :10])
+
+
+def test_batch_matches_exact_distribution(teams):
+    n = 20000
+    batch = simulate_games_batch(teams["KIA"], teams["LG"], "맑음", n, seed=1)
+    exact = markov.game_distribution(teams["KIA"], teams["LG"], "맑음")
+    p = exact["team1_win_rate"]
+    assert abs(batch["team1_win_rate"] - p) < 5 * np.sqrt(p * (1 - p) / n)
+    runs = batch["team1_scores"]
+    assert abs(runs.mean() - exact["expected_runs_team1"]) < 5 * runs.std() / np.sqrt(n)
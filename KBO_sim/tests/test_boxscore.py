@@ -0,0 +1,73 @@
+import copy
+
+import numpy as np
+
+import KBO
+from boxscore import BoxScore, BoxScoreSink, PA, R, RBI, P_BF, P_R, P_ER
+from model import build_roster
+from rng_streams import game_rng
+
+
+def test_box_score_totals_match_game_scores(team_data, teams):
+    box = BoxScore(build_roster(team_data, teams))
+    sink = BoxScoreSink(box)
+    away, home = teams["KIA"], teams["LG"]
+    away_ids = [box.roster.batter_id(b) for b in away["batters"]]
+    home_ids = [box.roster.batter_id(b) for b in home["batters"]]
+    away_pitchers = {box.roster.pitcher_id(p) for p in away["pitchers"]["starters"] + away["pitchers"]["relievers"]}
+    home_pitchers = {box.roster.pitcher_id(p) for p in home["pitchers"]["starters"] + home["pitchers"]["relievers"]}
+
+    runs = np.zeros(2, dtype=np.int64)
+    for k in range(30):
+        game = KBO.simulate_game(away, home, "맑음", sink=sink, rng=game_rng(11, k))
+        runs += game["score_team1"], game["score_team2"]
+
+    assert box.batting[away_ids, R].sum() == runs[0]
+    assert box.batting[home_ids, R].sum() == runs[1]
+    assert box.pitching[sorted(home_pitchers), P_R].sum() == runs[0]
+    assert box.pitching[sorted(away_pitchers), P_R].sum() == runs[1]
+    np.testing.assert_array_equal(box.pitching[:, P_R], box.pitching[:, P_ER])
+    assert box.batting[:, PA].sum() == box.pitching[:, P_BF].sum()
+
+
+def _play(sink, pitcher, plate_appearances):
+    """(타자, 결과) 순서대로 타석을 진행하고 마지막 타석의 (득점, 아웃)을 반환."""
+    bases, outs = [None, None, None], 0
+    for batter, result in plate_appearances:
+        sink.plate_appearance(batter, pitcher)
+        runs, outs = KBO.apply_at_bat_result(bases, outs, result, batter["name"], sink)
+        sink.bases_state(bases)
+    return runs, outs
+
+
+def _half_inning(team_data, away, home):
+    box = BoxScore(build_roster(team_data, {"away": away, "home": home}))
+    sink = BoxScoreSink(box)
+    pitcher = home["pitchers"]["starters"][0]
+    sink.game_start(away, home, "맑음")
+    sink.inning_start(1, "초")
+    sink.pitcher_change(pitcher, "맑음")
+    return box, sink, pitcher
+
+
+def test_no_rbi_on_double_play(team_data, teams):
+    away, home = teams["KIA"], teams["LG"]
+    box, sink, pitcher = _half_inning(team_data, away, home)
+    third, first, batter = away["batters"][:3]
+
+    assert _play(sink, pitcher, [(third, "2루타"), (first, "볼넷"), (batter, "땅볼 아웃")]) == (1, 2)
+    assert box.batting[box.roster.batter_id(third), R] == 1
+    assert box.batting[box.roster.batter_id(batter), RBI] == 0
+    assert box.pitching[box.roster.pitcher_id(pitcher), P_R] == 1
+
+
+def test_same_named_runners_keep_their_ids(team_data, teams):
+    away = copy.deepcopy(teams["KIA"])
+    lead, trail, batter = away["batters"][:3]
+    trail["name"] = lead["name"]
+    box, sink, pitcher = _half_inning(team_data, away, teams["LG"])
+
+    # 2루타 주자가 3루로 가고 볼넷 주자는 1루에 남은 뒤, 땅볼 때 3루 주자(lead)만 득점
+    assert _play(sink, pitcher, [(lead, "2루타"), (trail, "볼넷"), (batter, "땅볼 아웃")]) == (1, 2)
+    assert box.batting[box.roster.batter_id(lead), R] == 1
+    assert box.batting[box.roster.batter_id(trail), R] == 0
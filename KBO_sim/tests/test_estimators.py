@@ -0,0 +1,16 @@
+import pytest
+
+from estimators import estimate_matchup
+
+
+def test_rejects_batches_that_never_grow(teams):
+    with pytest.raises(ValueError):
+        estimate_matchup(teams["KIA"], teams["LG"], "맑음", initial_batch=0)
+    with pytest.raises(ValueError):
+        estimate_matchup(teams["KIA"], teams["LG"], "맑음", growth=0.5)
+
+
+def test_growth_of_one_keeps_fixed_batches(teams):
+    result = estimate_matchup(teams["KIA"], teams["LG"], "맑음", precision=0.0, initial_batch=100, growth=1.0,
+                              max_games=300)
+    assert (result["games"], result["batches"], result["converged"]) == (300, 3, False)
@@ -0,0 +1,46 @@
+import copy
+
+import markov
+from incremental import IncrementalModel
+
+
+def test_matches_markov_engine(team_data):
+    model = IncrementalModel(copy.deepcopy(team_data))
+    for weather in ("맑음", "비옴"):
+        result = model.matchup("KIA", "LG", weather)
+        exact = markov.game_distribution(model.teams["KIA"], model.teams["LG"], weather)
+        assert result["team1_win_rate"] == exact["team1_win_rate"]
+        assert result["draw_rate"] == exact["draw_rate"]
+        assert result["expected_runs_team1"] == exact["expected_runs_team1"]
+        assert result["expected_runs_team2"] == exact["expected_runs_team2"]
+
+
+def test_edit_matches_fresh_model(team_data):
+    data = copy.deepcopy(team_data)
+    model = IncrementalModel(data)
+    model.all_matchups(["맑음"])
+    name = model.teams["KIA"]["batters"][0]["name"]
+    assert model.edit_player("KIA", name, stats={"타율": 0.350}) > 0
+    model.trade_player(model.teams["LG"]["batters"][1]["name"], "LG", "KT")
+
+    fresh = IncrementalModel(data)
+    assert model.all_matchups(["맑음"]) == fresh.all_matchups(["맑음"])
+
+
+def test_lineup_change_evicts_stale_entries(team_data):
+    data = copy.deepcopy(team_data)
+    model = IncrementalModel(data)
+    model.matchup("KIA", "LG", "맑음")
+    old_lineup = tuple(id(batter) for batter in model.teams["KIA"]["batters"])
+    names = [batter["name"] for batter in model.teams["KIA"]["batters"]]
+    model.set_lineup("KIA", batters=names[1:] + names[:1])
+
+    cache = model.cache
+    assert cache.stats()["matchup"]["entries"] == 0
+    assert not [key for key in cache.values if old_lineup in key]
+    assert {dep: pin[1] for dep, pin in cache._pins.items()} == \
+        {dep: len(keys) for dep, keys in cache._dependents.items()}
+
+    fresh = IncrementalModel(data)
+    fresh.set_lineup("KIA", batters=names[1:] + names[:1])
+    assert model.matchup("KIA", "LG", "맑음") == fresh.matchup("KIA", "LG", "맑음")
@@ -0,0 +1,32 @@
+import numpy as np
+
+import markov
+from batch_sim import OUTCOMES
+
+
+def _always(outcome: str, n_batters: int) -> np.ndarray:
+    probabilities = np.zeros((n_batters, len(OUTCOMES)))
+    probabilities[:, OUTCOMES.index(outcome)] = 1.0
+    return probabilities
+
+
+def test_deterministic_lineups():
+    # 삼진만: 0점, 홈런만: 타자 수만큼, 볼넷만: 만루 이후 타자마다 1점 (명단 소진으로 종료)
+    assert markov.half_inning_distribution(_always("삼진", 9))[0] == 1.0
+    assert markov.half_inning_distribution(_always("홈런", 14))[14] == 1.0
+    assert markov.half_inning_distribution(_always("볼넷", 14))[11] == 1.0
+
+
+def test_run_expectancy_matches_distribution():
+    rng = np.random.default_rng(0)
+    probabilities = rng.dirichlet(np.ones(len(OUTCOMES)), size=12)
+    distribution = markov.half_inning_distribution(probabilities)
+    assert abs(distribution.sum() - 1.0) < 1e-12
+    expected = markov.run_expectancy(probabilities)
+    assert abs(expected[0, 0, 0] - markov.expected_value(distribution)) < 1e-12
+
+
+def test_game_probabilities_sum_to_one(teams):
+    game = markov.game_distribution(teams["KIA"], teams["LG"], "맑음")
+    total = game["team1_win_rate"] + game["team2_win_rate"] + game["draw_rate"]
+    assert abs(total - 1.0) < 1e-9
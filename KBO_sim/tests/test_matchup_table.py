@@ -0,0 +1,25 @@
+import numpy as np
+
+import KBO
+from batch_sim import half_inning_table
+from matchup_table import build_matchup_table
+from rng_streams import game_rng
+
+
+def test_table_rows_match_direct_calculation(team_data, teams):
+    table = build_matchup_table(team_data)
+    batters = teams["KIA"]["batters"]
+    for pitcher in teams["LG"]["pitchers"]["starters"] + teams["LG"]["pitchers"]["relievers"]:
+        for weather in KBO.WEATHER_OPTIONS:
+            np.testing.assert_allclose(half_inning_table(batters, pitcher, weather, table),
+                                       half_inning_table(batters, pitcher, weather), atol=1e-12)
+
+
+def test_table_games_are_reproducible(team_data, teams):
+    table = build_matchup_table(team_data)
+    scores = [KBO.simulate_game(teams["KIA"], teams["LG"], "맑음", table, KBO.NULL_SINK, game_rng(5, k))
+              for k in range(20)]
+    again = [KBO.simulate_game(teams["KIA"], teams["LG"], "맑음", table, KBO.NULL_SINK, game_rng(5, k))
+             for k in range(20)]
+    assert [(g["score_team1"], g["score_team2"]) for g in scores] == \
+        [(g["score_team1"], g["score_team2"]) for g in again]
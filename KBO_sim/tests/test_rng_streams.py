@@ -0,0 +1,28 @@
+import copy
+import pickle
+
+import pytest
+
+from rng_streams import PregeneratedRandom, game_rng
+
+
+@pytest.mark.parametrize("rng", [game_rng(1, 2), PregeneratedRandom(5, block_size=7, antithetic=True)])
+def test_getstate_setstate_roundtrip(rng):
+    for _ in range(13):
+        rng.random()
+    state = rng.getstate()
+    expected = [rng.random() for _ in range(20)]
+    rng.setstate(state)
+    assert [rng.random() for _ in range(20)] == expected
+
+    other = PregeneratedRandom()
+    other.setstate(state)
+    assert [other.random() for _ in range(20)] == expected
+
+
+def test_copy_and_pickle_are_refused():
+    rng = game_rng(0, 0)
+    with pytest.raises(TypeError):
+        copy.copy(rng)
+    with pytest.raises(TypeError):
+        pickle.dumps(rng)
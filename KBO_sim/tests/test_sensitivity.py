@@ -0,0 +1,40 @@
+import numpy as np
+
+from batch_sim import simulate_games_batch
+from sensitivity import build_perturbations, marginal_values, matchup_sensitivity
+from variance import crn_uniforms
+
+
+def _with_variant(team, perturbation):
+    replace = lambda players: [perturbation.variant if p is perturbation.player else p for p in players]
+    if perturbation.is_batter:
+        return {**team, "batters": replace(team["batters"])}
+    return {**team, "pitchers": {role: replace(players) for role, players in team["pitchers"].items()}}
+
+
+def test_variants_equal_full_batch_runs(teams):
+    team1, team2, n = teams["KIA"], teams["LG"], 200
+    perturbations = build_perturbations([team1, team2], {"타율": (0.02,), "ERA": (-1.0,)})
+    result = matchup_sensitivity(team1, team2, "맑음", perturbations, n, seed=4)
+
+    uniforms = crn_uniforms(4, n, max(len(team1["batters"]), len(team2["batters"])))
+    base = simulate_games_batch(team1, team2, "맑음", n, uniforms=uniforms)
+    np.testing.assert_array_equal(result["team1_scores"], base["team1_scores"])
+    np.testing.assert_array_equal(result["team2_scores"], base["team2_scores"])
+
+    base_diff = base["team1_scores"] - base["team2_scores"]
+    for i, perturbation in enumerate(perturbations):
+        game = simulate_games_batch(_with_variant(team1, perturbation), _with_variant(team2, perturbation), "맑음", n,
+                                    uniforms=uniforms)
+        diff = game["team1_scores"] - game["team2_scores"]
+        sign = 1 if result["side"][i] == 1 else -1
+        np.testing.assert_array_equal(result["runs"][i], sign * (diff - base_diff))
+        np.testing.assert_array_equal(result["wins"][i], (sign * diff > 0).astype(int) - (sign * base_diff > 0))
+
+
+def test_marginal_values_sign(teams):
+    perturbations = build_perturbations([teams["KIA"]], {"타율": (-0.02, 0.02)})
+    result = matchup_sensitivity(teams["KIA"], teams["LG"], "맑음", perturbations, 300, seed=0)
+    rows = marginal_values([(result, perturbations)])
+    assert len(rows) == len(teams["KIA"]["batters"])
+    assert sum(row["runs_per_unit"] for row in rows) > 0
@@ -0,0 +1,23 @@
+import asyncio
+
+from service import HTTPError, SimulationService
+
+
+def test_burst_over_queue_is_rejected(team_data):
+    async def burst():
+        service = SimulationService(team_data, workers=1, max_queue=1)
+        await service.start()
+        try:
+            n = service.max_inflight + service.max_queue + 1
+            requests = [{"away": "KIA", "home": "LG", "games": 10, "seed": seed} for seed in range(n)]
+            results = await asyncio.gather(*(service.matchup(request) for request in requests),
+                                           return_exceptions=True)
+        finally:
+            await service.close()
+        return service, results
+
+    service, results = asyncio.run(burst())
+    rejected = [r for r in results if isinstance(r, HTTPError)]
+    assert rejected and all(r.status == 503 for r in rejected)
+    assert service.counters["rejected"] == len(rejected)
+    assert service.counters["computed"] == len(results) - len(rejected)
@@ -0,0 +1,18 @@
+import KBO
+from transitions import check_against_handlers
+
+
+def test_table_matches_handlers():
+    # 모든 (결과, 베이스, 아웃) 조합 + 무작위 상태
+    assert check_against_handlers(n_trials=2000, seed=1) == len(KBO.TRANSITION_RESULTS) * 8 * 3 + 2000
+
+
+def test_table_covers_every_state():
+    table = KBO.get_transition_table()
+    assert list(table) == KBO.TRANSITION_RESULTS
+    for result in KBO.TRANSITION_RESULTS:
+        for mask in range(8):
+            for outs in range(3):
+                step = table[result][mask][outs]
+                assert 0 <= step.next_mask < 8
+                assert outs <= step.outs <= 3
@@ -0,0 +1,25 @@
+import KBO
+
+
+def _batter():
+    return {"name": "테스트", "team": "KIA", "position": "타자", "weather": "맑음",
+            "stats": {"볼넷%": 10.0, "삼진%": 20.0, "타율": 0.250}}
+
+
+def test_snapshot_reused_until_stats_change():
+    player = _batter()
+    first = KBO.get_weather_stats(player, "맑음")
+    assert KBO.get_weather_stats(player, "맑음") is first
+    assert first["타율"] == 0.250 * 1.2
+
+    player["stats"]["타율"] = 0.300  # clear_weather_cache 없이 직접 수정
+    assert KBO.get_weather_stats(player, "맑음")["타율"] == 0.300 * 1.2
+    player["weather"] = "비옴"
+    assert KBO.get_weather_stats(player, "맑음")["타율"] == 0.300
+
+
+def test_cache_is_bounded():
+    players = [_batter() for _ in range(KBO.WEATHER_CACHE_SIZE + 10)]
+    for player in players:
+        KBO.get_weather_stats(player, "맑음")
+    assert len(KBO._weather_stats_cache) == KBO.WEATHER_CACHE_SIZE
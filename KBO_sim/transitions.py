@@ -0,0 +1,83 @@
+"""
+주자 이동 전이표(KBO.get_transition_table)와 기존 주자 처리 함수의 일치 검사.
+
+simulate_inning 은 전이표를 한 번 찾아서 타석 결과를 적용하고,
+apply_at_bat_result(advance_runner, handle_walk_or_hit_by_pitch, handle_tag_up, handle_ground_out)는 기준 구현으로 남아 있다.
+check_against_handlers 는 실제 선수 이름을 올린 무작위 (베이스, 아웃, 결과) 상태에서 두 방식을 모두 실행해
+베이스 위 주자, 아웃 수, 득점, sink 이벤트 순서가 같은지 확인한다.
+
+사용법: python transitions.py [--trials N] [--seed S]
+"""
+import argparse
+import random
+from typing import List, Any, Tuple
+
+import KBO
+
+NAMES = ["김도영", "최형우", "나성범", "소크라테스", "박찬호"]
+
+
+class _EventLog(KBO.EventSink):
+    """sink 로 들어온 이벤트를 그대로 기록."""
+
+    def __init__(self):
+        self.events: List[Tuple[Any, ...]] = []
+
+    def at_bat_result(self, batter_name: str, result: str, outs: int):
+        self.events.append(("at_bat_result", batter_name, result, outs))
+
+    def runner_event(self, kind: str, runner: Any):
+        self.events.append(("runner_event", kind, runner))
+
+
+def apply_with_table(bases: List[Any], outs: int, result: str, batter_name: str, sink: KBO.EventSink) -> Tuple[int, int]:
+    """simulate_inning 과 같은 방식으로 전이표를 적용 (apply_at_bat_result 와 같은 인자/반환값)."""
+    mask = sum(1 << i for i in range(3) if bases[i])
+    step = KBO.get_transition_table()[result][mask][outs]
+    runners = (bases[0], bases[1], bases[2], batter_name, None)
+    for kind, source in step.events:
+        if kind is None:
+            sink.at_bat_result(batter_name, result, step.outs)
+        else:
+            sink.runner_event(kind, runners[source])
+    bases[0], bases[1], bases[2] = (runners[source] for source in step.sources)
+    return step.runs, step.outs
+
+
+def check_against_handlers(n_trials: int = 10000, seed: int = 0) -> int:
+    """
+    무작위 상태 n_trials 개와 모든 (결과, 베이스, 아웃) 조합에서 전이표와 기존 처리 함수를 비교.
+    다르면 AssertionError (python -O 에서도 검사), 같으면 비교한 경우 수를 반환.
+    """
+    rng = random.Random(seed)
+    cases = [(result, mask, outs) for result in KBO.TRANSITION_RESULTS for mask in range(8) for outs in range(3)]
+    cases += [(rng.choice(KBO.TRANSITION_RESULTS), rng.randrange(8), rng.randrange(3)) for _ in range(n_trials)]
+
+    for result, mask, outs in cases:
+        names = rng.sample(NAMES, 4)
+        bases = [names[i] if mask & (1 << i) else None for i in range(3)]
+        batter_name = names[3]
+
+        expected_bases, expected_log = list(bases), _EventLog()
+        expected = KBO.apply_at_bat_result(expected_bases, outs, result, batter_name, expected_log)
+        actual_bases, actual_log = list(bases), _EventLog()
+        actual = apply_with_table(actual_bases, outs, result, batter_name, actual_log)
+
+        case = f"{result}, 베이스 {bases}, {outs}아웃"
+        if actual != expected:
+            raise AssertionError(f"{case}: 득점/아웃 {actual} != {expected}")
+        if actual_bases != expected_bases:
+            raise AssertionError(f"{case}: 베이스 {actual_bases} != {expected_bases}")
+        if actual_log.events != expected_log.events:
+            raise AssertionError(f"{case}: 이벤트 {actual_log.events} != {expected_log.events}")
+    return len(cases)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="주자 이동 전이표와 기존 처리 함수 일치 검사")
+    parser.add_argument("--trials", type=int, default=10000, help="무작위 상태 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    checked = check_against_handlers(args.trials, args.seed)
+    print(f"전이표 일치: {checked}개 경우 확인")
@@ -0,0 +1,180 @@
+"""
+분산 감소 시뮬레이션: 공통 난수(CRN)와 대칭 난수(antithetic).
+
+같은 팀을 다른 날씨나 다른 타순으로 비교할 때 시나리오마다 독립 난수를 쓰면 차이가 잡음에 묻힌다.
+CommonRandom 은 경기 k 의 (이닝, 초/말) 반 이닝마다 고정된 난수 열을 주고,
+simulate_at_bat 은 이 스트림에서 타석마다 정확히 난수 2개(결과, 안타 유형)를 쓴다.
+그래서 시나리오가 달라도 "k 번째 경기, 5회 말, 3번째 타석"은 항상 같은 난수로 결정된다.
+antithetic=True 인 스트림은 같은 자리에 1 - u 를 내므로, 짝지은 두 경기의 평균은 분산이 작아진다.
+배치 엔진은 crn_uniforms 로 같은 배치를 (반 이닝, 타순, 경기) 난수 배열로 맞춘다.
+"""
+import math
+import random
+from itertools import chain
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import KBO
+from batch_sim import simulate_games_batch
+from rng_streams import PregeneratedRandom, antithetic_uniforms, game_seed_sequence
+
+HALF_INNINGS = 18
+DRAWS_PER_PLATE_APPEARANCE = 2
+DRAWS_PER_HALF_INNING = 32  # 타자 14명 x 2개 를 덮는 크기 (넘치면 부모 스트림에서 이어서 뽑음)
+_HALF_INNING_KEY = 1  # 반 이닝 난수용 하위 SeedSequence 키
+_BATCH_KEY = 2  # 배치 엔진(crn_uniforms) 난수용 하위 SeedSequence 키
+CRN_BLOCK_GAMES = 256  # crn_uniforms 가 SeedSequence 하나로 뽑는 경기 수 (경기 번호 기준으로 고정)
+
+
+class _HalfInningRandom(random.Random):
+    """반 이닝 하나의 고정 난수 열. 다 쓰면 overflow 에서 이어 뽑는다."""
+    aligned = True
+
+    def __init__(self, draws: List[float], overflow: Iterable[float]):
+        self._draws = chain(draws, overflow)
+        super().__init__()
+
+    def seed(self, a=None, version=2):
+        self.random = self._draws.__next__
+
+    def random(self) -> float:
+        return self.random()  # seed() 에서 인스턴스 속성으로 대체됨
+
+
+class CommonRandom(PregeneratedRandom):
+    """
+    공통 난수 스트림. simulate_game 의 rng 로 넘기면 반 이닝마다 substream 으로 나눠 쓴다.
+    :param seed: 경기별 SeedSequence (crn_rng 참고)
+    :param antithetic: True 면 같은 시드의 대칭 난수 1 - u
+    """
+    aligned = True
+
+    def __init__(self, seed: Union[np.random.SeedSequence, int, None] = None, antithetic: bool = False,
+                 draws_per_half_inning: int = DRAWS_PER_HALF_INNING):
+        self.draws_per_half_inning = draws_per_half_inning
+        self._half_innings: Optional[List[List[float]]] = None
+        super().__init__(seed, antithetic=antithetic)
+
+    def seed(self, a=None, version=2):
+        super().seed(a, version)
+        self._half_innings = None
+
+    def substream(self, inning: int, half: int) -> random.Random:
+        """inning 회 초(0)/말(1) 의 고정 난수 스트림."""
+        if self._half_innings is None:
+            sequence = np.random.SeedSequence(self.sequence.entropy,
+                                              spawn_key=self.sequence.spawn_key + (_HALF_INNING_KEY,))
+            draws = np.random.Generator(np.random.PCG64(sequence)).random((HALF_INNINGS, self.draws_per_half_inning))
+            self._half_innings = (antithetic_uniforms(draws) if self.antithetic else draws).tolist()
+        return _HalfInningRandom(self._half_innings[2 * (inning - 1) + half], iter(self.random, None))
+
+
+def crn_rng(seed: int, game_index: int, antithetic: bool = False) -> CommonRandom:
+    """경기 번호별 공통 난수 스트림. 같은 (seed, game_index) 면 시나리오와 관계없이 같은 난수."""
+    return CommonRandom(game_seed_sequence(seed, game_index), antithetic=antithetic)
+
+
+def crn_uniforms(seed: int, n_games: int, lineup_size: int = 14, antithetic: bool = False,
+                 first_game: int = 0) -> np.ndarray:
+    """
+    배치 엔진용 공통 난수 (18 반 이닝, 타순, n_games).
+    경기 번호를 CRN_BLOCK_GAMES 개씩 묶은 블록마다 (seed, 블록 번호) SeedSequence 로 타순 자리 순서대로 뽑으므로,
+    n_games / first_game 으로 나눈 방식이나 lineup_size 가 달라도 같은 경기, 같은 (반 이닝, 타순) 자리는 같은 난수다.
+    """
+    uniforms = np.empty((HALF_INNINGS, lineup_size, n_games))
+    last_game = first_game + n_games
+    for block in range(first_game // CRN_BLOCK_GAMES, -(-last_game // CRN_BLOCK_GAMES)):
+        start = block * CRN_BLOCK_GAMES
+        root = game_seed_sequence(seed, block)
+        sequence = np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (_BATCH_KEY,))
+        # (타순, 반 이닝, 경기) 순서로 뽑아 타순이 길어져도 앞자리 난수는 그대로
+        draws = np.random.Generator(np.random.PCG64(sequence)).random((lineup_size, HALF_INNINGS, CRN_BLOCK_GAMES))
+        lo, hi = max(start, first_game), min(start + CRN_BLOCK_GAMES, last_game)
+        uniforms[:, :, lo - first_game:hi - first_game] = draws[:, :, lo - start:hi - start].transpose(1, 0, 2)
+    return antithetic_uniforms(uniforms) if antithetic else uniforms
+
+
+def _paired_stats(values: np.ndarray) -> Dict[str, float]:
+    """짝 단위 값의 평균과 표준오차."""
+    n = values.size
+    std = float(values.std(ddof=1)) if n > 1 else 0.0
+    return {"mean": float(values.mean()), "stderr": std / math.sqrt(n) if n else float("inf")}
+
+
+def _scalar_scores(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, n_games: int,
+                   rng_for_game, table: Optional[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    scores = np.zeros((2, n_games), dtype=np.int32)
+    for k in range(n_games):
+        result = KBO.simulate_game(team1, team2, weather, table, KBO.NULL_SINK, rng_for_game(k))
+        scores[:, k] = result["score_team1"], result["score_team2"]
+    return scores[0], scores[1]
+
+
+def simulate_scenario(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, n_games: int, seed: int = 0,
+                      engine: str = "batch", crn: bool = True, antithetic: bool = False, stream: int = 0,
+                      table: Optional[Any] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    한 시나리오를 n_games 번 시뮬레이션한 (팀1 점수, 팀2 점수).
+    :param crn: True 면 경기 번호별 공통 난수, False 면 stream 번호별 독립 난수 (비교 기준용)
+    """
+    if engine == "batch":
+        lineup_size = max(len(team1["batters"]), len(team2["batters"]))
+        if crn:
+            uniforms = crn_uniforms(seed, n_games, lineup_size, antithetic)
+            result = simulate_games_batch(team1, team2, weather, n_games, table=table, uniforms=uniforms)
+        else:
+            result = simulate_games_batch(team1, team2, weather, n_games, game_seed_sequence(seed, stream), table)
+        return result["team1_scores"], result["team2_scores"]
+    if engine != "scalar":
+        raise ValueError("engine 은 'batch' 또는 'scalar' 여야 합니다.")
+    if crn:
+        return _scalar_scores(team1, team2, weather, n_games, lambda k: crn_rng(seed, k, antithetic), table)
+    return _scalar_scores(team1, team2, weather, n_games,
+                          lambda k: PregeneratedRandom(game_seed_sequence(seed, stream, k)), table)
+
+
+def compare_scenarios(scenarios: Sequence[Tuple[Dict[str, Any], Dict[str, Any], str]], n_games: int, seed: int = 0,
+                      engine: str = "batch", crn: bool = True, table: Optional[Any] = None) -> List[Dict[str, Any]]:
+    """
+    (팀1, 팀2, 날씨) 시나리오들을 같은 난수로 돌려 첫 시나리오 대비 차이를 추정.
+    :return: 시나리오별 팀1 승률, 득실차 평균과, 첫 시나리오 대비 짝지은 차이(평균, 표준오차)
+    """
+    base_win = base_diff = None
+    results = []
+    for i, (team1, team2, weather) in enumerate(scenarios):
+        score1, score2 = simulate_scenario(team1, team2, weather, n_games, seed, engine, crn, stream=i, table=table)
+        win = (score1 > score2).astype(float)
+        diff = (score1 - score2).astype(float)
+        if i == 0:
+            base_win, base_diff = win, diff
+        results.append({
+            "team1": team1["team_name"],
+            "team2": team2["team_name"],
+            "weather": weather,
+            "team1_win_rate": float(win.mean()),
+            "run_diff": float(diff.mean()),
+            "win_rate_delta": _paired_stats(win - base_win),
+            "run_diff_delta": _paired_stats(diff - base_diff),
+        })
+    return results
+
+
+def antithetic_estimate(team1: Dict[str, Any], team2: Dict[str, Any], weather: str, n_pairs: int, seed: int = 0,
+                        engine: str = "batch", table: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    대칭 난수 짝(u, 1 - u)으로 경기 2 x n_pairs 개를 돌려 팀1 승률과 득실차를 추정.
+    표준오차는 짝 평균들로 계산한다.
+    """
+    score1, score2 = simulate_scenario(team1, team2, weather, n_pairs, seed, engine, antithetic=False, table=table)
+    mirror1, mirror2 = simulate_scenario(team1, team2, weather, n_pairs, seed, engine, antithetic=True, table=table)
+    win = ((score1 > score2).astype(float) + (mirror1 > mirror2)) / 2
+    diff = ((score1 - score2).astype(float) + (mirror1 - mirror2)) / 2
+    return {
+        "team1": team1["team_name"],
+        "team2": team2["team_name"],
+        "weather": weather,
+        "games": 2 * n_pairs,
+        "team1_win_rate": _paired_stats(win),
+        "run_diff": _paired_stats(diff),
+    }